@@ -13,6 +13,39 @@ class Settings(BaseSettings):
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 40
 
+    STORE_BACKEND: str = "sqlite"
+    STORE_POSTGRES_URL: str = ""
+    STORE_POSTGRES_POOL_SIZE: int = 0
+    STORE_DATABASE_PATH: str = ""
+    STORE_SHARDS: int = 1
+    STORE_PERSISTENT_CONNECTIONS: bool = True
+    STORE_JOURNAL_MODE: str = "WAL"
+    STORE_SYNCHRONOUS: str = "NORMAL"
+    STORE_BUSY_TIMEOUT_MS: int = 5000
+    STORE_CACHED_STATEMENTS: int = 256
+    STORE_ASYNC_WORKERS: int = 8
+    STORE_WRITE_BEHIND: bool = True
+    STORE_JOURNAL_MAX_QUEUE: int = 10000
+    STORE_JOURNAL_BATCH_SIZE: int = 500
+    STORE_JOURNAL_FLUSH_INTERVAL_MS: int = 50
+    STORE_ARCHIVE_DIR: str = ""
+    STORE_RETENTION_DAYS: int = 90
+    STORE_ARCHIVE_BATCH_SIZE: int = 5000
+    ENGINE_STATE_TTL_SECONDS: float = 60.0
+    ENGINE_ACTOR_WORKERS: int = 8
+    ENGINE_STREAM_MAX_INFLIGHT: int = 1024
+    ENGINE_JOURNAL_DIR: str = ""
+    ENGINE_SNAPSHOT_EVERY: int = 100000
+    ENGINE_SESSION_TIMER_SECONDS: float = 1.0
+    ENGINE_TICK_CONFLATION: bool = False
+    ENGINE_ADMISSION_ENABLED: bool = True
+    ENGINE_TICK_SLO_MS: float = 300.0
+    ENGINE_AI_SLO_MS: float = 200.0
+    ENGINE_ADMISSION_WINDOW_SECONDS: float = 1.0
+    ENGINE_SHED_INFLIGHT: int = 256
+    ENGINE_MAX_INFLIGHT: int = 2048
+    ENGINE_RETRY_AFTER_SECONDS: int = 1
+
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_REQUIRED: bool = False
 
@@ -81,6 +114,24 @@ class Settings(BaseSettings):
             return self._normalize_postgres_url(self.DATABASE_URL, async_mode=False)
         return self._sqlite_sync_url()
 
+    @property
+    def database_path(self) -> str:
+        if self.STORE_DATABASE_PATH:
+            return self.STORE_DATABASE_PATH
+        return str(self._backend_dir() / "bot.db")
+
+    @property
+    def archive_dir(self) -> str:
+        if self.STORE_ARCHIVE_DIR:
+            return self.STORE_ARCHIVE_DIR
+        return str(self._backend_dir() / "archive")
+
+    @property
+    def store_postgres_dsn(self) -> str:
+        url = self.STORE_POSTGRES_URL or self.DATABASE_URL
+        normalized = self._normalize_postgres_url(url, async_mode=False)
+        return normalized.replace("postgresql+psycopg2://", "postgresql://", 1)
+
     @property
     def cors_origins(self) -> list[str]:
         value = self.CORS_ORIGINS.strip()
@@ -96,3 +147,6 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
+
+def get_settings() -> Settings:
+    return settings
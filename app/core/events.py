@@ -1,5 +1,9 @@
 from app.core.redis import close_redis
+from app.db import async_store
+from app.services.tick_actors import tick_actors
 
 
 async def shutdown_services():
     await close_redis()
+    await tick_actors.shutdown()
+    await async_store.shutdown()
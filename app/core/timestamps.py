@@ -0,0 +1,137 @@
+"""Epoch-microsecond timestamps used by the trading store.
+
+The store keeps every timestamp as an integer number of microseconds since
+the Unix epoch (UTC), so range filters and expiry checks are plain integer
+comparisons. API payloads keep the ISO-8601 strings they always had; the
+conversion happens at the edges with the helpers below.
+
+Everything that needs the current time calls :func:`now_us`, which reads the
+installed clock. :func:`set_clock` swaps in a :class:`SimulatedClock` so
+sessions, daily PnL windows and stored timestamps follow simulated time.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Annotated
+
+from pydantic import BeforeValidator
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROS_PER_SECOND = 1_000_000
+MICROS_PER_MINUTE = 60 * MICROS_PER_SECOND
+MICROS_PER_DAY = 86_400 * MICROS_PER_SECOND
+
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class SystemClock:
+    """Wall-clock time."""
+
+    def now_us(self) -> int:
+        return time.time_ns() // 1_000
+
+
+class SimulatedClock:
+    """Clock the caller controls, for replays and tests.
+
+    Time stands still at ``start_us`` until moved with :meth:`set` or
+    :meth:`advance`. With ``speed`` it also runs on its own at ``speed``
+    times wall-clock pace, so ``speed=1440`` plays a trading day in a minute.
+    """
+
+    def __init__(self, start_us: int, *, speed: float = 0.0) -> None:
+        self.speed = speed
+        self._base_us = start_us
+        self._anchor_ns = time.perf_counter_ns()
+
+    def now_us(self) -> int:
+        if not self.speed:
+            return self._base_us
+        return self._base_us + int((time.perf_counter_ns() - self._anchor_ns) * self.speed) // 1_000
+
+    def set(self, at_us: int) -> None:
+        self._base_us = at_us
+        self._anchor_ns = time.perf_counter_ns()
+
+    def advance(self, delta_us: int) -> None:
+        self.set(self.now_us() + delta_us)
+
+
+Clock = SystemClock | SimulatedClock
+
+_clock: Clock = SystemClock()
+
+
+def now_us() -> int:
+    """Current time from the installed clock (the wall clock unless replaced)."""
+    return _clock.now_us()
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+def set_clock(clock: Clock) -> Clock:
+    """Install ``clock`` for every ``now_us()`` caller; returns the previous clock."""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[Clock]:
+    previous = set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
+
+
+def to_epoch_us(value: int | float | str | datetime | date) -> int:
+    """Convert an ISO-8601 string, date, datetime or epoch-us number to epoch-us.
+
+    Naive datetimes and bare dates are taken as UTC.
+    """
+    if isinstance(value, bool):
+        raise TypeError("timestamp cannot be a bool")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // _ONE_MICROSECOND
+
+
+def from_epoch_us(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+
+def format_timestamp(value: int | str | datetime | None) -> str | None:
+    """Render an epoch-us value as the ISO-8601 string the API has always returned."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return from_epoch_us(int(value)).isoformat()
+
+
+def utc_day(value: int) -> str:
+    """UTC calendar day (``YYYY-MM-DD``) of an epoch-us value."""
+    return from_epoch_us(value).date().isoformat()
+
+
+def day_start_us(day: str | date) -> int:
+    return to_epoch_us(date.fromisoformat(day) if isinstance(day, str) else day)
+
+
+# Pydantic field type for API models that expose store timestamps.
+Timestamp = Annotated[str, BeforeValidator(format_timestamp)]
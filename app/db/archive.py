@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.core.timestamps import to_epoch_us, utc_day
+
+# Column layout of each archived table, matching the store schema.
+ARCHIVE_SCHEMAS: dict[str, pa.Schema] = {
+    "closed_trades": pa.schema(
+        [
+            ("id", pa.int64()),
+            ("user_id", pa.string()),
+            ("symbol", pa.string()),
+            ("side", pa.string()),
+            ("quantity", pa.float64()),
+            ("entry_price", pa.float64()),
+            ("close_price", pa.float64()),
+            ("pnl", pa.float64()),
+            ("close_reason", pa.string()),
+            ("opened_at", pa.int64()),
+            ("closed_at", pa.int64()),
+        ]
+    ),
+    "ai_decisions": pa.schema(
+        [
+            ("id", pa.int64()),
+            ("user_id", pa.string()),
+            ("symbol", pa.string()),
+            ("price", pa.float64()),
+            ("approved", pa.int64()),
+            ("confidence", pa.float64()),
+            ("reasons", pa.string()),
+            ("trend_strength", pa.float64()),
+            ("volatility", pa.float64()),
+            ("created_at", pa.int64()),
+        ]
+    ),
+}
+
+# Timestamp column each archived table is partitioned by.
+ARCHIVE_TIMESTAMPS: dict[str, str] = {
+    "closed_trades": "closed_at",
+    "ai_decisions": "created_at",
+}
+
+
+_TEXT_TIMESTAMP_COLUMNS: dict[str, tuple[str, ...]] = {
+    table: tuple(field.name for field in schema if field.name.endswith("_at"))
+    for table, schema in ARCHIVE_SCHEMAS.items()
+}
+
+
+class ParquetArchive:
+    """Date-partitioned Parquet files for rows moved out of the hot tables.
+
+    Rows live under ``<root>/<table>/day=YYYY-MM-DD/part-<shard>-<first>-<last>.parquet``
+    where ``first``/``last`` are the smallest and largest row ids in the file;
+    ids are only unique within a store shard. Naming parts by id range makes
+    re-archiving the same batch overwrite the earlier part instead of
+    duplicating it.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def write(self, table: str, rows: list[dict], *, shard: int = 0) -> list[Path]:
+        """Write ``rows`` into one part per trading day and return the paths."""
+        schema = ARCHIVE_SCHEMAS[table]
+        timestamp = ARCHIVE_TIMESTAMPS[table]
+        by_day: dict[str, list[dict]] = {}
+        for row in rows:
+            by_day.setdefault(utc_day(row[timestamp]), []).append(row)
+
+        written: list[Path] = []
+        for day, day_rows in sorted(by_day.items()):
+            ids = [int(row["id"]) for row in day_rows]
+            partition = self.root / table / f"day={day}"
+            partition.mkdir(parents=True, exist_ok=True)
+            path = partition / f"part-{shard:02d}-{min(ids):012d}-{max(ids):012d}.parquet"
+            tmp_path = path.with_suffix(".parquet.tmp")
+            pq.write_table(pa.Table.from_pylist(day_rows, schema=schema), tmp_path)
+            os.replace(tmp_path, path)
+            written.append(path)
+        return written
+
+    def days(self, table: str) -> list[str]:
+        table_dir = self.root / table
+        if not table_dir.is_dir():
+            return []
+        return sorted(
+            entry.name[len("day=") :]
+            for entry in table_dir.iterdir()
+            if entry.is_dir() and entry.name.startswith("day=")
+        )
+
+    def read(
+        self,
+        table: str,
+        *,
+        user_id: str,
+        since_day: str,
+        until_day: str | None = None,
+    ) -> list[dict]:
+        """Return archived rows for ``user_id`` on days in ``[since_day, until_day)``."""
+        rows: list[dict] = []
+        for day in self.days(table):
+            if day < since_day or (until_day is not None and day >= until_day):
+                continue
+            for path in sorted((self.root / table / f"day={day}").glob("part-*.parquet")):
+                rows.extend(pq.read_table(path, filters=[("user_id", "=", user_id)]).to_pylist())
+        for row in rows:
+            # Parts written before the epoch-us migration hold ISO-8601 text.
+            for column in _TEXT_TIMESTAMP_COLUMNS[table]:
+                if isinstance(row[column], str):
+                    row[column] = to_epoch_us(row[column])
+        return rows
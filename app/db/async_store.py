@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
+from app.config import get_settings
+from app.db import store
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_executor_lock = threading.Lock()
+
+
+def _pool_size(pool: str) -> int:
+    settings = get_settings()
+    if pool == "ticks":
+        return settings.ENGINE_ACTOR_WORKERS
+    return settings.STORE_ASYNC_WORKERS
+
+
+def _get_executor(pool: str = "store") -> ThreadPoolExecutor:
+    """Dedicated store workers, each holding its own persistent connection.
+
+    Keeping blocking store calls off Starlette's shared threadpool lets
+    ``async def`` routes wait on the database without holding a request slot.
+    There are two pools: ``store`` (``STORE_ASYNC_WORKERS`` threads) serves
+    the request routes, and ``ticks`` (one thread per ``ENGINE_ACTOR_WORKERS``
+    actor) serves the tick actors, so a tick burst cannot starve the other
+    routes and an actor never waits for a thread. Each pool's size is the cap
+    on store calls running at once through it.
+    """
+    executor = _executors.get(pool)
+    if executor is None:
+        with _executor_lock:
+            executor = _executors.get(pool)
+            if executor is None:
+                executor = _executors[pool] = ThreadPoolExecutor(
+                    max_workers=_pool_size(pool),
+                    thread_name_prefix="store" if pool == "store" else f"store-{pool}",
+                )
+    return executor
+
+
+async def run(func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def run_tick(func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+    """Like :func:`run`, on the tick actors' pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor("ticks"), functools.partial(func, *args, **kwargs)
+    )
+
+
+def _async(func: Callable[P, T]) -> Callable[P, Awaitable[T]]:
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        return await run(func, *args, **kwargs)
+
+    return wrapper
+
+
+async def shutdown() -> None:
+    with _executor_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    loop = asyncio.get_running_loop()
+    for executor in executors:
+        await loop.run_in_executor(None, executor.shutdown)
+    store.shutdown()
+
+
+init_db = _async(store.init_db)
+upsert_mt5_account = _async(store.upsert_mt5_account)
+get_mt5_account = _async(store.get_mt5_account)
+upsert_trading_config = _async(store.upsert_trading_config)
+get_trading_config = _async(store.get_trading_config)
+upsert_trading_configs = _async(store.upsert_trading_configs)
+set_bot_session = _async(store.set_bot_session)
+get_bot_session = _async(store.get_bot_session)
+get_user_trading_state = _async(store.get_user_trading_state)
+get_open_trades = _async(store.get_open_trades)
+get_closed_trades = _async(store.get_closed_trades)
+get_ai_decisions = _async(store.get_ai_decisions)
+get_realized_pnl_today = _async(store.get_realized_pnl_today)
+get_unrealized_pnl = _async(store.get_unrealized_pnl)
+close_trades_bulk = _async(store.close_trades_bulk)
+close_trades_for_users = _async(store.close_trades_for_users)
+create_ai_decision = _async(store.create_ai_decision)
+upsert_risk_config = _async(store.upsert_risk_config)
+get_risk_config = _async(store.get_risk_config)
+upsert_risk_configs = _async(store.upsert_risk_configs)
+upsert_session_config = _async(store.upsert_session_config)
+get_session_config = _async(store.get_session_config)
+upsert_session_configs = _async(store.upsert_session_configs)
+list_notifications = _async(store.list_notifications)
+create_license = _async(store.create_license)
+get_license_by_key = _async(store.get_license_by_key)
+get_license_by_user = _async(store.get_license_by_user)
+activate_license_for_user = _async(store.activate_license_for_user)
+update_license = _async(store.update_license)
+revoke_license = _async(store.revoke_license)
+list_licenses = _async(store.list_licenses)
+check_license = _async(store.check_license)
+is_license_valid_for_user = _async(store.is_license_valid_for_user)
+get_idempotent_response = _async(store.get_idempotent_response)
+save_idempotent_response = _async(store.save_idempotent_response)
+stop_all_running_bots = _async(store.stop_all_running_bots)
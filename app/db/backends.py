@@ -0,0 +1,427 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import zlib
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import AbstractContextManager, contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Protocol
+
+from app.config import Settings, get_settings
+from app.core.timestamps import to_epoch_us
+
+
+class StoreCursor(Protocol):
+    @property
+    def rowcount(self) -> int: ...
+
+    def fetchone(self) -> Any: ...
+
+    def fetchall(self) -> list[Any]: ...
+
+    def fetchmany(self, size: int = ..., /) -> list[Any]: ...
+
+
+class StoreConnection(Protocol):
+    """The DB-API subset the store relies on.
+
+    Statements use ``?`` placeholders and rows support ``row["column"]`` and
+    ``dict(row)`` on every backend.
+    """
+
+    @property
+    def in_transaction(self) -> bool: ...
+
+    def execute(self, sql: str, parameters: Sequence[Any] = ..., /) -> StoreCursor: ...
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> StoreCursor: ...
+
+    def commit(self) -> None: ...
+
+    def rollback(self) -> None: ...
+
+
+class StoreBackend:
+    name = "base"
+
+    def __init__(self, shards: int = 1) -> None:
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.shard_count = max(1, shards)
+
+    def connection(self, shard: int = 0) -> AbstractContextManager[StoreConnection]:
+        raise NotImplementedError
+
+    def shard_for(self, user_id: str) -> int:
+        """Stable shard index for ``user_id`` (independent of PYTHONHASHSEED)."""
+        if self.shard_count == 1:
+            return 0
+        return zlib.crc32(user_id.encode("utf-8")) % self.shard_count
+
+    def close_all(self) -> None:
+        raise NotImplementedError
+
+    def translate_ddl(self, sql: str) -> str:
+        return sql
+
+    def prepare(self, conn: StoreConnection) -> None:
+        """Create backend bookkeeping objects before migrations run."""
+
+    def begin_exclusive(self, conn: StoreConnection) -> None:
+        """Start a transaction that serializes with other store maintenance."""
+        raise NotImplementedError
+
+    def get_schema_version(self, conn: StoreConnection) -> int:
+        raise NotImplementedError
+
+    def set_schema_version(self, conn: StoreConnection, version: int) -> None:
+        raise NotImplementedError
+
+    def utc_day_sql(self, column: str) -> str:
+        """SQL expression for the ``YYYY-MM-DD`` UTC day of an epoch-us column."""
+        raise NotImplementedError
+
+    def convert_to_epoch_us(
+        self, conn: StoreConnection, table: str, columns: Sequence[str]
+    ) -> None:
+        """Retype ISO-8601 TEXT ``columns`` of ``table`` to epoch-us integers.
+
+        Columns that are already integers are left alone.
+        """
+        raise NotImplementedError
+
+    def _count_open(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+
+@lru_cache(maxsize=256)
+def _shard_file(path: str, shard: int) -> str:
+    # Cached: this runs on every store call and Path parsing is not free.
+    base = Path(path)
+    return str(base.with_name(f"{base.stem}.shard{shard:02d}{base.suffix}"))
+
+
+class SqliteBackend(StoreBackend):
+    """Hands out one persistent SQLite connection per thread and shard.
+
+    Connections are opened lazily, tuned with the journal/synchronous pragmas
+    from ``Settings`` and kept for the lifetime of the thread so that the
+    per-connection statement cache survives across store calls.
+
+    With ``shards > 1`` each shard is its own database file next to
+    ``database_path`` (``bot.db`` -> ``bot.shard00.db`` ...), so each shard
+    has its own writer lock.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, shards: int = 1) -> None:
+        super().__init__(shards)
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+
+    def shard_path(self, shard: int) -> str:
+        path = get_settings().database_path
+        if self.shard_count == 1:
+            return path
+        return _shard_file(path, shard)
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        settings = get_settings()
+        conn = sqlite3.connect(
+            path,
+            timeout=settings.STORE_BUSY_TIMEOUT_MS / 1000,
+            cached_statements=settings.STORE_CACHED_STATEMENTS,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA journal_mode={settings.STORE_JOURNAL_MODE}")
+        conn.execute(f"PRAGMA synchronous={settings.STORE_SYNCHRONOUS}")
+        self._count_open()
+        return conn
+
+    @contextmanager
+    def connection(self, shard: int = 0) -> Iterator[StoreConnection]:
+        path = self.shard_path(shard)
+        if not get_settings().STORE_PERSISTENT_CONNECTIONS:
+            fresh = self._open(path)
+            try:
+                yield fresh
+            finally:
+                fresh.close()
+            return
+
+        connections: dict[str, sqlite3.Connection] | None = getattr(
+            self._local, "connections", None
+        )
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(path)
+        if conn is None:
+            conn = connections[path] = self._open(path)
+            with self._lock:
+                self._connections.append(conn)
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    def close_all(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def begin_exclusive(self, conn: StoreConnection) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+
+    def get_schema_version(self, conn: StoreConnection) -> int:
+        return int(conn.execute("PRAGMA user_version").fetchone()["user_version"])
+
+    def set_schema_version(self, conn: StoreConnection, version: int) -> None:
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+
+    def utc_day_sql(self, column: str) -> str:
+        return f"date({column} / 1000000, 'unixepoch')"
+
+    def convert_to_epoch_us(
+        self, conn: StoreConnection, table: str, columns: Sequence[str]
+    ) -> None:
+        # SQLite cannot change a column's type in place, and a TEXT column
+        # would store the integers as text, so the table is rebuilt.
+        info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+        names = [str(row["name"]) for row in info]
+        pending = {
+            str(row["name"])
+            for row in info
+            if row["name"] in columns and str(row["type"]).upper() != "INTEGER"
+        }
+        if not pending:
+            return
+
+        ddl = str(
+            conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()["sql"]
+        )
+        ddl = re.sub(rf"^CREATE TABLE (IF NOT EXISTS )?{table}\b", f"CREATE TABLE {table}__new", ddl)
+        for column in pending:
+            ddl = re.sub(rf"\b{column} TEXT\b", f"{column} INTEGER", ddl)
+        indexes = [
+            str(row["sql"])
+            for row in conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (table,),
+            ).fetchall()
+        ]
+        sequence = conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)
+        ).fetchone()
+
+        conn.execute(ddl)
+        positions = [index for index, name in enumerate(names) if name in pending]
+        column_list = ", ".join(names)
+        placeholders = ", ".join("?" for _ in names)
+        cursor = conn.execute(f"SELECT {column_list} FROM {table}")
+        while rows := cursor.fetchmany(5000):
+            converted = []
+            for row in rows:
+                values = list(row)
+                for position in positions:
+                    if values[position] is not None:
+                        values[position] = to_epoch_us(values[position])
+                converted.append(values)
+            conn.executemany(
+                f"INSERT INTO {table}__new ({column_list}) VALUES ({placeholders})", converted
+            )
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}__new RENAME TO {table}")
+        for index_sql in indexes:
+            conn.execute(index_sql)
+        if sequence is not None:
+            conn.execute(
+                "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = ?",
+                (int(sequence["seq"]), table),
+            )
+
+
+@lru_cache(maxsize=512)
+def _to_pyformat(sql: str) -> str:
+    return sql.replace("%", "%%").replace("?", "%s")
+
+
+class _PostgresConnection:
+    """Adapts a psycopg2 connection to the sqlite3-style calls the store makes."""
+
+    def __init__(self, raw: Any, cursor_factory: Any, idle_status: int) -> None:
+        self.raw = raw
+        self._cursor_factory = cursor_factory
+        self._idle_status = idle_status
+        self._trace: Callable[[str], None] | None = None
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.raw.get_transaction_status() != self._idle_status
+
+    def set_trace_callback(self, callback: Callable[[str], None] | None) -> None:
+        self._trace = callback
+
+    def execute(self, sql: str, parameters: Sequence[Any] = ()) -> Any:
+        cursor = self.raw.cursor(cursor_factory=self._cursor_factory)
+        cursor.execute(_to_pyformat(sql), tuple(parameters))
+        if self._trace is not None:
+            self._trace(cursor.query.decode("utf-8"))
+        return cursor
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> Any:
+        cursor = self.raw.cursor(cursor_factory=self._cursor_factory)
+        cursor.executemany(_to_pyformat(sql), [tuple(item) for item in seq_of_parameters])
+        if self._trace is not None:
+            self._trace(sql)
+        return cursor
+
+    def commit(self) -> None:
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        self.raw.rollback()
+
+
+class PostgresBackend(StoreBackend):
+    """Store backend on a bounded psycopg2 connection pool.
+
+    The pool holds ``STORE_POSTGRES_POOL_SIZE`` connections, by default one
+    per thread of the async store executors (``STORE_ASYNC_WORKERS`` +
+    ``ENGINE_ACTOR_WORKERS``) plus one for the write-behind journal; those
+    threads are what bound concurrent store calls, so more connections would
+    sit idle. Other callers wait for a free connection instead of failing.
+    """
+
+    name = "postgres"
+
+    _DDL_TYPES = (
+        (
+            re.compile(r"INTEGER PRIMARY KEY AUTOINCREMENT"),
+            "BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY",
+        ),
+        (re.compile(r"\bREAL\b"), "DOUBLE PRECISION"),
+        (re.compile(r"\b(\w+_at) INTEGER\b"), r"\1 BIGINT"),
+    )
+
+    def __init__(self, settings: Settings) -> None:
+        super().__init__()
+        import psycopg2.extensions
+        import psycopg2.extras
+        import psycopg2.pool
+
+        max_connections = settings.STORE_POSTGRES_POOL_SIZE or (
+            settings.STORE_ASYNC_WORKERS + settings.ENGINE_ACTOR_WORKERS + 1
+        )
+        self._dsn = settings.store_postgres_dsn
+        self._pool = psycopg2.pool.ThreadedConnectionPool(1, max_connections, self._dsn)
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._cursor_factory = psycopg2.extras.RealDictCursor
+        self._idle_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        self._wrapped: dict[int, _PostgresConnection] = {}
+
+    @contextmanager
+    def connection(self, shard: int = 0) -> Iterator[_PostgresConnection]:
+        self._slots.acquire()
+        try:
+            raw = self._pool.getconn()
+            with self._lock:
+                conn = self._wrapped.get(id(raw))
+                if conn is None or conn.raw is not raw:
+                    conn = _PostgresConnection(raw, self._cursor_factory, self._idle_status)
+                    self._wrapped[id(raw)] = conn
+                    self.connections_opened += 1
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._pool.putconn(raw)
+        finally:
+            self._slots.release()
+
+    def close_all(self) -> None:
+        with self._lock:
+            self._wrapped.clear()
+        self._pool.closeall()
+
+    def translate_ddl(self, sql: str) -> str:
+        for pattern, replacement in self._DDL_TYPES:
+            sql = pattern.sub(replacement, sql)
+        return sql
+
+    def begin_exclusive(self, conn: StoreConnection) -> None:
+        conn.execute("SELECT pg_advisory_xact_lock(hashtext('app.db.store'))")
+
+    def prepare(self, conn: StoreConnection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS store_schema_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            )
+            """
+        )
+        conn.commit()
+
+    def get_schema_version(self, conn: StoreConnection) -> int:
+        row = conn.execute("SELECT version FROM store_schema_version WHERE id = 1").fetchone()
+        return int(row["version"]) if row is not None else 0
+
+    def utc_day_sql(self, column: str) -> str:
+        return f"to_char(to_timestamp({column} / 1000000.0) AT TIME ZONE 'UTC', 'YYYY-MM-DD')"
+
+    def convert_to_epoch_us(
+        self, conn: StoreConnection, table: str, columns: Sequence[str]
+    ) -> None:
+        rows = conn.execute(
+            """
+            SELECT column_name, data_type
+            FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = ?
+            """,
+            (table,),
+        ).fetchall()
+        pending = [
+            str(row["column_name"])
+            for row in rows
+            if row["column_name"] in columns and row["data_type"] != "bigint"
+        ]
+        if not pending:
+            return
+        conn.execute("SET LOCAL TIME ZONE 'UTC'")
+        alterations = ", ".join(
+            f"ALTER COLUMN {column} TYPE BIGINT "
+            f"USING (EXTRACT(EPOCH FROM {column}::timestamptz) * 1000000)::BIGINT"
+            for column in pending
+        )
+        conn.execute(f"ALTER TABLE {table} {alterations}")
+
+    def set_schema_version(self, conn: StoreConnection, version: int) -> None:
+        conn.execute(
+            """
+            INSERT INTO store_schema_version (id, version)
+            VALUES (1, ?)
+            ON CONFLICT (id) DO UPDATE SET version = excluded.version
+            """,
+            (int(version),),
+        )
+
+
+def create_backend(settings: Settings) -> StoreBackend:
+    if settings.STORE_BACKEND == "postgres":
+        return PostgresBackend(settings)
+    if settings.STORE_BACKEND == "sqlite":
+        return SqliteBackend(shards=settings.STORE_SHARDS)
+    raise ValueError(f"Unsupported store backend: {settings.STORE_BACKEND}")
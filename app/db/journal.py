@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+
+from app.db.backends import StoreConnection
+from app.services.latency_metrics import latency_metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _FlushMarker:
+    done: threading.Event
+
+
+@dataclass(frozen=True)
+class _StopMarker:
+    done: threading.Event
+
+
+class WriteBehindJournal:
+    """Bounded write-behind queue for audit-only INSERTs.
+
+    Rows are buffered in memory and written by a background thread in a single
+    transaction per store shard once ``batch_size`` rows are queued or
+    ``flush_interval_ms`` has elapsed since the first queued row. ``append``
+    blocks while the queue is full, pushing back on producers instead of
+    dropping rows.
+    """
+
+    def __init__(
+        self,
+        *,
+        connection: Callable[[int], AbstractContextManager[StoreConnection]],
+        max_queue: int,
+        batch_size: int,
+        flush_interval_ms: int,
+    ) -> None:
+        self._connection = connection
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = max(0.0, flush_interval_ms / 1000)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.flushes = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.backpressure_waits = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def append(self, sql: str, params: tuple, *, shard: int = 0) -> None:
+        self._ensure_started()
+        item = (shard, sql, params)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._stats_lock:
+                self.backpressure_waits += 1
+            self._queue.put(item)
+
+    def flush(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            return
+        marker = _FlushMarker(threading.Event())
+        self._queue.put(marker)
+        marker.done.wait()
+
+    def close(self) -> None:
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is None or not thread.is_alive():
+            return
+        marker = _StopMarker(threading.Event())
+        self._queue.put(marker)
+        marker.done.wait()
+        thread.join()
+
+    def stats(self) -> dict[str, float | int]:
+        with self._stats_lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "flushes": self.flushes,
+                "rows_written": self.rows_written,
+                "rows_failed": self.rows_failed,
+                "backpressure_waits": self.backpressure_waits,
+                "last_flush_ms": round(self.last_flush_ms, 3),
+            }
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="store-write-behind",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch: list[tuple[int, str, tuple]] = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self._flush_interval
+            while not isinstance(item, (_FlushMarker, _StopMarker)):
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    item = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    item = None
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    item = None
+                    break
+
+            if batch:
+                self._write(batch)
+            if isinstance(item, _FlushMarker):
+                item.done.set()
+            elif isinstance(item, _StopMarker):
+                item.done.set()
+                return
+
+    def _write(self, batch: list[tuple[int, str, tuple]]) -> None:
+        started = time.perf_counter()
+        grouped: dict[int, dict[str, list[tuple]]] = {}
+        for shard, sql, params in batch:
+            grouped.setdefault(shard, {}).setdefault(sql, []).append(params)
+
+        written = 0
+        for shard, statements in grouped.items():
+            rows_in_shard = sum(len(rows) for rows in statements.values())
+            try:
+                with self._connection(shard) as conn:
+                    for sql, rows in statements.items():
+                        conn.executemany(sql, rows)
+                    conn.commit()
+            except Exception:
+                logger.exception(
+                    "write-behind flush failed", extra={"rows": rows_in_shard, "shard": shard}
+                )
+                with self._stats_lock:
+                    self.rows_failed += rows_in_shard
+                continue
+            written += rows_in_shard
+
+        if not written:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        latency_metrics.record("store_journal_flush_ms", elapsed_ms)
+        with self._stats_lock:
+            self.flushes += 1
+            self.rows_written += written
+            self.last_flush_ms = elapsed_ms
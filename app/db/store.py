@@ -1,181 +1,475 @@
 from __future__ import annotations
 
 import json
-import sqlite3
-from datetime import datetime, timezone
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
+from typing import TypeVar
+from datetime import datetime, timedelta, timezone
 
 from app.config import get_settings
+from app.core.timestamps import day_start_us, from_epoch_us, now_us, to_epoch_us, utc_day
+from app.db.archive import ARCHIVE_SCHEMAS, ARCHIVE_TIMESTAMPS, ParquetArchive
+from app.db.backends import StoreBackend, StoreConnection, create_backend
+from app.db.journal import WriteBehindJournal
+
+_INSERT_AI_DECISION_SQL = """
+    INSERT INTO ai_decisions (
+        user_id, symbol, price, approved, confidence,
+        reasons, trend_strength, volatility, created_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
+# Stays well under SQLite's bound-parameter limit for IN (...) lists.
+_MAX_IN_PARAMS = 500
 
-def _connect() -> sqlite3.Connection:
-    settings = get_settings()
-    conn = sqlite3.connect(settings.database_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+_INSERT_NOTIFICATION_SQL = """
+    INSERT INTO notifications (user_id, event_type, title, message, channel, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+T = TypeVar("T")
 
+_backend: StoreBackend | None = None
+_backend_lock = threading.Lock()
 
-def init_db() -> None:
-    conn = _connect()
+
+def get_backend() -> StoreBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(get_settings())
+    return _backend
+
+
+def _connection(user_id: str | None = None) -> AbstractContextManager[StoreConnection]:
+    """Connection to the shard holding ``user_id``, or to the home shard.
+
+    Per-user tables are spread across shards by user_id; licenses, license
+    events and idempotency records are not user-keyed and live on the home
+    shard (shard 0), as do cross-user queries that are not fanned out.
+    """
+    backend = get_backend()
+    if user_id is None:
+        return backend.connection()
+    return backend.connection(backend.shard_for(user_id))
+
+
+def _shard_connection(shard: int) -> AbstractContextManager[StoreConnection]:
+    return get_backend().connection(shard)
+
+
+def _shards() -> range:
+    return range(get_backend().shard_count)
+
+
+def _fan_out(func: Callable[[StoreConnection], T]) -> list[T]:
+    """Run ``func`` against every shard in order and collect the results."""
+    results: list[T] = []
+    for shard in _shards():
+        with _shard_connection(shard) as conn:
+            results.append(func(conn))
+    return results
+
+
+def _bulk_upsert(table: str, sql: str, rows: list[tuple]) -> list[dict]:
+    """``executemany`` an upsert keyed by ``user_id`` and read the rows back.
+
+    ``rows`` are parameter tuples whose first item is the user id. Each shard
+    is written and read back in a single transaction. Returns the stored row
+    for every input row, in input order; when a user appears more than once
+    the last entry wins and every occurrence reports that row.
+    """
+    backend = get_backend()
+    by_shard: dict[int, list[tuple]] = {}
+    for row in rows:
+        by_shard.setdefault(backend.shard_for(row[0]), []).append(row)
+
+    stored: dict[str, dict] = {}
+    for shard, shard_rows in by_shard.items():
+        user_ids = list(dict.fromkeys(row[0] for row in shard_rows))
+        with _shard_connection(shard) as conn:
+            conn.executemany(sql, shard_rows)
+            for offset in range(0, len(user_ids), _MAX_IN_PARAMS):
+                chunk = user_ids[offset : offset + _MAX_IN_PARAMS]
+                placeholders = ", ".join("?" for _ in chunk)
+                for record in conn.execute(
+                    f"SELECT * FROM {table} WHERE user_id IN ({placeholders})", chunk
+                ).fetchall():
+                    stored[record["user_id"]] = dict(record)
+            conn.commit()
+    return [stored[row[0]] for row in rows]
+
+
+def close_connections() -> None:
+    global _backend
+    with _backend_lock:
+        backend, _backend = _backend, None
+    if backend is not None:
+        backend.close_all()
+
+
+_journal: WriteBehindJournal | None = None
+_journal_lock = threading.Lock()
+
+
+def get_journal() -> WriteBehindJournal:
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                settings = get_settings()
+                _journal = WriteBehindJournal(
+                    connection=_shard_connection,
+                    max_queue=settings.STORE_JOURNAL_MAX_QUEUE,
+                    batch_size=settings.STORE_JOURNAL_BATCH_SIZE,
+                    flush_interval_ms=settings.STORE_JOURNAL_FLUSH_INTERVAL_MS,
+                )
+    return _journal
+
+
+def flush_journal() -> None:
+    if _journal is not None:
+        _journal.flush()
+
+
+def shutdown() -> None:
+    global _journal
+    with _journal_lock:
+        journal, _journal = _journal, None
+    if journal is not None:
+        journal.close()
+    close_connections()
+
+
+_audit_buffer = threading.local()
+
+
+@contextmanager
+def audit_batch() -> Iterator[None]:
+    """Commit the synchronous audit rows written on this thread together.
+
+    Inside the block audit rows are buffered and written on exit with one
+    ``executemany`` per statement and one transaction per shard. With
+    ``STORE_WRITE_BEHIND`` the journal already groups audit rows, so this is
+    a no-op; nested blocks join the outermost one.
+    """
+    if get_settings().STORE_WRITE_BEHIND or getattr(_audit_buffer, "rows", None) is not None:
+        yield
+        return
+    rows: list[tuple[int, str, tuple]] = []
+    _audit_buffer.rows = rows
     try:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS mt5_accounts (
-                user_id TEXT PRIMARY KEY,
-                login_enc TEXT NOT NULL,
-                password_enc TEXT NOT NULL,
-                server_enc TEXT NOT NULL,
-                broker_enc TEXT,
-                last_validation_status TEXT,
-                last_validated_at TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS trading_configs (
-                user_id TEXT PRIMARY KEY,
-                assets TEXT NOT NULL,
-                timeframe TEXT NOT NULL,
-                max_trades_per_session INTEGER NOT NULL,
-                quantity REAL NOT NULL,
-                profit_threshold REAL NOT NULL,
-                loss_threshold REAL NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS bot_sessions (
-                user_id TEXT PRIMARY KEY,
-                is_running INTEGER NOT NULL,
-                started_at TEXT,
-                trades_opened_this_session INTEGER NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS open_trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                side TEXT NOT NULL,
-                quantity REAL NOT NULL,
-                entry_price REAL NOT NULL,
-                opened_at TEXT NOT NULL,
-                UNIQUE(user_id, symbol)
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS closed_trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                side TEXT NOT NULL,
-                quantity REAL NOT NULL,
-                entry_price REAL NOT NULL,
-                close_price REAL NOT NULL,
-                pnl REAL NOT NULL,
-                close_reason TEXT NOT NULL,
-                opened_at TEXT NOT NULL,
-                closed_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS ai_decisions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                price REAL NOT NULL,
-                approved INTEGER NOT NULL,
-                confidence REAL NOT NULL,
-                reasons TEXT NOT NULL,
-                trend_strength REAL NOT NULL,
-                volatility REAL NOT NULL,
-                created_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS risk_configs (
-                user_id TEXT PRIMARY KEY,
-                daily_profit_target REAL NOT NULL,
-                daily_loss_limit REAL NOT NULL,
-                allocated_capital REAL NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS session_configs (
-                user_id TEXT PRIMARY KEY,
-                duration_minutes INTEGER NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
+        yield
+    finally:
+        _audit_buffer.rows = None
+        _write_audit_rows(rows)
+
+
+def _write_audit_rows(rows: list[tuple[int, str, tuple]]) -> None:
+    by_shard: dict[int, dict[str, list[tuple]]] = {}
+    for shard, sql, params in rows:
+        by_shard.setdefault(shard, {}).setdefault(sql, []).append(params)
+    for shard, statements in by_shard.items():
+        with _shard_connection(shard) as conn:
+            for sql, batch in statements.items():
+                conn.executemany(sql, batch)
+            conn.commit()
+
+
+def _write_audit(user_id: str, sql: str, params: tuple) -> None:
+    shard = get_backend().shard_for(user_id)
+    if get_settings().STORE_WRITE_BEHIND:
+        get_journal().append(sql, params, shard=shard)
+        return
+    buffered = getattr(_audit_buffer, "rows", None)
+    if buffered is not None:
+        buffered.append((shard, sql, params))
+        return
+    with _shard_connection(shard) as conn:
+        conn.execute(sql, params)
+        conn.commit()
+
+
+# Baseline (version 0) schema; later changes live in _MIGRATIONS.
+_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS mt5_accounts (
+        user_id TEXT PRIMARY KEY,
+        login_enc TEXT NOT NULL,
+        password_enc TEXT NOT NULL,
+        server_enc TEXT NOT NULL,
+        broker_enc TEXT,
+        last_validation_status TEXT,
+        last_validated_at TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trading_configs (
+        user_id TEXT PRIMARY KEY,
+        assets TEXT NOT NULL,
+        timeframe TEXT NOT NULL,
+        max_trades_per_session INTEGER NOT NULL,
+        quantity REAL NOT NULL,
+        profit_threshold REAL NOT NULL,
+        loss_threshold REAL NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bot_sessions (
+        user_id TEXT PRIMARY KEY,
+        is_running INTEGER NOT NULL,
+        started_at TEXT,
+        trades_opened_this_session INTEGER NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS open_trades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        side TEXT NOT NULL,
+        quantity REAL NOT NULL,
+        entry_price REAL NOT NULL,
+        opened_at TEXT NOT NULL,
+        UNIQUE(user_id, symbol)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS closed_trades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        side TEXT NOT NULL,
+        quantity REAL NOT NULL,
+        entry_price REAL NOT NULL,
+        close_price REAL NOT NULL,
+        pnl REAL NOT NULL,
+        close_reason TEXT NOT NULL,
+        opened_at TEXT NOT NULL,
+        closed_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ai_decisions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        price REAL NOT NULL,
+        approved INTEGER NOT NULL,
+        confidence REAL NOT NULL,
+        reasons TEXT NOT NULL,
+        trend_strength REAL NOT NULL,
+        volatility REAL NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS risk_configs (
+        user_id TEXT PRIMARY KEY,
+        daily_profit_target REAL NOT NULL,
+        daily_loss_limit REAL NOT NULL,
+        allocated_capital REAL NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS session_configs (
+        user_id TEXT PRIMARY KEY,
+        duration_minutes INTEGER NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS notifications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        title TEXT NOT NULL,
+        message TEXT NOT NULL,
+        channel TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS licenses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        license_key TEXT NOT NULL UNIQUE,
+        status TEXT NOT NULL,
+        assigned_user_id TEXT,
+        expires_at TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS license_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        license_id INTEGER NOT NULL,
+        event_type TEXT NOT NULL,
+        actor TEXT NOT NULL,
+        metadata TEXT,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY(license_id) REFERENCES licenses(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS idempotency_records (
+        idempotency_key TEXT PRIMARY KEY,
+        endpoint TEXT NOT NULL,
+        response_json TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+)
+
+
+def init_db() -> None:
+    backend = get_backend()
+    for shard in _shards():
+        with _shard_connection(shard) as conn:
+            for ddl in _TABLES:
+                conn.execute(backend.translate_ddl(ddl))
+            conn.commit()
+            backend.prepare(conn)
+            _apply_migrations(conn)
+
+
+def _add_secondary_indexes(conn: StoreConnection) -> None:
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS ix_open_trades_user_opened_at ON open_trades (user_id, opened_at)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS ix_closed_trades_user_closed_at ON closed_trades (user_id, closed_at)"
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_notifications_user_channel_created_at
+        ON notifications (user_id, channel, created_at)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_licenses_assigned_user_updated_at
+        ON licenses (assigned_user_id, updated_at)
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_licenses_updated_at ON licenses (updated_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_bot_sessions_is_running ON bot_sessions (is_running)")
+
+
+def _add_daily_pnl_ledger(conn: StoreConnection) -> None:
+    conn.execute(
+        get_backend().translate_ddl(
             """
-            CREATE TABLE IF NOT EXISTS notifications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+            CREATE TABLE IF NOT EXISTS daily_pnl (
                 user_id TEXT NOT NULL,
-                event_type TEXT NOT NULL,
-                title TEXT NOT NULL,
-                message TEXT NOT NULL,
-                channel TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS licenses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                license_key TEXT NOT NULL UNIQUE,
-                status TEXT NOT NULL,
-                assigned_user_id TEXT,
-                expires_at TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
+                trading_day TEXT NOT NULL,
+                realized_pnl REAL NOT NULL,
+                closed_trades INTEGER NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, trading_day)
             )
             """
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS license_events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                license_id INTEGER NOT NULL,
-                event_type TEXT NOT NULL,
-                actor TEXT NOT NULL,
-                metadata TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY(license_id) REFERENCES licenses(id)
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS idempotency_records (
-                idempotency_key TEXT PRIMARY KEY,
-                endpoint TEXT NOT NULL,
-                response_json TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-            """
+    )
+    # Timestamps are still ISO-8601 text at this schema version.
+    conn.execute(
+        """
+        INSERT INTO daily_pnl (user_id, trading_day, realized_pnl, closed_trades, updated_at)
+        SELECT user_id, substr(closed_at, 1, 10), SUM(pnl), COUNT(*), ?
+        FROM closed_trades
+        GROUP BY user_id, substr(closed_at, 1, 10)
+        """,
+        (datetime.now(timezone.utc).isoformat(),),
+    )
+
+
+def _add_archive_watermarks(conn: StoreConnection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS archive_watermarks (
+            table_name TEXT PRIMARY KEY,
+            archived_before TEXT NOT NULL,
+            updated_at TEXT NOT NULL
         )
-        conn.commit()
-    finally:
-        conn.close()
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_closed_trades_closed_at ON closed_trades (closed_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_ai_decisions_created_at ON ai_decisions (created_at)")
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_ai_decisions_user_created_at
+        ON ai_decisions (user_id, created_at)
+        """
+    )
+
+
+# Every timestamp column in the store, held as epoch microseconds (UTC) from
+# schema version 4 on.
+_TIMESTAMP_COLUMNS: dict[str, tuple[str, ...]] = {
+    "mt5_accounts": ("last_validated_at", "created_at", "updated_at"),
+    "trading_configs": ("updated_at",),
+    "bot_sessions": ("started_at", "updated_at"),
+    "open_trades": ("opened_at",),
+    "closed_trades": ("opened_at", "closed_at"),
+    "ai_decisions": ("created_at",),
+    "risk_configs": ("updated_at",),
+    "session_configs": ("updated_at",),
+    "notifications": ("created_at",),
+    "licenses": ("expires_at", "created_at", "updated_at"),
+    "license_events": ("created_at",),
+    "idempotency_records": ("created_at",),
+    "daily_pnl": ("updated_at",),
+    "archive_watermarks": ("updated_at",),
+}
+
+
+def _convert_timestamps_to_epoch_us(conn: StoreConnection) -> None:
+    backend = get_backend()
+    for table, columns in _TIMESTAMP_COLUMNS.items():
+        backend.convert_to_epoch_us(conn, table, columns)
+
+
+# Ordered schema migrations; the backend records the applied version and
+# migration N moves the database from version N - 1 to N. Append only.
+_MIGRATIONS: tuple[Callable[[StoreConnection], None], ...] = (
+    _add_secondary_indexes,
+    _add_daily_pnl_ledger,
+    _add_archive_watermarks,
+    _convert_timestamps_to_epoch_us,
+)
+
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+
+def get_schema_version() -> int:
+    return min(_fan_out(get_backend().get_schema_version))
+
+
+def _apply_migrations(conn: StoreConnection) -> None:
+    backend = get_backend()
+    current = backend.get_schema_version(conn)
+    for version in range(current + 1, SCHEMA_VERSION + 1):
+        backend.begin_exclusive(conn)
+        try:
+            if backend.get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            _MIGRATIONS[version - 1](conn)
+            backend.set_schema_version(conn, version)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
 
 
 def upsert_mt5_account(
@@ -187,9 +481,8 @@ def upsert_mt5_account(
     broker_enc: str | None,
     last_validation_status: str,
 ) -> None:
-    now = datetime.now(timezone.utc).isoformat()
-    conn = _connect()
-    try:
+    now = now_us()
+    with _connection(user_id) as conn:
         conn.execute(
             """
             INSERT INTO mt5_accounts (
@@ -219,13 +512,10 @@ def upsert_mt5_account(
             ),
         )
         conn.commit()
-    finally:
-        conn.close()
 
 
 def get_mt5_account(user_id: str) -> dict | None:
-    conn = _connect()
-    try:
+    with _connection(user_id) as conn:
         row = conn.execute(
             "SELECT * FROM mt5_accounts WHERE user_id = ?",
             (user_id,),
@@ -233,8 +523,23 @@ def get_mt5_account(user_id: str) -> dict | None:
         if row is None:
             return None
         return dict(row)
-    finally:
-        conn.close()
+
+
+_UPSERT_TRADING_CONFIG_SQL = """
+    INSERT INTO trading_configs (
+        user_id, assets, timeframe, max_trades_per_session,
+        quantity, profit_threshold, loss_threshold, updated_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        assets = excluded.assets,
+        timeframe = excluded.timeframe,
+        max_trades_per_session = excluded.max_trades_per_session,
+        quantity = excluded.quantity,
+        profit_threshold = excluded.profit_threshold,
+        loss_threshold = excluded.loss_threshold,
+        updated_at = excluded.updated_at
+"""
 
 
 def upsert_trading_config(
@@ -247,25 +552,9 @@ def upsert_trading_config(
     profit_threshold: float,
     loss_threshold: float,
 ) -> None:
-    now = datetime.now(timezone.utc).isoformat()
-    conn = _connect()
-    try:
+    with _connection(user_id) as conn:
         conn.execute(
-            """
-            INSERT INTO trading_configs (
-                user_id, assets, timeframe, max_trades_per_session,
-                quantity, profit_threshold, loss_threshold, updated_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(user_id) DO UPDATE SET
-                assets = excluded.assets,
-                timeframe = excluded.timeframe,
-                max_trades_per_session = excluded.max_trades_per_session,
-                quantity = excluded.quantity,
-                profit_threshold = excluded.profit_threshold,
-                loss_threshold = excluded.loss_threshold,
-                updated_at = excluded.updated_at
-            """,
+            _UPSERT_TRADING_CONFIG_SQL,
             (
                 user_id,
                 ",".join(assets),
@@ -274,17 +563,36 @@ def upsert_trading_config(
                 quantity,
                 profit_threshold,
                 loss_threshold,
-                now,
+                now_us(),
             ),
         )
         conn.commit()
-    finally:
-        conn.close()
+
+
+def upsert_trading_configs(configs: list[dict]) -> list[dict]:
+    """Bulk :func:`upsert_trading_config`; returns the stored rows in input order."""
+    now = now_us()
+    return _bulk_upsert(
+        "trading_configs",
+        _UPSERT_TRADING_CONFIG_SQL,
+        [
+            (
+                config["user_id"],
+                ",".join(config["assets"]),
+                config["timeframe"],
+                config["max_trades_per_session"],
+                config["quantity"],
+                config["profit_threshold"],
+                config["loss_threshold"],
+                now,
+            )
+            for config in configs
+        ],
+    )
 
 
 def get_trading_config(user_id: str) -> dict | None:
-    conn = _connect()
-    try:
+    with _connection(user_id) as conn:
         row = conn.execute(
             "SELECT * FROM trading_configs WHERE user_id = ?",
             (user_id,),
@@ -292,20 +600,36 @@ def get_trading_config(user_id: str) -> dict | None:
         if row is None:
             return None
         return dict(row)
-    finally:
-        conn.close()
+
+
+def list_running_trading_assets() -> list[dict]:
+    """``user_id`` and ``assets`` of every user whose bot is running, across shards."""
+
+    def running(conn: StoreConnection) -> list[dict]:
+        return [
+            dict(row)
+            for row in conn.execute(
+                """
+                SELECT tc.user_id, tc.assets
+                FROM bot_sessions AS bs
+                JOIN trading_configs AS tc ON tc.user_id = bs.user_id
+                WHERE bs.is_running = 1
+                """
+            ).fetchall()
+        ]
+
+    return [row for rows in _fan_out(running) for row in rows]
 
 
 def set_bot_session(
     *,
     user_id: str,
     is_running: bool,
-    started_at: str | None,
+    started_at: int | str | datetime | None,
     trades_opened_this_session: int,
 ) -> None:
-    now = datetime.now(timezone.utc).isoformat()
-    conn = _connect()
-    try:
+    now = now_us()
+    with _connection(user_id) as conn:
         conn.execute(
             """
             INSERT INTO bot_sessions (
@@ -321,19 +645,16 @@ def set_bot_session(
             (
                 user_id,
                 1 if is_running else 0,
-                started_at,
+                None if started_at is None else to_epoch_us(started_at),
                 trades_opened_this_session,
                 now,
             ),
         )
         conn.commit()
-    finally:
-        conn.close()
 
 
 def get_bot_session(user_id: str) -> dict | None:
-    conn = _connect()
-    try:
+    with _connection(user_id) as conn:
         row = conn.execute(
             "SELECT * FROM bot_sessions WHERE user_id = ?",
             (user_id,),
@@ -341,13 +662,10 @@ def get_bot_session(user_id: str) -> dict | None:
         if row is None:
             return None
         return dict(row)
-    finally:
-        conn.close()
 
 
 def increment_session_trades(user_id: str) -> None:
-    conn = _connect()
-    try:
+    with _connection(user_id) as conn:
         conn.execute(
             """
             UPDATE bot_sessions
@@ -355,16 +673,13 @@ def increment_session_trades(user_id: str) -> None:
                 updated_at = ?
             WHERE user_id = ?
             """,
-            (datetime.now(timezone.utc).isoformat(), user_id),
+            (now_us(), user_id),
         )
         conn.commit()
-    finally:
-        conn.close()
 
 
 def get_open_trade(*, user_id: str, symbol: str) -> dict | None:
-    conn = _connect()
-    try:
+    with _connection(user_id) as conn:
         row = conn.execute(
             "SELECT * FROM open_trades WHERE user_id = ? AND symbol = ?",
             (user_id, symbol),
@@ -372,8 +687,6 @@ def get_open_trade(*, user_id: str, symbol: str) -> dict | None:
         if row is None:
             return None
         return dict(row)
-    finally:
-        conn.close()
 
 
 def open_trade(
@@ -383,67 +696,158 @@ def open_trade(
     side: str,
     quantity: float,
     entry_price: float,
-) -> None:
-    conn = _connect()
-    try:
-        conn.execute(
-            """
+    require_running: bool = False,
+) -> dict | None:
+    """Insert an open trade; returns the new row, or None if ``symbol`` already has one.
+
+    With ``require_running`` the insert also returns None unless the user's
+    bot is running in the store, e.g. not stopped by another process since
+    the caller cached it.
+    """
+    guard = (
+        "WHERE EXISTS (SELECT 1 FROM bot_sessions WHERE user_id = ? AND is_running = 1)"
+        if require_running
+        else "WHERE true"
+    )
+    params: tuple = (user_id, symbol, side, quantity, entry_price, now_us())
+    if require_running:
+        params += (user_id,)
+    with _connection(user_id) as conn:
+        row = conn.execute(
+            f"""
             INSERT INTO open_trades (
                 user_id, symbol, side, quantity, entry_price, opened_at
             )
-            VALUES (?, ?, ?, ?, ?, ?)
+            SELECT ?, ?, ?, ?, ?, ?
+            {guard}
             ON CONFLICT(user_id, symbol) DO NOTHING
+            RETURNING id, user_id, symbol, side, quantity, entry_price, opened_at
             """,
-            (
-                user_id,
-                symbol,
-                side,
-                quantity,
-                entry_price,
-                datetime.now(timezone.utc).isoformat(),
-            ),
-        )
+            params,
+        ).fetchone()
         conn.commit()
-    finally:
-        conn.close()
-
+        return dict(row) if row is not None else None
 
-def close_trade(*, trade_id: int, close_price: float, pnl: float, reason: str) -> None:
-    conn = _connect()
-    try:
-        row = conn.execute(
-            "SELECT * FROM open_trades WHERE id = ?",
-            (trade_id,),
-        ).fetchone()
-        if row is None:
-            return
 
-        trade = dict(row)
-        conn.execute(
-            """
-            INSERT INTO closed_trades (
-                user_id, symbol, side, quantity, entry_price,
-                close_price, pnl, close_reason, opened_at, closed_at
+def close_trade(
+    *,
+    user_id: str,
+    trade_id: int,
+    close_price: float,
+    pnl: float,
+    reason: str,
+) -> bool:
+    return bool(close_trades_bulk([(trade_id, close_price, pnl, reason)], user_id=user_id))
+
+
+def close_trades_bulk(closes: list[tuple[int, float, float, str]], *, user_id: str) -> list[int]:
+    """Close ``user_id``'s open trades by id in one transaction.
+
+    Trade ids are only unique within a shard, so the owning user is required;
+    ids that are not open trades of ``user_id`` are skipped.
+    """
+    return close_trades_for_users({user_id: closes}).get(user_id, [])
+
+
+def close_trades_for_users(
+    closes: dict[str, list[tuple[int, float, float, str]]],
+) -> dict[str, list[int]]:
+    """Close open trades of many users with one transaction per shard.
+
+    ``closes`` maps each user to ``(trade_id, close_price, pnl, reason)``
+    tuples. Returns the ids actually closed per user; ids that are not open
+    trades of that user are skipped.
+    """
+    backend = get_backend()
+    by_shard: dict[int, dict[tuple[str, int], tuple[float, float, str]]] = {}
+    for user_id, user_closes in closes.items():
+        for trade_id, close_price, pnl, reason in user_closes:
+            pending = by_shard.setdefault(backend.shard_for(user_id), {})
+            pending.setdefault((user_id, int(trade_id)), (close_price, pnl, reason))
+
+    closed: dict[str, list[int]] = {}
+    for shard, pending in by_shard.items():
+        with _shard_connection(shard) as conn:
+            for user_id, trade_id in _close_trades(conn, pending):
+                closed.setdefault(user_id, []).append(trade_id)
+            conn.commit()
+    return closed
+
+
+def _close_trades(
+    conn: StoreConnection, pending: dict[tuple[str, int], tuple[float, float, str]]
+) -> list[tuple[str, int]]:
+    """Move ``(user_id, trade_id)`` open trades to closed_trades and daily_pnl; no commit.
+
+    Rows are deleted first and only the rows this call deleted are recorded,
+    so two concurrent closes of one trade cannot both count it: on Postgres
+    the second DELETE waits for the first to commit and then matches nothing.
+    """
+    closed_at = now_us()
+    trade_ids_by_user: dict[str, list[int]] = {}
+    for user_id, trade_id in pending:
+        trade_ids_by_user.setdefault(user_id, []).append(trade_id)
+    deleted: list[dict] = []
+    for user_id, trade_ids in trade_ids_by_user.items():
+        for offset in range(0, len(trade_ids), _MAX_IN_PARAMS):
+            chunk = trade_ids[offset : offset + _MAX_IN_PARAMS]
+            placeholders = ", ".join("?" for _ in chunk)
+            deleted.extend(
+                dict(row)
+                for row in conn.execute(
+                    f"""
+                    DELETE FROM open_trades WHERE user_id = ? AND id IN ({placeholders})
+                    RETURNING id, user_id, symbol, side, quantity, entry_price, opened_at
+                    """,
+                    [user_id, *chunk],
+                ).fetchall()
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+    if not deleted:
+        return []
+    closes = [(row, pending[(str(row["user_id"]), int(row["id"]))]) for row in deleted]
+    conn.executemany(
+        """
+        INSERT INTO closed_trades (
+            user_id, symbol, side, quantity, entry_price,
+            close_price, pnl, close_reason, opened_at, closed_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
             (
-                trade["user_id"],
-                trade["symbol"],
-                trade["side"],
-                trade["quantity"],
-                trade["entry_price"],
+                row["user_id"],
+                row["symbol"],
+                row["side"],
+                row["quantity"],
+                row["entry_price"],
                 close_price,
                 pnl,
                 reason,
-                trade["opened_at"],
-                datetime.now(timezone.utc).isoformat(),
-            ),
-        )
-        conn.execute("DELETE FROM open_trades WHERE id = ?", (trade_id,))
-        conn.commit()
-    finally:
-        conn.close()
+                row["opened_at"],
+                closed_at,
+            )
+            for row, (close_price, pnl, reason) in closes
+        ],
+    )
+    realized: dict[str, tuple[float, int]] = {}
+    for row, (_, pnl, _) in closes:
+        total, count = realized.get(str(row["user_id"]), (0.0, 0))
+        realized[str(row["user_id"])] = (total + pnl, count + 1)
+    conn.executemany(
+        """
+        INSERT INTO daily_pnl (user_id, trading_day, realized_pnl, closed_trades, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, trading_day) DO UPDATE SET
+            realized_pnl = daily_pnl.realized_pnl + excluded.realized_pnl,
+            closed_trades = daily_pnl.closed_trades + excluded.closed_trades,
+            updated_at = excluded.updated_at
+        """,
+        [
+            (user_id, utc_day(closed_at), total, count, closed_at)
+            for user_id, (total, count) in realized.items()
+        ],
+    )
+    return [(str(row["user_id"]), int(row["id"])) for row in deleted]
 
 
 def create_ai_decision(
@@ -457,31 +861,34 @@ def create_ai_decision(
     trend_strength: float,
     volatility: float,
 ) -> None:
-    conn = _connect()
-    try:
-        conn.execute(
-            """
-            INSERT INTO ai_decisions (
-                user_id, symbol, price, approved, confidence,
-                reasons, trend_strength, volatility, created_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                user_id,
-                symbol,
-                price,
-                1 if approved else 0,
-                confidence,
-                ",".join(reasons),
-                trend_strength,
-                volatility,
-                datetime.now(timezone.utc).isoformat(),
-            ),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    _write_audit(
+        user_id,
+        _INSERT_AI_DECISION_SQL,
+        (
+            user_id,
+            symbol,
+            price,
+            1 if approved else 0,
+            confidence,
+            ",".join(reasons),
+            trend_strength,
+            volatility,
+            now_us(),
+        ),
+    )
+
+
+_UPSERT_RISK_CONFIG_SQL = """
+    INSERT INTO risk_configs (
+        user_id, daily_profit_target, daily_loss_limit, allocated_capital, updated_at
+    )
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        daily_profit_target = excluded.daily_profit_target,
+        daily_loss_limit = excluded.daily_loss_limit,
+        allocated_capital = excluded.allocated_capital,
+        updated_at = excluded.updated_at
+"""
 
 
 def upsert_risk_config(
@@ -491,31 +898,35 @@ def upsert_risk_config(
     daily_loss_limit: float,
     allocated_capital: float,
 ) -> None:
-    now = datetime.now(timezone.utc).isoformat()
-    conn = _connect()
-    try:
+    with _connection(user_id) as conn:
         conn.execute(
-            """
-            INSERT INTO risk_configs (
-                user_id, daily_profit_target, daily_loss_limit, allocated_capital, updated_at
-            )
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(user_id) DO UPDATE SET
-                daily_profit_target = excluded.daily_profit_target,
-                daily_loss_limit = excluded.daily_loss_limit,
-                allocated_capital = excluded.allocated_capital,
-                updated_at = excluded.updated_at
-            """,
-            (user_id, daily_profit_target, daily_loss_limit, allocated_capital, now),
+            _UPSERT_RISK_CONFIG_SQL,
+            (user_id, daily_profit_target, daily_loss_limit, allocated_capital, now_us()),
         )
         conn.commit()
-    finally:
-        conn.close()
+
+
+def upsert_risk_configs(configs: list[dict]) -> list[dict]:
+    """Bulk :func:`upsert_risk_config`; returns the stored rows in input order."""
+    now = now_us()
+    return _bulk_upsert(
+        "risk_configs",
+        _UPSERT_RISK_CONFIG_SQL,
+        [
+            (
+                config["user_id"],
+                config["daily_profit_target"],
+                config["daily_loss_limit"],
+                config["allocated_capital"],
+                now,
+            )
+            for config in configs
+        ],
+    )
 
 
 def get_risk_config(user_id: str) -> dict | None:
-    conn = _connect()
-    try:
+    with _connection(user_id) as conn:
         row = conn.execute(
             "SELECT * FROM risk_configs WHERE user_id = ?",
             (user_id,),
@@ -523,32 +934,35 @@ def get_risk_config(user_id: str) -> dict | None:
         if row is None:
             return None
         return dict(row)
-    finally:
-        conn.close()
+
+
+_UPSERT_SESSION_CONFIG_SQL = """
+    INSERT INTO session_configs (user_id, duration_minutes, updated_at)
+    VALUES (?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        duration_minutes = excluded.duration_minutes,
+        updated_at = excluded.updated_at
+"""
 
 
 def upsert_session_config(*, user_id: str, duration_minutes: int) -> None:
-    now = datetime.now(timezone.utc).isoformat()
-    conn = _connect()
-    try:
-        conn.execute(
-            """
-            INSERT INTO session_configs (user_id, duration_minutes, updated_at)
-            VALUES (?, ?, ?)
-            ON CONFLICT(user_id) DO UPDATE SET
-                duration_minutes = excluded.duration_minutes,
-                updated_at = excluded.updated_at
-            """,
-            (user_id, duration_minutes, now),
-        )
+    with _connection(user_id) as conn:
+        conn.execute(_UPSERT_SESSION_CONFIG_SQL, (user_id, duration_minutes, now_us()))
         conn.commit()
-    finally:
-        conn.close()
+
+
+def upsert_session_configs(configs: list[dict]) -> list[dict]:
+    """Bulk :func:`upsert_session_config`; returns the stored rows in input order."""
+    now = now_us()
+    return _bulk_upsert(
+        "session_configs",
+        _UPSERT_SESSION_CONFIG_SQL,
+        [(config["user_id"], config["duration_minutes"], now) for config in configs],
+    )
 
 
 def get_session_config(user_id: str) -> dict | None:
-    conn = _connect()
-    try:
+    with _connection(user_id) as conn:
         row = conn.execute(
             "SELECT * FROM session_configs WHERE user_id = ?",
             (user_id,),
@@ -556,37 +970,290 @@ def get_session_config(user_id: str) -> dict | None:
         if row is None:
             return None
         return dict(row)
-    finally:
-        conn.close()
 
 
 def get_realized_pnl_today(user_id: str) -> float:
-    now = datetime.now(timezone.utc)
-    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
-    end_of_day = now.replace(hour=23, minute=59, second=59, microsecond=999999).isoformat()
-
-    conn = _connect()
-    try:
+    trading_day = utc_day(now_us())
+    with _connection(user_id) as conn:
         row = conn.execute(
             """
-            SELECT COALESCE(SUM(pnl), 0.0) AS realized_pnl
-            FROM closed_trades
-            WHERE user_id = ?
-              AND closed_at >= ?
-              AND closed_at <= ?
+            SELECT realized_pnl
+            FROM daily_pnl
+            WHERE user_id = ? AND trading_day = ?
             """,
-            (user_id, start_of_day, end_of_day),
+            (user_id, trading_day),
         ).fetchone()
         if row is None:
             return 0.0
         return float(row["realized_pnl"])
-    finally:
-        conn.close()
 
 
-def get_open_exposure(user_id: str) -> float:
-    conn = _connect()
+def rebuild_daily_pnl() -> int:
+    """Recompute daily_pnl from the hot closed_trades rows.
+
+    Days older than the closed_trades archive watermark are kept as they are:
+    their trades now live in the Parquet archive, not in closed_trades.
+    """
+    return sum(_fan_out(_rebuild_shard_daily_pnl))
+
+
+def _rebuild_shard_daily_pnl(conn: StoreConnection) -> int:
+    get_backend().begin_exclusive(conn)
     try:
+        _rebuild_daily_pnl(conn, since_day=_get_archive_watermark(conn, "closed_trades"))
+        count = int(conn.execute("SELECT COUNT(*) AS total FROM daily_pnl").fetchone()["total"])
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return count
+
+
+def _rebuild_daily_pnl(conn: StoreConnection, since_day: str | None = None) -> None:
+    since_day = since_day or ""
+    day = get_backend().utc_day_sql("closed_at")
+    conn.execute("DELETE FROM daily_pnl WHERE trading_day >= ?", (since_day,))
+    conn.execute(
+        f"""
+        INSERT INTO daily_pnl (user_id, trading_day, realized_pnl, closed_trades, updated_at)
+        SELECT user_id, {day}, SUM(pnl), COUNT(*), ?
+        FROM closed_trades
+        WHERE closed_at >= ?
+        GROUP BY user_id, {day}
+        """,
+        (now_us(), day_start_us(since_day) if since_day else 0),
+    )
+
+
+def get_archive() -> ParquetArchive:
+    return ParquetArchive(get_settings().archive_dir)
+
+
+def get_archive_watermark(table: str) -> str | None:
+    """Oldest archive watermark of ``table`` across shards."""
+    watermarks = _fan_out(lambda conn: _get_archive_watermark(conn, table))
+    known = [watermark for watermark in watermarks if watermark is not None]
+    if len(known) < len(watermarks):
+        return None
+    return min(known)
+
+
+def _get_archive_watermark(conn: StoreConnection, table: str) -> str | None:
+    row = conn.execute(
+        "SELECT archived_before FROM archive_watermarks WHERE table_name = ?",
+        (table,),
+    ).fetchone()
+    return None if row is None else str(row["archived_before"])
+
+
+def archive_expired_rows(
+    *,
+    retention_days: int | None = None,
+    batch_size: int | None = None,
+    now: datetime | None = None,
+) -> dict[str, int]:
+    """Move rows older than the retention window from the hot tables to Parquet.
+
+    The cutoff is the start of the UTC day ``retention_days`` ago, so a
+    trading day is either entirely hot or entirely archived. Each batch is
+    written to the archive before its rows are deleted; a crash in between
+    leaves the rows in both places and the next run rewrites the same part.
+    Returns the number of rows archived per table.
+    """
+    settings = get_settings()
+    retention_days = settings.STORE_RETENTION_DAYS if retention_days is None else retention_days
+    batch_size = max(1, batch_size or settings.STORE_ARCHIVE_BATCH_SIZE)
+    now = now or from_epoch_us(now_us())
+    cutoff_day = (now - timedelta(days=retention_days)).date().isoformat()
+    cutoff = day_start_us(cutoff_day)
+    archive = get_archive()
+    flush_journal()
+
+    archived: dict[str, int] = {}
+    for table, timestamp in ARCHIVE_TIMESTAMPS.items():
+        columns = ", ".join(ARCHIVE_SCHEMAS[table].names)
+        archived[table] = 0
+        for shard in _shards():
+            with _shard_connection(shard) as conn:
+                _advance_archive_watermark(conn, table, cutoff_day)
+                conn.commit()
+                while True:
+                    rows = [
+                        dict(row)
+                        for row in conn.execute(
+                            f"""
+                            SELECT {columns}
+                            FROM {table}
+                            WHERE {timestamp} < ?
+                            ORDER BY {timestamp}, id
+                            LIMIT ?
+                            """,
+                            (cutoff, batch_size),
+                        ).fetchall()
+                    ]
+                    if not rows:
+                        break
+                    archive.write(table, rows, shard=shard)
+                    ids = [int(row["id"]) for row in rows]
+                    for offset in range(0, len(ids), _MAX_IN_PARAMS):
+                        chunk = ids[offset : offset + _MAX_IN_PARAMS]
+                        placeholders = ", ".join("?" for _ in chunk)
+                        conn.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", chunk)
+                    conn.commit()
+                    archived[table] += len(rows)
+                    if len(rows) < batch_size:
+                        break
+    return archived
+
+
+def _advance_archive_watermark(conn: StoreConnection, table: str, archived_before: str) -> None:
+    conn.execute(
+        """
+        INSERT INTO archive_watermarks (table_name, archived_before, updated_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(table_name) DO UPDATE SET
+            archived_before = excluded.archived_before,
+            updated_at = excluded.updated_at
+        WHERE excluded.archived_before > archive_watermarks.archived_before
+        """,
+        (table, archived_before, now_us()),
+    )
+
+
+def _with_archived_rows(
+    conn: StoreConnection,
+    table: str,
+    hot_rows: list[dict],
+    *,
+    user_id: str,
+    since: int | None,
+    limit: int,
+) -> list[dict]:
+    """Merge archived rows into ``hot_rows`` when ``since`` reaches past the hot window."""
+    if since is None or len(hot_rows) >= limit:
+        return hot_rows
+    watermark = _get_archive_watermark(conn, table)
+    since_day = utc_day(since)
+    if watermark is None or since_day >= watermark:
+        return hot_rows
+
+    timestamp = ARCHIVE_TIMESTAMPS[table]
+    merged = {int(row["id"]): row for row in hot_rows}
+    for row in get_archive().read(table, user_id=user_id, since_day=since_day, until_day=watermark):
+        if row[timestamp] >= since:
+            merged.setdefault(int(row["id"]), row)
+    rows = sorted(merged.values(), key=lambda row: (row[timestamp], row["id"]), reverse=True)
+    return rows[:limit]
+
+
+@dataclass(slots=True)
+class UserTradingState:
+    user_id: str
+    trading_config: dict | None
+    bot_session: dict | None
+    session_config: dict | None
+    risk_config: dict | None
+    realized_pnl_today: float
+    open_trades: list[dict]
+    open_trade: dict | None
+    open_exposure: float
+    license: dict | None = None
+
+
+_STATE_COLUMNS: dict[str, tuple[str, tuple[str, ...]]] = {
+    "trading_config": (
+        "tc",
+        (
+            "user_id",
+            "assets",
+            "timeframe",
+            "max_trades_per_session",
+            "quantity",
+            "profit_threshold",
+            "loss_threshold",
+            "updated_at",
+        ),
+    ),
+    "bot_session": (
+        "bs",
+        ("user_id", "is_running", "started_at", "trades_opened_this_session", "updated_at"),
+    ),
+    "session_config": ("sc", ("user_id", "duration_minutes", "updated_at")),
+    "risk_config": (
+        "rc",
+        ("user_id", "daily_profit_target", "daily_loss_limit", "allocated_capital", "updated_at"),
+    ),
+}
+
+_STATE_SELECT_COLUMNS = ", ".join(
+    f"{alias}.{column} AS {alias}_{column}"
+    for alias, columns in _STATE_COLUMNS.values()
+    for column in columns
+)
+
+_STATE_SQL = f"""
+    SELECT {_STATE_SELECT_COLUMNS}, dp.realized_pnl AS dp_realized_pnl
+    FROM (SELECT ? AS user_id) AS u
+    LEFT JOIN trading_configs AS tc ON tc.user_id = u.user_id
+    LEFT JOIN bot_sessions AS bs ON bs.user_id = u.user_id
+    LEFT JOIN session_configs AS sc ON sc.user_id = u.user_id
+    LEFT JOIN risk_configs AS rc ON rc.user_id = u.user_id
+    LEFT JOIN daily_pnl AS dp ON dp.user_id = u.user_id AND dp.trading_day = ?
+"""
+
+
+def get_user_trading_state(
+    user_id: str,
+    symbol: str | None = None,
+    *,
+    include_license: bool = False,
+) -> UserTradingState:
+    trading_day = utc_day(now_us())
+    with _connection(user_id) as conn:
+        row = conn.execute(_STATE_SQL, (user_id, trading_day)).fetchone()
+        open_trades = [
+            dict(item)
+            for item in conn.execute(
+                """
+                SELECT id, user_id, symbol, side, quantity, entry_price, opened_at
+                FROM open_trades
+                WHERE user_id = ?
+                ORDER BY opened_at DESC
+                """,
+                (user_id,),
+            ).fetchall()
+        ]
+    license_row = get_license_by_user(user_id) if include_license else None
+
+    sections: dict[str, dict | None] = {}
+    for name, (alias, columns) in _STATE_COLUMNS.items():
+        if row[f"{alias}_user_id"] is None:
+            sections[name] = None
+        else:
+            sections[name] = {column: row[f"{alias}_{column}"] for column in columns}
+
+    open_trade = None
+    if symbol is not None:
+        open_trade = next((trade for trade in open_trades if trade["symbol"] == symbol), None)
+
+    return UserTradingState(
+        user_id=user_id,
+        trading_config=sections["trading_config"],
+        bot_session=sections["bot_session"],
+        session_config=sections["session_config"],
+        risk_config=sections["risk_config"],
+        realized_pnl_today=float(row["dp_realized_pnl"] or 0.0),
+        open_trades=open_trades,
+        open_trade=open_trade,
+        open_exposure=sum(
+            float(trade["entry_price"]) * float(trade["quantity"]) for trade in open_trades
+        ),
+        license=license_row,
+    )
+
+
+def get_open_exposure(user_id: str) -> float:
+    with _connection(user_id) as conn:
         row = conn.execute(
             """
             SELECT COALESCE(SUM(entry_price * quantity), 0.0) AS exposure
@@ -598,13 +1265,10 @@ def get_open_exposure(user_id: str) -> float:
         if row is None:
             return 0.0
         return float(row["exposure"])
-    finally:
-        conn.close()
 
 
 def get_open_trades(user_id: str) -> list[dict]:
-    conn = _connect()
-    try:
+    with _connection(user_id) as conn:
         rows = conn.execute(
             """
             SELECT id, user_id, symbol, side, quantity, entry_price, opened_at
@@ -615,32 +1279,75 @@ def get_open_trades(user_id: str) -> list[dict]:
             (user_id,),
         ).fetchall()
         return [dict(row) for row in rows]
-    finally:
-        conn.close()
 
 
-def get_closed_trades(user_id: str, limit: int = 100) -> list[dict]:
-    conn = _connect()
-    try:
+def get_closed_trades(
+    user_id: str,
+    limit: int = 100,
+    *,
+    since: int | str | datetime | None = None,
+) -> list[dict]:
+    """Most recent closed trades, newest first.
+
+    With ``since`` (epoch-us, or an ISO timestamp or date) only trades closed at
+    or after it are returned, including archived trades older than the hot window.
+    """
+    since = None if since is None else to_epoch_us(since)
+    with _connection(user_id) as conn:
         rows = conn.execute(
             """
             SELECT id, user_id, symbol, side, quantity, entry_price,
                    close_price, pnl, close_reason, opened_at, closed_at
             FROM closed_trades
-            WHERE user_id = ?
+            WHERE user_id = ? AND closed_at >= ?
             ORDER BY closed_at DESC
             LIMIT ?
             """,
-            (user_id, limit),
+            (user_id, since or 0, limit),
         ).fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        conn.close()
+        return _with_archived_rows(
+            conn,
+            "closed_trades",
+            [dict(row) for row in rows],
+            user_id=user_id,
+            since=since,
+            limit=limit,
+        )
+
+
+def get_ai_decisions(
+    user_id: str,
+    limit: int = 100,
+    *,
+    since: int | str | datetime | None = None,
+) -> list[dict]:
+    """Most recent AI filter decisions, newest first; see ``get_closed_trades``."""
+    since = None if since is None else to_epoch_us(since)
+    flush_journal()
+    with _connection(user_id) as conn:
+        rows = conn.execute(
+            """
+            SELECT id, user_id, symbol, price, approved, confidence, reasons,
+                   trend_strength, volatility, created_at
+            FROM ai_decisions
+            WHERE user_id = ? AND created_at >= ?
+            ORDER BY created_at DESC
+            LIMIT ?
+            """,
+            (user_id, since or 0, limit),
+        ).fetchall()
+        return _with_archived_rows(
+            conn,
+            "ai_decisions",
+            [dict(row) for row in rows],
+            user_id=user_id,
+            since=since,
+            limit=limit,
+        )
 
 
 def get_unrealized_pnl(user_id: str, current_prices: dict[str, float]) -> float:
-    conn = _connect()
-    try:
+    with _connection(user_id) as conn:
         rows = conn.execute(
             """
             SELECT symbol, side, quantity, entry_price
@@ -649,22 +1356,23 @@ def get_unrealized_pnl(user_id: str, current_prices: dict[str, float]) -> float:
             """,
             (user_id,),
         ).fetchall()
-        total = 0.0
-        for row in rows:
-            trade = dict(row)
-            symbol = trade["symbol"]
-            if symbol not in current_prices:
-                continue
-            current = float(current_prices[symbol])
-            quantity = float(trade["quantity"])
-            entry = float(trade["entry_price"])
-            if trade["side"] == "BUY":
-                total += (current - entry) * quantity
-            else:
-                total += (entry - current) * quantity
-        return total
-    finally:
-        conn.close()
+        return calculate_unrealized_pnl([dict(row) for row in rows], current_prices)
+
+
+def calculate_unrealized_pnl(open_trades: list[dict], current_prices: dict[str, float]) -> float:
+    total = 0.0
+    for trade in open_trades:
+        symbol = trade["symbol"]
+        if symbol not in current_prices:
+            continue
+        current = float(current_prices[symbol])
+        quantity = float(trade["quantity"])
+        entry = float(trade["entry_price"])
+        if trade["side"] == "BUY":
+            total += (current - entry) * quantity
+        else:
+            total += (entry - current) * quantity
+    return total
 
 
 def create_notification(
@@ -675,30 +1383,23 @@ def create_notification(
     message: str,
     channel: str,
 ) -> None:
-    conn = _connect()
-    try:
-        conn.execute(
-            """
-            INSERT INTO notifications (user_id, event_type, title, message, channel, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                user_id,
-                event_type,
-                title,
-                message,
-                channel,
-                datetime.now(timezone.utc).isoformat(),
-            ),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    _write_audit(
+        user_id,
+        _INSERT_NOTIFICATION_SQL,
+        (
+            user_id,
+            event_type,
+            title,
+            message,
+            channel,
+            now_us(),
+        ),
+    )
 
 
 def list_notifications(user_id: str, channel: str = "in_app", limit: int = 100) -> list[dict]:
-    conn = _connect()
-    try:
+    flush_journal()
+    with _connection(user_id) as conn:
         rows = conn.execute(
             """
             SELECT id, user_id, event_type, title, message, channel, created_at
@@ -710,27 +1411,28 @@ def list_notifications(user_id: str, channel: str = "in_app", limit: int = 100)
             (user_id, channel, limit),
         ).fetchall()
         return [dict(row) for row in rows]
-    finally:
-        conn.close()
 
 
-def create_license(*, license_key: str, expires_at: str, status: str = "active") -> dict:
-    now = datetime.now(timezone.utc).isoformat()
-    conn = _connect()
-    try:
+def create_license(
+    *,
+    license_key: str,
+    expires_at: int | str | datetime,
+    status: str = "active",
+) -> dict:
+    now = now_us()
+    with _connection() as conn:
         cursor = conn.execute(
             """
             INSERT INTO licenses (
                 license_key, status, assigned_user_id, expires_at, created_at, updated_at
             )
             VALUES (?, ?, NULL, ?, ?, ?)
+            RETURNING id
             """,
-            (license_key, status, expires_at, now, now),
+            (license_key, status, to_epoch_us(expires_at), now, now),
         )
-        license_id = int(cursor.lastrowid)
+        license_id = int(cursor.fetchone()["id"])
         conn.commit()
-    finally:
-        conn.close()
 
     row = get_license_by_id(license_id)
     if row is None:
@@ -745,8 +1447,7 @@ def create_license(*, license_key: str, expires_at: str, status: str = "active")
 
 
 def get_license_by_key(license_key: str) -> dict | None:
-    conn = _connect()
-    try:
+    with _connection() as conn:
         row = conn.execute(
             "SELECT * FROM licenses WHERE license_key = ?",
             (license_key,),
@@ -754,13 +1455,10 @@ def get_license_by_key(license_key: str) -> dict | None:
         if row is None:
             return None
         return dict(row)
-    finally:
-        conn.close()
 
 
 def get_license_by_id(license_id: int) -> dict | None:
-    conn = _connect()
-    try:
+    with _connection() as conn:
         row = conn.execute(
             "SELECT * FROM licenses WHERE id = ?",
             (license_id,),
@@ -768,13 +1466,10 @@ def get_license_by_id(license_id: int) -> dict | None:
         if row is None:
             return None
         return dict(row)
-    finally:
-        conn.close()
 
 
 def get_license_by_user(user_id: str) -> dict | None:
-    conn = _connect()
-    try:
+    with _connection() as conn:
         row = conn.execute(
             """
             SELECT *
@@ -788,8 +1483,6 @@ def get_license_by_user(user_id: str) -> dict | None:
         if row is None:
             return None
         return dict(row)
-    finally:
-        conn.close()
 
 
 def activate_license_for_user(*, license_key: str, user_id: str) -> dict | None:
@@ -800,9 +1493,8 @@ def activate_license_for_user(*, license_key: str, user_id: str) -> dict | None:
     if row["assigned_user_id"] not in (None, user_id):
         return row
 
-    now = datetime.now(timezone.utc).isoformat()
-    conn = _connect()
-    try:
+    now = now_us()
+    with _connection() as conn:
         conn.execute(
             """
             UPDATE licenses
@@ -812,8 +1504,6 @@ def activate_license_for_user(*, license_key: str, user_id: str) -> dict | None:
             (user_id, now, license_key),
         )
         conn.commit()
-    finally:
-        conn.close()
 
     updated = get_license_by_key(license_key)
     if updated is None:
@@ -831,18 +1521,17 @@ def update_license(
     *,
     license_id: int,
     status: str | None = None,
-    expires_at: str | None = None,
+    expires_at: int | str | datetime | None = None,
 ) -> dict | None:
     row = get_license_by_id(license_id)
     if row is None:
         return None
 
     new_status = status or row["status"]
-    new_expires_at = expires_at or row["expires_at"]
-    now = datetime.now(timezone.utc).isoformat()
+    new_expires_at = row["expires_at"] if expires_at is None else to_epoch_us(expires_at)
+    now = now_us()
 
-    conn = _connect()
-    try:
+    with _connection() as conn:
         conn.execute(
             """
             UPDATE licenses
@@ -852,8 +1541,6 @@ def update_license(
             (new_status, new_expires_at, now, license_id),
         )
         conn.commit()
-    finally:
-        conn.close()
 
     updated = get_license_by_id(license_id)
     if updated is not None:
@@ -879,8 +1566,7 @@ def revoke_license(license_id: int) -> dict | None:
 
 
 def list_licenses(limit: int = 200) -> list[dict]:
-    conn = _connect()
-    try:
+    with _connection() as conn:
         rows = conn.execute(
             """
             SELECT *
@@ -891,13 +1577,10 @@ def list_licenses(limit: int = 200) -> list[dict]:
             (limit,),
         ).fetchall()
         return [dict(row) for row in rows]
-    finally:
-        conn.close()
 
 
 def create_license_event(*, license_id: int, event_type: str, actor: str, metadata: str | None) -> None:
-    conn = _connect()
-    try:
+    with _connection() as conn:
         conn.execute(
             """
             INSERT INTO license_events (license_id, event_type, actor, metadata, created_at)
@@ -908,16 +1591,17 @@ def create_license_event(*, license_id: int, event_type: str, actor: str, metada
                 event_type,
                 actor,
                 metadata,
-                datetime.now(timezone.utc).isoformat(),
+                now_us(),
             ),
         )
         conn.commit()
-    finally:
-        conn.close()
 
 
 def is_license_valid_for_user(user_id: str) -> tuple[bool, str]:
-    license_row = get_license_by_user(user_id)
+    return check_license(get_license_by_user(user_id))
+
+
+def check_license(license_row: dict | None) -> tuple[bool, str]:
     if license_row is None:
         return False, "No license is activated"
 
@@ -927,9 +1611,7 @@ def is_license_valid_for_user(user_id: str) -> tuple[bool, str]:
     if status == "expired":
         return False, "License is expired"
 
-    now = datetime.now(timezone.utc)
-    expires_at = datetime.fromisoformat(str(license_row["expires_at"]))
-    if expires_at < now:
+    if int(license_row["expires_at"]) < now_us():
         update_license(license_id=int(license_row["id"]), status="expired")
         return False, "License is expired"
 
@@ -937,49 +1619,61 @@ def is_license_valid_for_user(user_id: str) -> tuple[bool, str]:
 
 
 def get_idempotent_response(*, idempotency_key: str, endpoint: str) -> dict | None:
-    conn = _connect()
-    try:
-        row = conn.execute(
-            """
-            SELECT response_json
-            FROM idempotency_records
-            WHERE idempotency_key = ? AND endpoint = ?
-            """,
-            (idempotency_key, endpoint),
-        ).fetchone()
-        if row is None:
-            return None
-        return json.loads(str(row["response_json"]))
-    finally:
-        conn.close()
+    return get_idempotent_responses([idempotency_key], endpoint=endpoint).get(idempotency_key)
+
+
+def get_idempotent_responses(idempotency_keys: list[str], *, endpoint: str) -> dict[str, dict]:
+    """Stored responses for whichever of ``idempotency_keys`` have one, keyed by key."""
+    keys = list(dict.fromkeys(idempotency_keys))
+    responses: dict[str, dict] = {}
+    with _connection() as conn:
+        for offset in range(0, len(keys), _MAX_IN_PARAMS):
+            chunk = keys[offset : offset + _MAX_IN_PARAMS]
+            placeholders = ", ".join("?" for _ in chunk)
+            for row in conn.execute(
+                f"""
+                SELECT idempotency_key, response_json
+                FROM idempotency_records
+                WHERE idempotency_key IN ({placeholders}) AND endpoint = ?
+                """,
+                [*chunk, endpoint],
+            ).fetchall():
+                responses[str(row["idempotency_key"])] = json.loads(str(row["response_json"]))
+    return responses
+
+
+_SAVE_IDEMPOTENT_RESPONSE_SQL = """
+    INSERT INTO idempotency_records (
+        idempotency_key, endpoint, response_json, created_at
+    )
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(idempotency_key) DO UPDATE SET
+        endpoint = excluded.endpoint,
+        response_json = excluded.response_json,
+        created_at = excluded.created_at
+"""
 
 
 def save_idempotent_response(*, idempotency_key: str, endpoint: str, response: dict) -> None:
-    conn = _connect()
-    try:
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO idempotency_records (
-                idempotency_key, endpoint, response_json, created_at
-            )
-            VALUES (?, ?, ?, ?)
-            """,
-            (
-                idempotency_key,
-                endpoint,
-                json.dumps(response),
-                datetime.now(timezone.utc).isoformat(),
-            ),
+    save_idempotent_responses({idempotency_key: response}, endpoint=endpoint)
+
+
+def save_idempotent_responses(responses: dict[str, dict], *, endpoint: str) -> None:
+    if not responses:
+        return
+    now = now_us()
+    with _connection() as conn:
+        conn.executemany(
+            _SAVE_IDEMPOTENT_RESPONSE_SQL,
+            [(key, endpoint, json.dumps(response), now) for key, response in responses.items()],
         )
         conn.commit()
-    finally:
-        conn.close()
 
 
 def stop_all_running_bots() -> int:
-    now = datetime.now(timezone.utc).isoformat()
-    conn = _connect()
-    try:
+    now = now_us()
+
+    def stop(conn: StoreConnection) -> int:
         cursor = conn.execute(
             """
             UPDATE bot_sessions
@@ -991,5 +1685,5 @@ def stop_all_running_bots() -> int:
         )
         conn.commit()
         return int(cursor.rowcount)
-    finally:
-        conn.close()
+
+    return sum(_fan_out(stop))
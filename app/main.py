@@ -15,18 +15,28 @@ from app.core.database import init_db
 from app.core.events import shutdown_services
 from app.core.exceptions import AppException, app_exception_handler
 from app.core.redis import init_redis
+from app.routes.trading import (
+    start_engine_journal,
+    start_session_timers,
+    stop_engine_journal,
+    stop_session_timers,
+)
 from app.config import settings
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     await init_db()
+    start_engine_journal()
+    start_session_timers()
     redis_ready = await init_redis()
     listener_task = start_redis_listener_task() if redis_ready else None
     yield
     if listener_task:
         listener_task.cancel()
+    await stop_session_timers()
     await shutdown_services()
+    stop_engine_journal()
 
 
 def create_app() -> FastAPI:
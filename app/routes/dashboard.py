@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from datetime import datetime
+
 from fastapi import APIRouter, Query
 
-from app.db import store
+from app.db import async_store
 from app.schemas.dashboard import (
     ClosedTradeItem,
     DailyPnlResponse,
@@ -17,30 +19,32 @@ dashboard_service = DashboardService()
 
 
 @router.get("/summary", response_model=DashboardSummaryResponse)
-def dashboard_summary(user_id: str = Query(..., min_length=1)) -> DashboardSummaryResponse:
-    return DashboardSummaryResponse(**dashboard_service.summary(user_id))
+async def dashboard_summary(user_id: str = Query(..., min_length=1)) -> DashboardSummaryResponse:
+    summary = await async_store.run(dashboard_service.summary, user_id)
+    return DashboardSummaryResponse(**summary)
 
 
 @router.get("/trades/open", response_model=list[OpenTradeItem])
-def open_trades(user_id: str = Query(..., min_length=1)) -> list[OpenTradeItem]:
-    rows = store.get_open_trades(user_id)
+async def open_trades(user_id: str = Query(..., min_length=1)) -> list[OpenTradeItem]:
+    rows = await async_store.get_open_trades(user_id)
     return [OpenTradeItem(**row) for row in rows]
 
 
 @router.get("/trades/closed", response_model=list[ClosedTradeItem])
-def closed_trades(
+async def closed_trades(
     user_id: str = Query(..., min_length=1),
     limit: int = Query(default=100, ge=1, le=500),
+    since: datetime | None = Query(default=None),
 ) -> list[ClosedTradeItem]:
-    rows = store.get_closed_trades(user_id, limit=limit)
+    rows = await async_store.get_closed_trades(user_id, limit=limit, since=since)
     return [ClosedTradeItem(**row) for row in rows]
 
 
 @router.get("/pnl/daily", response_model=DailyPnlResponse)
-def daily_pnl(user_id: str = Query(..., min_length=1)) -> DailyPnlResponse:
-    prices = dashboard_service.current_prices(user_id)
-    realized = store.get_realized_pnl_today(user_id)
-    unrealized = store.get_unrealized_pnl(user_id, prices)
+async def daily_pnl(user_id: str = Query(..., min_length=1)) -> DailyPnlResponse:
+    prices = await async_store.run(dashboard_service.current_prices, user_id)
+    realized = await async_store.get_realized_pnl_today(user_id)
+    unrealized = await async_store.get_unrealized_pnl(user_id, prices)
     return DailyPnlResponse(
         user_id=user_id,
         realized_pnl=round(realized, 6),
@@ -50,10 +54,10 @@ def daily_pnl(user_id: str = Query(..., min_length=1)) -> DailyPnlResponse:
 
 
 @router.get("/notifications", response_model=list[NotificationItem])
-def notifications(
+async def notifications(
     user_id: str = Query(..., min_length=1),
     channel: str = Query(default="in_app", pattern="^(in_app|email)$"),
     limit: int = Query(default=100, ge=1, le=500),
 ) -> list[NotificationItem]:
-    rows = store.list_notifications(user_id=user_id, channel=channel, limit=limit)
+    rows = await async_store.list_notifications(user_id=user_id, channel=channel, limit=limit)
     return [NotificationItem(**row) for row in rows]
@@ -2,7 +2,11 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 
+from app.db import store
+from app.services.admission import admission
 from app.services.latency_metrics import latency_metrics
+from app.services.tick_actors import tick_actors
+from app.services.tick_stream import tick_streams
 
 router = APIRouter(tags=["metrics"])
 
@@ -10,3 +14,23 @@ router = APIRouter(tags=["metrics"])
 @router.get("/metrics/latency")
 def get_latency_metrics() -> dict[str, dict[str, float | int]]:
     return latency_metrics.snapshot()
+
+
+@router.get("/metrics/store")
+def get_store_metrics() -> dict[str, float | int]:
+    return store.get_journal().stats()
+
+
+@router.get("/metrics/actors")
+def get_actor_metrics() -> list[dict[str, int]]:
+    return tick_actors.stats()
+
+
+@router.get("/metrics/streams")
+def get_stream_metrics() -> list[dict[str, int | str]]:
+    return tick_streams.snapshot()
+
+
+@router.get("/metrics/admission")
+def get_admission_metrics() -> dict[str, dict[str, object]]:
+    return admission.stats()
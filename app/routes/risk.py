@@ -2,78 +2,99 @@ from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException
 
-from app.db import store
+from app.db import async_store
 from app.schemas.risk import (
+    RiskConfigBulkResponse,
+    RiskConfigBulkUpsertRequest,
     RiskConfigResponse,
     RiskConfigUpsertRequest,
+    SessionConfigBulkResponse,
+    SessionConfigBulkUpsertRequest,
     SessionConfigResponse,
     SessionConfigUpsertRequest,
 )
+from app.services.engine_state import engine_state_cache
 
 router = APIRouter(tags=["risk"])
 
 
+def _risk_config_response(row: dict) -> RiskConfigResponse:
+    return RiskConfigResponse(
+        user_id=row["user_id"],
+        daily_profit_target=float(row["daily_profit_target"]),
+        daily_loss_limit=float(row["daily_loss_limit"]),
+        allocated_capital=float(row["allocated_capital"]),
+        updated_at=row["updated_at"],
+    )
+
+
+def _session_config_response(row: dict) -> SessionConfigResponse:
+    return SessionConfigResponse(
+        user_id=row["user_id"],
+        duration_minutes=int(row["duration_minutes"]),
+        updated_at=row["updated_at"],
+    )
+
+
 @router.put("/risk/config", response_model=RiskConfigResponse)
-def upsert_risk_config(payload: RiskConfigUpsertRequest) -> RiskConfigResponse:
-    store.upsert_risk_config(
+async def upsert_risk_config(payload: RiskConfigUpsertRequest) -> RiskConfigResponse:
+    await async_store.upsert_risk_config(
         user_id=payload.user_id,
         daily_profit_target=payload.daily_profit_target,
         daily_loss_limit=payload.daily_loss_limit,
         allocated_capital=payload.allocated_capital,
     )
-    row = store.get_risk_config(payload.user_id)
+    engine_state_cache.invalidate(payload.user_id)
+    row = await async_store.get_risk_config(payload.user_id)
     if row is None:
         raise HTTPException(status_code=500, detail="Failed to persist risk config")
 
-    return RiskConfigResponse(
-        user_id=row["user_id"],
-        daily_profit_target=float(row["daily_profit_target"]),
-        daily_loss_limit=float(row["daily_loss_limit"]),
-        allocated_capital=float(row["allocated_capital"]),
-        updated_at=row["updated_at"],
-    )
+    return _risk_config_response(row)
+
+
+@router.put("/risk/config/bulk", response_model=RiskConfigBulkResponse)
+async def upsert_risk_configs(payload: RiskConfigBulkUpsertRequest) -> RiskConfigBulkResponse:
+    rows = await async_store.upsert_risk_configs([item.model_dump() for item in payload.items])
+    engine_state_cache.invalidate(*(item.user_id for item in payload.items))
+    return RiskConfigBulkResponse(items=[_risk_config_response(row) for row in rows])
 
 
 @router.get("/risk/config", response_model=RiskConfigResponse)
-def get_risk_config(user_id: str) -> RiskConfigResponse:
-    row = store.get_risk_config(user_id)
+async def get_risk_config(user_id: str) -> RiskConfigResponse:
+    row = await async_store.get_risk_config(user_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Risk config not found")
 
-    return RiskConfigResponse(
-        user_id=row["user_id"],
-        daily_profit_target=float(row["daily_profit_target"]),
-        daily_loss_limit=float(row["daily_loss_limit"]),
-        allocated_capital=float(row["allocated_capital"]),
-        updated_at=row["updated_at"],
-    )
+    return _risk_config_response(row)
 
 
 @router.put("/session/config", response_model=SessionConfigResponse)
-def upsert_session_config(payload: SessionConfigUpsertRequest) -> SessionConfigResponse:
-    store.upsert_session_config(
+async def upsert_session_config(payload: SessionConfigUpsertRequest) -> SessionConfigResponse:
+    await async_store.upsert_session_config(
         user_id=payload.user_id,
         duration_minutes=payload.duration_minutes,
     )
-    row = store.get_session_config(payload.user_id)
+    engine_state_cache.invalidate(payload.user_id)
+    row = await async_store.get_session_config(payload.user_id)
     if row is None:
         raise HTTPException(status_code=500, detail="Failed to persist session config")
 
-    return SessionConfigResponse(
-        user_id=row["user_id"],
-        duration_minutes=int(row["duration_minutes"]),
-        updated_at=row["updated_at"],
-    )
+    return _session_config_response(row)
+
+
+@router.put("/session/config/bulk", response_model=SessionConfigBulkResponse)
+async def upsert_session_configs(
+    payload: SessionConfigBulkUpsertRequest,
+) -> SessionConfigBulkResponse:
+    rows = await async_store.upsert_session_configs([item.model_dump() for item in payload.items])
+    engine_state_cache.invalidate(*(item.user_id for item in payload.items))
+    return SessionConfigBulkResponse(items=[_session_config_response(row) for row in rows])
 
 
 @router.get("/session/config", response_model=SessionConfigResponse)
-def get_session_config(user_id: str) -> SessionConfigResponse:
-    row = store.get_session_config(user_id)
+async def get_session_config(user_id: str) -> SessionConfigResponse:
+    row = await async_store.get_session_config(user_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Session config not found")
 
-    return SessionConfigResponse(
-        user_id=row["user_id"],
-        duration_minutes=int(row["duration_minutes"]),
-        updated_at=row["updated_at"],
-    )
+    return _session_config_response(row)
@@ -1,34 +1,186 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import logging
 import time
-from datetime import datetime, timezone
+from collections.abc import Iterator
 
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Query, WebSocket, WebSocketDisconnect, status
 
-from app.db import store
+from app.config import get_settings
+from app.core.security import decode_token
+
+from app.core.timestamps import now_us, to_epoch_us
+from app.db import async_store, store
 from app.schemas.trading import (
     AIEvaluateRequest,
     AIEvaluateResponse,
     BotStatusResponse,
+    FlattenResponse,
+    MAX_TICK_BATCH,
+    MarketTickRequest,
+    MarketTickResponse,
+    TickBatchItem,
+    TickBatchRequest,
+    TickBatchResponse,
     TickRequest,
     TickResponse,
+    TradingConfigBulkResponse,
+    TradingConfigBulkUpsertRequest,
     TradingConfigResponse,
     TradingConfigUpsertRequest,
+    UserTickResponse,
 )
-from app.services.ai_filter import AIFilterService
+from app.services.admission import admission
+from app.services.ai_filter import AIDecision, AIFilterService
+from app.services.engine_journal import EngineJournal
+from app.services.engine_state import engine_state_cache
 from app.services.latency_metrics import latency_metrics
 from app.services.notification_service import NotificationService
-from app.services.trading_engine import TradingEngine
+from app.services.tick_actors import tick_actors
+from app.services.tick_stream import (
+    TickFrameError,
+    decode_ticks,
+    encode_decisions,
+    encode_errors,
+    tick_streams,
+)
+from app.services.trading_engine import TickDecision, TradingEngine
 
+logger = logging.getLogger(__name__)
 router = APIRouter(tags=["trading"])
 engine = TradingEngine()
 ai_filter = AIFilterService()
 notifier = NotificationService()
+engine_journal: EngineJournal | None = None
+# Admission-to-response time of the guarded routes, mailbox wait included.
+admission.guard(
+    "/engine/tick", metric="engine_tick_route_ms", slo_ms=get_settings().ENGINE_TICK_SLO_MS
+)
+admission.guard(
+    "/ai/evaluate", metric="ai_evaluate_request_ms", slo_ms=get_settings().ENGINE_AI_SLO_MS
+)
+
+
+def start_engine_journal() -> int:
+    """Restore the engine from ``ENGINE_JOURNAL_DIR`` and journal it from now on.
+
+    Returns the number of journal events replayed; a no-op returning 0 when
+    the journal is not configured.
+    """
+    global engine_journal
+    settings = get_settings()
+    if not settings.ENGINE_JOURNAL_DIR or engine_journal is not None:
+        return 0
+    journal = EngineJournal(
+        settings.ENGINE_JOURNAL_DIR, snapshot_every=settings.ENGINE_SNAPSHOT_EVERY
+    )
+    journal.attach(engine, ai_filter)
+    engine_journal = journal
+    return journal.restore()
+
+
+def stop_engine_journal() -> None:
+    global engine_journal
+    journal, engine_journal = engine_journal, None
+    if journal is not None:
+        journal.close()
+
+
+session_timer_task: asyncio.Task[None] | None = None
+
+
+def schedule_running_sessions() -> int:
+    """Load every running bot so its session deadline is on the timer wheel."""
+    user_ids = {str(row["user_id"]) for row in store.list_running_trading_assets()}
+    for user_id in user_ids:
+        engine.states.get(user_id)
+    return len(user_ids)
+
+
+async def expire_due_sessions() -> int:
+    """Stop the bots whose session deadline has passed; returns how many stopped.
+
+    Users invalidated since the last run are reloaded first so a bot started
+    or reconfigured in between is timed by its new deadline. Both steps run
+    through the user's tick actor, ordered against that user's ticks.
+    """
+    states = engine.states
+    reloads = states.take_timer_reloads()
+    if reloads:
+        await asyncio.gather(
+            *(tick_actors.submit(user_id, states.get, user_id) for user_id in reloads)
+        )
+    due = states.session_timers.advance(now_us())
+    if not due:
+        return 0
+    stopped = await asyncio.gather(
+        *(tick_actors.submit(user_id, _expire_session, user_id) for user_id in due)
+    )
+    return sum(stopped)
+
+
+def _expire_session(user_id: str) -> bool:
+    if not engine.expire_session(user_id):
+        return False
+    notifier.publish(
+        user_id=user_id,
+        event_type="bot_stopped",
+        title="Bot stopped",
+        message="Bot stopped because session duration expired",
+    )
+    return True
+
+
+async def _run_session_timers(interval: float) -> None:
+    await async_store.run(schedule_running_sessions)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await expire_due_sessions()
+        except Exception:
+            logger.exception("Session timer sweep failed")
+
+
+def start_session_timers() -> None:
+    """Start the background task that stops sessions at their deadline.
+
+    A no-op when ``ENGINE_SESSION_TIMER_SECONDS`` is 0; sessions then stop on
+    their first tick past the deadline.
+    """
+    global session_timer_task
+    interval = get_settings().ENGINE_SESSION_TIMER_SECONDS
+    if interval <= 0 or session_timer_task is not None:
+        return
+    session_timer_task = asyncio.create_task(_run_session_timers(interval))
+
+
+async def stop_session_timers() -> None:
+    global session_timer_task
+    task, session_timer_task = session_timer_task, None
+    if task is not None:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def _trading_config_response(config: dict) -> TradingConfigResponse:
+    return TradingConfigResponse(
+        user_id=config["user_id"],
+        assets=[item for item in config["assets"].split(",") if item],
+        timeframe=config["timeframe"],
+        max_trades_per_session=int(config["max_trades_per_session"]),
+        quantity=float(config["quantity"]),
+        profit_threshold=float(config["profit_threshold"]),
+        loss_threshold=float(config["loss_threshold"]),
+        updated_at=config["updated_at"],
+    )
 
 
 @router.put("/trading/config", response_model=TradingConfigResponse)
-def upsert_trading_config(payload: TradingConfigUpsertRequest) -> TradingConfigResponse:
-    store.upsert_trading_config(
+async def upsert_trading_config(payload: TradingConfigUpsertRequest) -> TradingConfigResponse:
+    await async_store.upsert_trading_config(
         user_id=payload.user_id,
         assets=payload.assets,
         timeframe=payload.timeframe,
@@ -37,72 +189,78 @@ def upsert_trading_config(payload: TradingConfigUpsertRequest) -> TradingConfigR
         profit_threshold=payload.profit_threshold,
         loss_threshold=payload.loss_threshold,
     )
+    engine_state_cache.invalidate(payload.user_id)
 
-    config = store.get_trading_config(payload.user_id)
+    config = await async_store.get_trading_config(payload.user_id)
     if config is None:
         raise HTTPException(status_code=500, detail="Failed to persist trading config")
 
-    return TradingConfigResponse(
-        user_id=config["user_id"],
-        assets=[item for item in config["assets"].split(",") if item],
-        timeframe=config["timeframe"],
-        max_trades_per_session=int(config["max_trades_per_session"]),
-        quantity=float(config["quantity"]),
-        profit_threshold=float(config["profit_threshold"]),
-        loss_threshold=float(config["loss_threshold"]),
-        updated_at=config["updated_at"],
+    return _trading_config_response(config)
+
+
+@router.put("/trading/config/bulk", response_model=TradingConfigBulkResponse)
+async def upsert_trading_configs(
+    payload: TradingConfigBulkUpsertRequest,
+) -> TradingConfigBulkResponse:
+    configs = await async_store.upsert_trading_configs(
+        [item.model_dump() for item in payload.items]
     )
+    engine_state_cache.invalidate(*(item.user_id for item in payload.items))
+    return TradingConfigBulkResponse(items=[_trading_config_response(row) for row in configs])
 
 
 @router.get("/trading/config", response_model=TradingConfigResponse)
-def get_trading_config(user_id: str) -> TradingConfigResponse:
-    config = store.get_trading_config(user_id)
+async def get_trading_config(user_id: str) -> TradingConfigResponse:
+    config = await async_store.get_trading_config(user_id)
     if config is None:
         raise HTTPException(status_code=404, detail="Trading config not found")
 
-    return TradingConfigResponse(
-        user_id=config["user_id"],
-        assets=[item for item in config["assets"].split(",") if item],
-        timeframe=config["timeframe"],
-        max_trades_per_session=int(config["max_trades_per_session"]),
-        quantity=float(config["quantity"]),
-        profit_threshold=float(config["profit_threshold"]),
-        loss_threshold=float(config["loss_threshold"]),
-        updated_at=config["updated_at"],
-    )
+    return _trading_config_response(config)
 
 
 @router.post("/bot/start", response_model=BotStatusResponse)
-def start_bot(user_id: str) -> BotStatusResponse:
-    valid_license, license_message = store.is_license_valid_for_user(user_id)
+async def start_bot(user_id: str) -> BotStatusResponse:
+    state = await async_store.get_user_trading_state(user_id, include_license=True)
+    valid_license, license_message = await async_store.check_license(state.license)
     if not valid_license:
         raise HTTPException(status_code=403, detail=f"License validation failed: {license_message}")
 
-    if store.get_trading_config(user_id) is None:
+    if state.trading_config is None:
         raise HTTPException(status_code=400, detail="Trading config required before bot start")
-    if store.get_risk_config(user_id) is None:
+    if state.risk_config is None:
         raise HTTPException(status_code=400, detail="Risk config required before bot start")
-    if store.get_session_config(user_id) is None:
+    if state.session_config is None:
         raise HTTPException(status_code=400, detail="Session config required before bot start")
 
-    started_at = datetime.now(timezone.utc).isoformat()
-    store.set_bot_session(
+    # Through the user's actor, so ticks already queued finish first.
+    started_at = await tick_actors.submit(user_id, _start_session, user_id)
+    return BotStatusResponse(
         user_id=user_id,
-        is_running=True,
+        running=True,
         started_at=started_at,
         trades_opened_this_session=0,
+        stop_reason=None,
     )
-    return BotStatusResponse(
+
+
+def _start_session(user_id: str) -> int:
+    started_at = now_us()
+    store.set_bot_session(
         user_id=user_id,
-        running=True,
+        is_running=True,
         started_at=started_at,
         trades_opened_this_session=0,
-        stop_reason=None,
     )
+    engine_state_cache.invalidate(user_id)
+    return started_at
 
 
 @router.post("/bot/stop", response_model=BotStatusResponse)
-def stop_bot(user_id: str) -> BotStatusResponse:
+async def stop_bot(user_id: str) -> BotStatusResponse:
+    return await tick_actors.submit(user_id, _stop_session, user_id)
+
+
+def _stop_session(user_id: str) -> BotStatusResponse:
     session = store.get_bot_session(user_id)
     trades_opened = int(session["trades_opened_this_session"]) if session else 0
     started_at = session["started_at"] if session else None
@@ -113,6 +271,7 @@ def stop_bot(user_id: str) -> BotStatusResponse:
         started_at=started_at,
         trades_opened_this_session=trades_opened,
     )
+    engine_state_cache.invalidate(user_id)
     notifier.publish(
         user_id=user_id,
         event_type="bot_stopped",
@@ -128,9 +287,33 @@ def stop_bot(user_id: str) -> BotStatusResponse:
     )
 
 
+@router.post("/bot/flatten", response_model=FlattenResponse)
+async def flatten_positions(user_id: str, symbol: str | None = None) -> FlattenResponse:
+    normalized_symbol = symbol.strip().upper() if symbol else None
+    return await tick_actors.submit(user_id, _flatten_positions, user_id, normalized_symbol)
+
+
+def _flatten_positions(user_id: str, symbol: str | None) -> FlattenResponse:
+    decisions = engine.flatten_positions(user_id=user_id, symbol=symbol)
+    realized = sum(decision.pnl or 0.0 for decision in decisions)
+    if decisions:
+        notifier.publish(
+            user_id=user_id,
+            event_type="positions_flattened",
+            title="Positions flattened",
+            message=f"Closed {len(decisions)} open trade(s), pnl={round(realized, 6)}",
+        )
+    return FlattenResponse(
+        user_id=user_id,
+        symbol=symbol,
+        closed_trades=len(decisions),
+        realized_pnl=round(realized, 6),
+    )
+
+
 @router.get("/bot/status", response_model=BotStatusResponse)
-def bot_status(user_id: str) -> BotStatusResponse:
-    session = store.get_bot_session(user_id)
+async def bot_status(user_id: str) -> BotStatusResponse:
+    session = await async_store.get_bot_session(user_id)
     if session is None:
         return BotStatusResponse(user_id=user_id, running=False)
 
@@ -148,7 +331,37 @@ def bot_status(user_id: str) -> BotStatusResponse:
 
 
 @router.post("/engine/tick", response_model=TickResponse)
-def ingest_tick(payload: TickRequest, idempotency_key: str | None = Header(default=None, alias="Idempotency-Key")) -> TickResponse:
+async def ingest_tick(
+    payload: TickRequest,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+) -> TickResponse:
+    state = engine.states.peek(payload.user_id)
+    # Ticks that cannot close a trade go first under overload. A user whose
+    # state is not cached may have open trades, so theirs are kept.
+    with _admitted("/engine/tick", low_priority=state is not None and not state.open_trades):
+        return await tick_actors.submit(
+            payload.user_id, process_tick_request, payload, idempotency_key
+        )
+
+
+@contextlib.contextmanager
+def _admitted(route: str, *, low_priority: bool) -> Iterator[None]:
+    """Run the block under admission control; a shed request gets a 503 with Retry-After."""
+    reason = admission.try_admit(route, low_priority=low_priority)
+    if reason is not None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Engine overloaded ({reason}), retry later",
+            headers={"Retry-After": str(get_settings().ENGINE_RETRY_AFTER_SECONDS)},
+        )
+    admitted_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        admission.release(route, elapsed_ms=(time.perf_counter() - admitted_at) * 1000)
+
+
+def process_tick_request(payload: TickRequest, idempotency_key: str | None) -> TickResponse:
     route_started = time.perf_counter()
     if idempotency_key:
         cached = store.get_idempotent_response(
@@ -158,19 +371,329 @@ def ingest_tick(payload: TickRequest, idempotency_key: str | None = Header(defau
         if cached is not None:
             return TickResponse(**cached)
 
+    response_payload = _evaluate_tick(payload)
+
+    if idempotency_key:
+        store.save_idempotent_response(
+            idempotency_key=idempotency_key,
+            endpoint="/engine/tick",
+            response=response_payload,
+        )
+
+    latency_metrics.record("trade_execution_ms", (time.perf_counter() - route_started) * 1000)
+
+    return TickResponse(**response_payload)
+
+
+@router.post("/engine/ticks", response_model=TickBatchResponse)
+async def ingest_ticks(payload: TickBatchRequest) -> TickBatchResponse:
+    """Run the batch as one job, ordered against each of its users' other ticks."""
+    return await tick_actors.submit_many(
+        (tick.user_id for tick in payload.ticks), process_tick_batch, payload.ticks
+    )
+
+
+def process_tick_batch(ticks: list[TickBatchItem]) -> TickBatchResponse:
+    """Process ``ticks`` in request order, sharing store round trips across the batch.
+
+    Idempotency keys share ``/engine/tick``'s namespace; they are looked up in
+    one query and saved in one transaction, and a key repeated within the
+    batch replays the first result. Audit rows are committed together.
+    """
+    keys = [tick.idempotency_key for tick in ticks if tick.idempotency_key]
+    replays = store.get_idempotent_responses(keys, endpoint="/engine/tick") if keys else {}
+    fresh: dict[str, dict] = {}
+    results: list[TickResponse] = []
+    with store.audit_batch():
+        for tick in ticks:
+            key = tick.idempotency_key
+            response_payload = replays.get(key) if key else None
+            if response_payload is None:
+                tick_started = time.perf_counter()
+                response_payload = _evaluate_tick(tick)
+                latency_metrics.record(
+                    "trade_execution_ms", (time.perf_counter() - tick_started) * 1000
+                )
+                if key:
+                    replays[key] = fresh[key] = response_payload
+            results.append(TickResponse(**response_payload))
+    store.save_idempotent_responses(fresh, endpoint="/engine/tick")
+    return TickBatchResponse(results=results)
+
+
+@router.websocket("/engine/stream")
+async def stream_ticks(websocket: WebSocket, token: str | None = Query(default=None)) -> None:
+    """Continuous binary tick ingestion; see ``app.services.tick_stream`` for frames.
+
+    The client authenticates once with a bearer token (``Authorization``
+    header or ``token`` query parameter) and then streams ticks for that
+    user. Decoded ticks wait in a bounded in-flight queue; when it is full the
+    socket is not read, so TCP pushes back on the sender. Queued ticks are
+    processed in batches on the user's tick actor and their decisions are
+    sent back in order.
+    """
+    header = websocket.headers.get("authorization", "")
+    if header.lower().startswith("bearer "):
+        token = header[7:]
+    try:
+        claims = decode_token(token or "")
+        user_id = str(claims["sub"])
+    except (ValueError, KeyError):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if claims.get("type") != "access":
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    stats = tick_streams.open(user_id)
+    inflight: asyncio.Queue[tuple[int, TickRequest] | None] = asyncio.Queue(
+        maxsize=get_settings().ENGINE_STREAM_MAX_INFLIGHT
+    )
+
+    async def read() -> None:
+        try:
+            while True:
+                data = await websocket.receive_bytes()
+                stats.frames_in += 1
+                try:
+                    ticks, errors = decode_ticks(data, user_id=user_id)
+                except TickFrameError as error:
+                    ticks, errors = [], [error]
+                if errors:
+                    stats.errors += len(errors)
+                    await websocket.send_bytes(encode_errors(errors))
+                stats.ticks_in += len(ticks)
+                for item in ticks:
+                    if inflight.full():
+                        stats.backpressure_waits += 1
+                    await inflight.put(item)
+                    stats.queue_depth = inflight.qsize()
+                    stats.max_queue_depth = max(stats.max_queue_depth, stats.queue_depth)
+        except (WebSocketDisconnect, KeyError):
+            # KeyError: a text frame, which receive_bytes() cannot read.
+            pass
+        # Only on a clean end: if process() failed, this task is being
+        # cancelled and nothing would drain a full queue to make room.
+        await inflight.put(None)
+
+    async def process() -> None:
+        done = False
+        while not done:
+            item = await inflight.get()
+            batch: list[tuple[int, TickRequest]] = []
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= MAX_TICK_BATCH or inflight.empty():
+                    break
+                item = inflight.get_nowait()
+            done = item is None
+            stats.queue_depth = inflight.qsize()
+            if not batch:
+                continue
+            payloads = await tick_actors.submit(
+                user_id, process_stream_ticks, [tick for _, tick in batch]
+            )
+            stats.decisions_out += len(payloads)
+            try:
+                await websocket.send_bytes(
+                    encode_decisions(zip((seq for seq, _ in batch), payloads))
+                )
+            except (WebSocketDisconnect, RuntimeError):
+                # The client went away; keep draining so the reader can finish.
+                pass
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(read())
+            group.create_task(process())
+    finally:
+        tick_streams.close(stats)
+
+
+def process_stream_ticks(ticks: list[TickRequest]) -> list[dict]:
+    """Evaluate streamed ticks in order with their audit rows committed together.
+
+    With ``ENGINE_TICK_CONFLATION`` on and more than one tick queued, only the
+    latest tick per symbol is evaluated; see :func:`_conflate_ticks`.
+    """
+    payloads: list[dict | None] = [None] * len(ticks)
+    with store.audit_batch():
+        conflate = len(ticks) > 1 and get_settings().ENGINE_TICK_CONFLATION
+        pending = _conflate_ticks(ticks, payloads) if conflate else range(len(ticks))
+        for index in pending:
+            tick_started = time.perf_counter()
+            payloads[index] = _evaluate_tick(ticks[index], sequenced=conflate)
+            latency_metrics.record(
+                "trade_execution_ms", (time.perf_counter() - tick_started) * 1000
+            )
+    return payloads  # type: ignore[return-value]
+
+
+def _conflate_ticks(ticks: list[TickRequest], payloads: list[dict | None]) -> list[int]:
+    """Answer every tick but the latest per symbol; returns the indexes left to evaluate.
+
+    Duplicate and late ticks are rejected as usual. The other superseded ticks
+    are held as conflated without touching the AI windows or the engine,
+    except that the user's open trade on the symbol is checked against their
+    high and low, so a TP/SL crossed between queued ticks still closes. That
+    close is reported on the tick that reached it.
+    """
+    latest: dict[str, int] = {}
+    # symbol -> (low index, high index) over the superseded ticks
+    ranges: dict[str, tuple[int, int]] = {}
+    for index, tick in enumerate(ticks):
+        rejection = _sequence_rejection(tick)
+        if rejection is not None:
+            payloads[index] = rejection
+            continue
+        previous = latest.get(tick.symbol)
+        latest[tick.symbol] = index
+        if previous is None:
+            continue
+        payloads[previous] = _skipped_payload(tick.symbol, "held", "Tick conflated")
+        low, high = ranges.get(tick.symbol, (previous, previous))
+        if ticks[previous].price < ticks[low].price:
+            low = previous
+        if ticks[previous].price > ticks[high].price:
+            high = previous
+        ranges[tick.symbol] = (low, high)
+
+    for symbol, (low, high) in ranges.items():
+        user_id = ticks[low].user_id
+        decision = engine.close_on_range(
+            user_id=user_id, symbol=symbol, low=ticks[low].price, high=ticks[high].price
+        )
+        if decision is None:
+            continue
+        notifier.publish(
+            user_id=user_id,
+            event_type="trade_closed",
+            title="Trade closed",
+            message=(
+                f"{decision.symbol} {decision.side} closed at {decision.close_price}, "
+                f"pnl={decision.pnl}"
+            ),
+        )
+        index = low if decision.close_price == ticks[low].price else high
+        payloads[index] = _decision_payload(decision, None)
+    return sorted(latest.values())
+
+
+@router.post("/engine/market-tick", response_model=MarketTickResponse)
+async def ingest_market_tick(
+    payload: MarketTickRequest,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+) -> MarketTickResponse:
+    """Run the fan-out as one job, ordered against each affected user's other ticks."""
+    user_ids = await async_store.run(_market_tick_users, payload.symbol)
+    return await tick_actors.submit_many(user_ids, process_market_tick, payload, idempotency_key)
+
+
+def _market_tick_users(symbol: str) -> list[str]:
+    """Subscribers of ``symbol``, then any other owner of a trigger on it."""
+    user_ids = list(engine.states.subscribers(symbol))
+    user_ids.extend(sorted(engine.states.triggers.users(symbol) - set(user_ids)))
+    return user_ids
+
+
+def process_market_tick(
+    payload: MarketTickRequest, idempotency_key: str | None
+) -> MarketTickResponse:
+    """Apply one symbol-wide tick to every user whose running bot trades the symbol.
+
+    The AI decision is computed once from the shared per-symbol window. Trades
+    whose take-profit or stop-loss the price crosses are closed first, in one
+    batch, from the engine's trigger index; each subscribed user then gets
+    their own audit row, engine step (or that close) and notifications, with
+    audit rows committed together.
+    """
+    route_started = time.perf_counter()
+    if idempotency_key:
+        cached = store.get_idempotent_response(
+            idempotency_key=idempotency_key,
+            endpoint="/engine/market-tick",
+        )
+        if cached is not None:
+            return MarketTickResponse(**cached)
+
     ai_started = time.perf_counter()
-    ai_decision = ai_filter.evaluate(
-        user_id=payload.user_id,
+    ai_decision = ai_filter.evaluate_market(
         symbol=payload.symbol,
         price=payload.price,
         news_spike=payload.news_spike,
         confidence_threshold=payload.confidence_threshold,
     )
     latency_metrics.record("ai_decision_ms", (time.perf_counter() - ai_started) * 1000)
-    store.create_ai_decision(
+
+    results: list[UserTickResponse] = []
+    with store.audit_batch():
+        closed = engine.sweep_triggers(symbol=payload.symbol, price=payload.price)
+        user_ids = list(engine.states.subscribers(payload.symbol))
+        user_ids.extend(sorted(closed.keys() - set(user_ids)))
+        for user_id in user_ids:
+            response_payload = _apply_tick(
+                user_id=user_id,
+                symbol=payload.symbol,
+                price=payload.price,
+                ai_decision=ai_decision,
+                decision=closed.get(user_id),
+            )
+            results.append(UserTickResponse(user_id=user_id, **response_payload))
+    response = MarketTickResponse(symbol=payload.symbol, price=payload.price, results=results)
+
+    if idempotency_key:
+        store.save_idempotent_response(
+            idempotency_key=idempotency_key,
+            endpoint="/engine/market-tick",
+            response=response.model_dump(),
+        )
+
+    latency_metrics.record("market_tick_ms", (time.perf_counter() - route_started) * 1000)
+    return response
+
+
+def _evaluate_tick(payload: TickRequest, *, sequenced: bool = False) -> dict:
+    """Run one tick through the AI gate and the engine; returns the response payload.
+
+    Duplicate and late ticks (by ``timestamp``) are rejected first, unless
+    the caller already checked them (``sequenced``).
+    """
+    if not sequenced:
+        rejection = _sequence_rejection(payload)
+        if rejection is not None:
+            return rejection
+    ai_started = time.perf_counter()
+    ai_decision = ai_filter.evaluate(
         user_id=payload.user_id,
         symbol=payload.symbol,
         price=payload.price,
+        news_spike=payload.news_spike,
+        confidence_threshold=payload.confidence_threshold,
+    )
+    latency_metrics.record("ai_decision_ms", (time.perf_counter() - ai_started) * 1000)
+    return _apply_tick(
+        user_id=payload.user_id, symbol=payload.symbol, price=payload.price, ai_decision=ai_decision
+    )
+
+
+def _apply_tick(
+    *,
+    user_id: str,
+    symbol: str,
+    price: float,
+    ai_decision: AIDecision,
+    decision: TickDecision | None = None,
+) -> dict:
+    """Record the AI decision, run the engine and publish notifications for one user.
+
+    ``decision`` is an engine outcome already reached for this tick; when given
+    the engine is not run again.
+    """
+    store.create_ai_decision(
+        user_id=user_id,
+        symbol=symbol,
+        price=price,
         approved=ai_decision.approved,
         confidence=ai_decision.confidence,
         reasons=ai_decision.reasons,
@@ -178,23 +701,26 @@ def ingest_tick(payload: TickRequest, idempotency_key: str | None = Header(defau
         volatility=ai_decision.volatility,
     )
 
-    decision = engine.process_tick(
-        user_id=payload.user_id,
-        symbol=payload.symbol,
-        price=payload.price,
-        ai_approved=ai_decision.approved,
-    )
+    if decision is None:
+        engine_started = time.perf_counter()
+        decision = engine.process_tick(
+            user_id=user_id,
+            symbol=symbol,
+            price=price,
+            ai_approved=ai_decision.approved,
+        )
+        latency_metrics.record("engine_tick_ms", (time.perf_counter() - engine_started) * 1000)
 
     if decision.action == "opened":
         notifier.publish(
-            user_id=payload.user_id,
+            user_id=user_id,
             event_type="trade_opened",
             title="Trade opened",
             message=f"{decision.symbol} {decision.side} opened at {decision.entry_price}",
         )
     if decision.action == "closed":
         notifier.publish(
-            user_id=payload.user_id,
+            user_id=user_id,
             event_type="trade_closed",
             title="Trade closed",
             message=f"{decision.symbol} {decision.side} closed at {decision.close_price}, pnl={decision.pnl}",
@@ -202,13 +728,13 @@ def ingest_tick(payload: TickRequest, idempotency_key: str | None = Header(defau
 
     if decision.message == "Bot stopped: daily profit target reached":
         notifier.publish(
-            user_id=payload.user_id,
+            user_id=user_id,
             event_type="profit_target_hit",
             title="Daily profit target reached",
             message="Bot stopped after reaching daily profit target",
         )
         notifier.publish(
-            user_id=payload.user_id,
+            user_id=user_id,
             event_type="bot_stopped",
             title="Bot stopped",
             message="Bot stopped due to daily profit target",
@@ -216,13 +742,13 @@ def ingest_tick(payload: TickRequest, idempotency_key: str | None = Header(defau
 
     if decision.message == "Bot stopped: daily loss limit reached":
         notifier.publish(
-            user_id=payload.user_id,
+            user_id=user_id,
             event_type="loss_limit_hit",
             title="Daily loss limit reached",
             message="Bot stopped after hitting daily loss limit",
         )
         notifier.publish(
-            user_id=payload.user_id,
+            user_id=user_id,
             event_type="bot_stopped",
             title="Bot stopped",
             message="Bot stopped due to daily loss limit",
@@ -230,50 +756,52 @@ def ingest_tick(payload: TickRequest, idempotency_key: str | None = Header(defau
 
     if decision.message == "Bot stopped: session duration expired":
         notifier.publish(
-            user_id=payload.user_id,
+            user_id=user_id,
             event_type="bot_stopped",
             title="Bot stopped",
             message="Bot stopped because session duration expired",
         )
 
-    response_payload = {
+    return _decision_payload(decision, ai_decision)
+
+
+def _decision_payload(decision: TickDecision, ai_decision: AIDecision | None) -> dict:
+    return {
         "action": decision.action,
         "message": decision.message,
         "symbol": decision.symbol,
-        "ai_approved": ai_decision.approved,
-        "ai_confidence": ai_decision.confidence,
-        "ai_reasons": ai_decision.reasons,
+        "ai_approved": ai_decision.approved if ai_decision is not None else False,
+        "ai_confidence": ai_decision.confidence if ai_decision is not None else 0.0,
+        "ai_reasons": ai_decision.reasons if ai_decision is not None else [],
         "side": decision.side,
         "pnl": decision.pnl,
         "entry_price": decision.entry_price,
         "close_price": decision.close_price,
     }
 
-    if idempotency_key:
-        store.save_idempotent_response(
-            idempotency_key=idempotency_key,
-            endpoint="/engine/tick",
-            response=response_payload,
-        )
 
-    latency_metrics.record("trade_execution_ms", (time.perf_counter() - route_started) * 1000)
+def _skipped_payload(symbol: str, action: str, message: str) -> dict:
+    """Response payload for a tick that never reached the AI gate or the engine."""
+    return _decision_payload(TickDecision(action=action, message=message, symbol=symbol), None)
+
 
-    return TickResponse(
-        action=decision.action,
-        message=decision.message,
-        symbol=decision.symbol,
-        ai_approved=ai_decision.approved,
-        ai_confidence=ai_decision.confidence,
-        ai_reasons=ai_decision.reasons,
-        side=decision.side,
-        pnl=decision.pnl,
-        entry_price=decision.entry_price,
-        close_price=decision.close_price,
+def _sequence_rejection(payload: TickRequest) -> dict | None:
+    if payload.timestamp is None:
+        return None
+    message = engine.sequencer.check(
+        payload.user_id, payload.symbol, to_epoch_us(payload.timestamp)
     )
+    return None if message is None else _skipped_payload(payload.symbol, "rejected", message)
 
 
 @router.post("/ai/evaluate", response_model=AIEvaluateResponse)
-def evaluate_ai(payload: AIEvaluateRequest) -> AIEvaluateResponse:
+async def evaluate_ai(payload: AIEvaluateRequest) -> AIEvaluateResponse:
+    # Advisory only, so it is always low priority under overload.
+    with _admitted("/ai/evaluate", low_priority=True):
+        return await tick_actors.submit(payload.user_id, _evaluate_ai, payload)
+
+
+def _evaluate_ai(payload: AIEvaluateRequest) -> AIEvaluateResponse:
     started = time.perf_counter()
     decision = ai_filter.evaluate(
         user_id=payload.user_id,
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pydantic import BaseModel
 
+from app.core.timestamps import Timestamp
+
 
 class DashboardSummaryResponse(BaseModel):
     user_id: str
@@ -19,7 +21,7 @@ class OpenTradeItem(BaseModel):
     side: str
     quantity: float
     entry_price: float
-    opened_at: str
+    opened_at: Timestamp
 
 
 class ClosedTradeItem(BaseModel):
@@ -31,8 +33,8 @@ class ClosedTradeItem(BaseModel):
     close_price: float
     pnl: float
     close_reason: str
-    opened_at: str
-    closed_at: str
+    opened_at: Timestamp
+    closed_at: Timestamp
 
 
 class DailyPnlResponse(BaseModel):
@@ -48,4 +50,4 @@ class NotificationItem(BaseModel):
     title: str
     message: str
     channel: str
-    created_at: str
+    created_at: Timestamp
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pydantic import BaseModel, Field
 
+from app.core.timestamps import Timestamp
+
 
 class LicenseActivateRequest(BaseModel):
     user_id: str = Field(..., min_length=1)
@@ -15,7 +17,7 @@ class LicenseStatusResponse(BaseModel):
     status: str | None = None
     message: str
     license_key: str | None = None
-    expires_at: str | None = None
+    expires_at: Timestamp | None = None
 
 
 class AdminLicenseCreateRequest(BaseModel):
@@ -34,6 +36,6 @@ class AdminLicenseResponse(BaseModel):
     license_key: str
     status: str
     assigned_user_id: str | None = None
-    expires_at: str
-    created_at: str
-    updated_at: str
+    expires_at: Timestamp
+    created_at: Timestamp
+    updated_at: Timestamp
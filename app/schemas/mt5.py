@@ -4,6 +4,8 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from app.core.timestamps import Timestamp
+
 
 class ConnectTestRequest(BaseModel):
     login: str = Field(..., min_length=1)
@@ -35,4 +37,4 @@ class MT5AccountStatusResponse(BaseModel):
     server: str | None = None
     broker: str | None = None
     last_validation_status: str | None = None
-    last_validated_at: str | None = None
+    last_validated_at: Timestamp | None = None
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from pydantic import BaseModel, Field
 
+from app.core.timestamps import Timestamp
+from app.schemas.trading import MAX_BULK_CONFIGS
+
 
 class RiskConfigUpsertRequest(BaseModel):
     user_id: str = Field(..., min_length=1)
@@ -15,7 +18,15 @@ class RiskConfigResponse(BaseModel):
     daily_profit_target: float
     daily_loss_limit: float
     allocated_capital: float
-    updated_at: str
+    updated_at: Timestamp
+
+
+class RiskConfigBulkUpsertRequest(BaseModel):
+    items: list[RiskConfigUpsertRequest] = Field(..., min_length=1, max_length=MAX_BULK_CONFIGS)
+
+
+class RiskConfigBulkResponse(BaseModel):
+    items: list[RiskConfigResponse]
 
 
 class SessionConfigUpsertRequest(BaseModel):
@@ -26,4 +37,12 @@ class SessionConfigUpsertRequest(BaseModel):
 class SessionConfigResponse(BaseModel):
     user_id: str
     duration_minutes: int
-    updated_at: str
+    updated_at: Timestamp
+
+
+class SessionConfigBulkUpsertRequest(BaseModel):
+    items: list[SessionConfigUpsertRequest] = Field(..., min_length=1, max_length=MAX_BULK_CONFIGS)
+
+
+class SessionConfigBulkResponse(BaseModel):
+    items: list[SessionConfigResponse]
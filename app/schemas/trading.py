@@ -5,6 +5,13 @@ from typing import Literal
 
 from pydantic import BaseModel, Field, field_validator
 
+from app.core.timestamps import Timestamp
+
+# Upper bound on items accepted by the bulk config endpoints.
+MAX_BULK_CONFIGS = 5000
+# Upper bound on ticks accepted by one POST /engine/ticks.
+MAX_TICK_BATCH = 1000
+
 
 class TradingConfigUpsertRequest(BaseModel):
     user_id: str = Field(..., min_length=1)
@@ -32,7 +39,15 @@ class TradingConfigResponse(BaseModel):
     quantity: float
     profit_threshold: float
     loss_threshold: float
-    updated_at: str
+    updated_at: Timestamp
+
+
+class TradingConfigBulkUpsertRequest(BaseModel):
+    items: list[TradingConfigUpsertRequest] = Field(..., min_length=1, max_length=MAX_BULK_CONFIGS)
+
+
+class TradingConfigBulkResponse(BaseModel):
+    items: list[TradingConfigResponse]
 
 
 class TickRequest(BaseModel):
@@ -62,6 +77,41 @@ class TickResponse(BaseModel):
     close_price: float | None = None
 
 
+class TickBatchItem(TickRequest):
+    idempotency_key: str | None = Field(default=None, min_length=1)
+
+
+class TickBatchRequest(BaseModel):
+    ticks: list[TickBatchItem] = Field(..., min_length=1, max_length=MAX_TICK_BATCH)
+
+
+class TickBatchResponse(BaseModel):
+    results: list[TickResponse]
+
+
+class MarketTickRequest(BaseModel):
+    symbol: str = Field(..., min_length=1)
+    price: float = Field(..., gt=0)
+    news_spike: bool = False
+    confidence_threshold: float = Field(default=0.55, ge=0.0, le=1.0)
+    timestamp: datetime | None = None
+
+    @field_validator("symbol")
+    @classmethod
+    def normalize_symbol(cls, value: str) -> str:
+        return value.strip().upper()
+
+
+class UserTickResponse(TickResponse):
+    user_id: str
+
+
+class MarketTickResponse(BaseModel):
+    symbol: str
+    price: float
+    results: list[UserTickResponse]
+
+
 class AIEvaluateRequest(BaseModel):
     user_id: str = Field(..., min_length=1)
     symbol: str = Field(..., min_length=1)
@@ -86,6 +136,13 @@ class AIEvaluateResponse(BaseModel):
 class BotStatusResponse(BaseModel):
     user_id: str
     running: bool
-    started_at: str | None = None
+    started_at: Timestamp | None = None
     trades_opened_this_session: int = 0
     stop_reason: str | None = None
+
+
+class FlattenResponse(BaseModel):
+    user_id: str
+    symbol: str | None = None
+    closed_trades: int
+    realized_pnl: float
@@ -0,0 +1,121 @@
+"""Admission control for the tick and AI routes.
+
+Each guarded route has a latency SLO on its own ``latency_metrics`` series
+and an in-flight count. The series is fed by :meth:`AdmissionController.release`
+with the time from admission to completion, so it includes the time a request
+waits to run (e.g. in its user's tick actor mailbox), which is where an
+overloaded engine's latency goes. Every ``ENGINE_ADMISSION_WINDOW_SECONDS`` the p95 of the
+samples recorded during the last window is compared with the SLO; a window
+without samples clears the breach, so shedding stops as soon as the load it
+sheds would have been served in time.
+
+Requests are admitted, or shed with a reason the route turns into a 503:
+
+* ``saturated``: ``ENGINE_MAX_INFLIGHT`` requests of the route are in
+  flight; everything is shed.
+* ``inflight``: more than ``ENGINE_SHED_INFLIGHT`` are in flight; only
+  low-priority requests are shed.
+* ``latency``: the route's p95 is over its SLO; only low-priority requests
+  are shed.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+
+from app.config import get_settings
+from app.core.timestamps import MICROS_PER_SECOND, now_us
+from app.services.latency_metrics import LatencyMetricsService, latency_metrics
+
+SHED_SATURATED = "saturated"
+SHED_INFLIGHT = "inflight"
+SHED_LATENCY = "latency"
+
+
+@dataclass(slots=True)
+class _RouteState:
+    metric: str
+    slo_ms: float
+    inflight: int = 0
+    admitted: int = 0
+    # Shed requests by reason.
+    shed: dict[str, int] = field(default_factory=dict)
+    p95_ms: float | None = None
+    breached: bool = False
+    samples_seen: int = 0
+    window_ends_at: int = 0
+
+
+class AdmissionController:
+    def __init__(self, metrics: LatencyMetricsService | None = None) -> None:
+        self._metrics = metrics if metrics is not None else latency_metrics
+        self._routes: dict[str, _RouteState] = {}
+        self._lock = threading.Lock()
+
+    def guard(self, route: str, *, metric: str, slo_ms: float) -> None:
+        """Put ``route`` under admission control, judged by ``metric`` against ``slo_ms``."""
+        with self._lock:
+            self._routes[route] = _RouteState(metric=metric, slo_ms=slo_ms)
+
+    def try_admit(self, route: str, *, low_priority: bool) -> str | None:
+        """Admit one request and return None, or return why it is shed.
+
+        An admitted request must be ended with :meth:`release`.
+        """
+        settings = get_settings()
+        with self._lock:
+            state = self._routes[route]
+            if not settings.ENGINE_ADMISSION_ENABLED:
+                reason = None
+            elif state.inflight >= settings.ENGINE_MAX_INFLIGHT:
+                reason = SHED_SATURATED
+            elif low_priority and state.inflight >= settings.ENGINE_SHED_INFLIGHT:
+                reason = SHED_INFLIGHT
+            elif low_priority and self._breached(state, settings.ENGINE_ADMISSION_WINDOW_SECONDS):
+                reason = SHED_LATENCY
+            else:
+                reason = None
+            if reason is None:
+                state.inflight += 1
+                state.admitted += 1
+            else:
+                state.shed[reason] = state.shed.get(reason, 0) + 1
+            return reason
+
+    def release(self, route: str, *, elapsed_ms: float | None = None) -> None:
+        """End an admitted request; ``elapsed_ms`` since admission goes into the route's series."""
+        with self._lock:
+            state = self._routes[route]
+            state.inflight -= 1
+            metric = state.metric
+        if elapsed_ms is not None:
+            self._metrics.record(metric, elapsed_ms)
+
+    def _breached(self, state: _RouteState, window_seconds: float) -> bool:
+        now = now_us()
+        if now >= state.window_ends_at:
+            state.p95_ms, state.samples_seen = self._metrics.recent_percentile(
+                state.metric, 95, since=state.samples_seen
+            )
+            state.breached = state.p95_ms is not None and state.p95_ms > state.slo_ms
+            state.window_ends_at = now + int(window_seconds * MICROS_PER_SECOND)
+        return state.breached
+
+    def stats(self) -> dict[str, dict[str, object]]:
+        with self._lock:
+            return {
+                route: {
+                    "metric": state.metric,
+                    "slo_ms": state.slo_ms,
+                    "p95_ms": round(state.p95_ms, 3) if state.p95_ms is not None else None,
+                    "breached": state.breached,
+                    "inflight": state.inflight,
+                    "admitted": state.admitted,
+                    "shed": dict(state.shed),
+                }
+                for route, state in self._routes.items()
+            }
+
+
+admission = AdmissionController()
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from collections import deque
 from dataclasses import dataclass
-from math import sqrt
+
+from app.services.engine_journal import MARKET_WINDOW, USER_WINDOW, EngineJournal
+from app.services.price_window import PriceWindow
 
 
 @dataclass
@@ -15,8 +16,24 @@ class AIDecision:
 
 
 class AIFilterService:
+    window_size = 20
+
     def __init__(self) -> None:
-        self._price_windows: dict[tuple[str, str], deque[float]] = {}
+        self._price_windows: dict[tuple[str, str], PriceWindow] = {}
+        self._market_windows: dict[str, PriceWindow] = {}
+        self.journal: EngineJournal | None = None
+
+    def _user_window(self, user_id: str, symbol: str) -> PriceWindow:
+        window = self._price_windows.get((user_id, symbol))
+        if window is None:
+            window = self._price_windows[(user_id, symbol)] = PriceWindow(maxlen=self.window_size)
+        return window
+
+    def _market_window(self, symbol: str) -> PriceWindow:
+        window = self._market_windows.get(symbol)
+        if window is None:
+            window = self._market_windows[symbol] = PriceWindow(maxlen=self.window_size)
+        return window
 
     def evaluate(
         self,
@@ -27,9 +44,40 @@ class AIFilterService:
         news_spike: bool,
         confidence_threshold: float,
     ) -> AIDecision:
-        window = self._price_windows.setdefault((user_id, symbol), deque(maxlen=20))
-        window.append(price)
+        if self.journal is None:
+            self._user_window(user_id, symbol).append(price)
+        else:
+            self.journal.append(USER_WINDOW, user_id, symbol, price)
+        window = self._price_windows[(user_id, symbol)]
+        return self._decide(window, news_spike=news_spike, confidence_threshold=confidence_threshold)
+
+    def evaluate_market(
+        self,
+        *,
+        symbol: str,
+        price: float,
+        news_spike: bool,
+        confidence_threshold: float,
+    ) -> AIDecision:
+        """Evaluate a market-wide tick against one shared window per symbol.
 
+        A market tick is the same price for every subscribed user, so the
+        window and the decision are computed once rather than per user.
+        """
+        if self.journal is None:
+            self._market_window(symbol).append(price)
+        else:
+            self.journal.append(MARKET_WINDOW, symbol, price)
+        window = self._market_windows[symbol]
+        return self._decide(window, news_spike=news_spike, confidence_threshold=confidence_threshold)
+
+    def _decide(
+        self,
+        window: PriceWindow,
+        *,
+        news_spike: bool,
+        confidence_threshold: float,
+    ) -> AIDecision:
         if news_spike:
             return AIDecision(
                 approved=False,
@@ -69,32 +117,9 @@ class AIFilterService:
         )
 
     @staticmethod
-    def _trend_strength(window: deque[float]) -> float:
-        if len(window) < 3:
-            return 0.0
-        first = window[0]
-        last = window[-1]
-        if first == 0:
-            return 0.0
-        return abs((last - first) / first)
+    def _trend_strength(window: PriceWindow) -> float:
+        return window.trend_strength()
 
     @staticmethod
-    def _volatility(window: deque[float]) -> float:
-        if len(window) < 4:
-            return 0.0
-
-        returns: list[float] = []
-        prices = list(window)
-        for idx in range(1, len(prices)):
-            prev = prices[idx - 1]
-            curr = prices[idx]
-            if prev == 0:
-                continue
-            returns.append((curr - prev) / prev)
-
-        if len(returns) < 2:
-            return 0.0
-
-        mean = sum(returns) / len(returns)
-        variance = sum((item - mean) ** 2 for item in returns) / len(returns)
-        return sqrt(variance)
+    def _volatility(window: PriceWindow) -> float:
+        return window.volatility()
@@ -5,20 +5,27 @@ from app.db import store
 
 class DashboardService:
     def current_prices(self, user_id: str) -> dict[str, float]:
+        return self._entry_prices(store.get_open_trades(user_id))
+
+    @staticmethod
+    def _entry_prices(open_trades: list[dict]) -> dict[str, float]:
         prices: dict[str, float] = {}
-        for trade in store.get_open_trades(user_id):
+        for trade in open_trades:
             prices[str(trade["symbol"])] = float(trade["entry_price"])
         return prices
 
     def summary(self, user_id: str) -> dict:
-        risk_config = store.get_risk_config(user_id)
+        state = store.get_user_trading_state(user_id)
+        risk_config = state.risk_config
         allocated_capital = float(risk_config["allocated_capital"]) if risk_config else 0.0
 
-        realized = store.get_realized_pnl_today(user_id)
-        unrealized = store.get_unrealized_pnl(user_id, self.current_prices(user_id))
-        margin = store.get_open_exposure(user_id)
+        realized = state.realized_pnl_today
+        unrealized = store.calculate_unrealized_pnl(
+            state.open_trades, self._entry_prices(state.open_trades)
+        )
+        margin = state.open_exposure
 
-        session = store.get_bot_session(user_id)
+        session = state.bot_session
         running = bool(session["is_running"]) if session else False
 
         balance = allocated_capital + realized
@@ -0,0 +1,216 @@
+"""Append-only journal of engine events for warm restarts.
+
+``TradingEngine`` and ``AIFilterService`` keep the last price per
+(user, symbol), the tick sequencer's last accepted timestamp per
+(user, symbol) and the rolling AI price windows in process memory. With a
+journal attached, every change to that memory goes through
+:meth:`EngineJournal.append`, which writes the event and applies it under
+one lock, so the journal and the memory never disagree. Trade opens and
+closes and bot stops are journaled too, as a record of what the engine did;
+their state lives in the store.
+
+Events are msgpack arrays ``[kind, epoch_us, ...]`` appended to numbered
+segment files. Every ``snapshot_every`` events the in-memory state is
+written to a snapshot that names the next segment, and older segments are
+deleted. :meth:`restore` loads the snapshot and replays the segments after
+it. Writes are buffered, not fsynced: a crash loses at most the unflushed
+tail, which only costs trend history, never trades.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+import msgpack
+
+from app.core.timestamps import now_us
+from app.services.price_window import PriceWindow
+
+if TYPE_CHECKING:
+    from app.services.ai_filter import AIFilterService
+    from app.services.trading_engine import TradingEngine
+
+# Event kinds.
+LAST_PRICE = "p"
+USER_WINDOW = "w"
+MARKET_WINDOW = "m"
+TRADE_OPENED = "o"
+TRADE_CLOSED = "c"
+BOT_STOPPED = "s"
+TICK_SEQUENCED = "q"
+
+SNAPSHOT_FILE = "engine.snapshot"
+_SEGMENT_PREFIX = "engine.journal."
+
+
+class EngineJournal:
+    def __init__(self, directory: str | Path, *, snapshot_every: int = 100_000) -> None:
+        self.directory = Path(directory)
+        self.snapshot_every = snapshot_every
+        self._engine: TradingEngine | None = None
+        self._ai_filter: AIFilterService | None = None
+        self._lock = threading.Lock()
+        self._packer = msgpack.Packer()
+        self._segment = 0
+        self._file: BinaryIO | None = None
+        self._events_since_snapshot = 0
+
+    def attach(self, engine: TradingEngine, ai_filter: AIFilterService) -> None:
+        self._engine = engine
+        self._ai_filter = ai_filter
+        engine.journal = self
+        engine.sequencer.journal = self
+        ai_filter.journal = self
+
+    def append(self, kind: str, *fields: Any) -> None:
+        """Journal one event and apply it to the attached engine and filter."""
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            assert self._file is not None
+            self._file.write(self._packer.pack([kind, now_us(), *fields]))
+            self._apply(kind, fields)
+            self._events_since_snapshot += 1
+            if self._events_since_snapshot >= self.snapshot_every:
+                self._snapshot_locked()
+
+    def _apply(self, kind: str, fields: tuple | list) -> None:
+        if kind == LAST_PRICE:
+            user_id, symbol, price = fields
+            assert self._engine is not None
+            self._engine._last_prices[(user_id, symbol)] = price
+        elif kind == TICK_SEQUENCED:
+            user_id, symbol, timestamp = fields
+            assert self._engine is not None
+            self._engine.sequencer._last[(user_id, symbol)] = timestamp
+        elif kind == USER_WINDOW:
+            user_id, symbol, price = fields
+            assert self._ai_filter is not None
+            self._ai_filter._user_window(user_id, symbol).append(price)
+        elif kind == MARKET_WINDOW:
+            symbol, price = fields
+            assert self._ai_filter is not None
+            self._ai_filter._market_window(symbol).append(price)
+
+    def restore(self) -> int:
+        """Rebuild the attached engine and filter from disk; returns events replayed.
+
+        Call before the first tick. A torn record at the end of a segment is
+        ignored.
+        """
+        assert self._engine is not None and self._ai_filter is not None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            first_segment = 0
+            snapshot_path = self.directory / SNAPSHOT_FILE
+            if snapshot_path.exists():
+                snapshot = msgpack.unpackb(snapshot_path.read_bytes(), raw=False)
+                first_segment = int(snapshot["segment"])
+                self._engine._last_prices = {
+                    (user_id, symbol): price for user_id, symbol, price in snapshot["last_prices"]
+                }
+                # Absent from snapshots written before ticks were sequenced.
+                self._engine.sequencer._last = {
+                    (user_id, symbol): timestamp
+                    for user_id, symbol, timestamp in snapshot.get("sequence", [])
+                }
+                self._ai_filter._price_windows = {
+                    (user_id, symbol): PriceWindow(prices, maxlen=self._ai_filter.window_size)
+                    for user_id, symbol, prices in snapshot["windows"]
+                }
+                self._ai_filter._market_windows = {
+                    symbol: PriceWindow(prices, maxlen=self._ai_filter.window_size)
+                    for symbol, prices in snapshot["market_windows"]
+                }
+
+            replayed = 0
+            segments = [segment for segment in self._segments() if segment >= first_segment]
+            for segment in segments:
+                unpacker = msgpack.Unpacker(raw=False)
+                unpacker.feed(self._segment_path(segment).read_bytes())
+                try:
+                    for kind, _, *fields in unpacker:
+                        self._apply(kind, fields)
+                        replayed += 1
+                except (msgpack.UnpackException, ValueError):
+                    # Corrupt tail; everything before it has been applied.
+                    pass
+            self._segment = segments[-1] if segments else first_segment
+            if replayed:
+                # Fold the tail into a fresh snapshot so the next restart
+                # starts clean and the replayed segments can go.
+                self._snapshot_locked()
+            return replayed
+
+    def snapshot(self) -> None:
+        with self._lock:
+            self._snapshot_locked()
+
+    def _snapshot_locked(self) -> None:
+        assert self._engine is not None and self._ai_filter is not None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        next_segment = self._segment + 1
+        state = {
+            "segment": next_segment,
+            "created_at": now_us(),
+            "last_prices": [
+                [user_id, symbol, price]
+                for (user_id, symbol), price in self._engine._last_prices.items()
+            ],
+            "sequence": [
+                [user_id, symbol, timestamp]
+                for (user_id, symbol), timestamp in self._engine.sequencer._last.items()
+            ],
+            "windows": [
+                [user_id, symbol, list(window)]
+                for (user_id, symbol), window in self._ai_filter._price_windows.items()
+            ],
+            "market_windows": [
+                [symbol, list(window)] for symbol, window in self._ai_filter._market_windows.items()
+            ],
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.directory / f"{SNAPSHOT_FILE}.tmp"
+        with tmp_path.open("wb") as handle:
+            handle.write(msgpack.packb(state))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self.directory / SNAPSHOT_FILE)
+        for segment in self._segments():
+            if segment < next_segment:
+                self._segment_path(segment).unlink(missing_ok=True)
+        self._segment = next_segment
+        self._events_since_snapshot = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        """Snapshot pending events so the next start replays nothing."""
+        with self._lock:
+            if self._events_since_snapshot and self._engine is not None:
+                self._snapshot_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open_segment(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = self._segment_path(self._segment).open("ab")
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"{_SEGMENT_PREFIX}{segment:08d}"
+
+    def _segments(self) -> list[int]:
+        return sorted(
+            int(path.name[len(_SEGMENT_PREFIX) :])
+            for path in self.directory.glob(f"{_SEGMENT_PREFIX}*")
+            if path.name[len(_SEGMENT_PREFIX) :].isdigit()
+        )
@@ -0,0 +1,264 @@
+"""Per-user trading state the engine keeps between ticks.
+
+``EngineStateCache`` holds a parsed, typed copy of each user's configs, bot
+session and today's realized PnL so the tick path only touches the store to
+write. The engine updates the cached copy alongside every store write it
+makes; routes that change configs or the bot session call
+:meth:`EngineStateCache.invalidate`. Entries also expire at the end of the
+UTC trading day and after ``ENGINE_STATE_TTL_SECONDS``, which bounds how long
+writes from other processes go unnoticed.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+
+from app.config import get_settings
+from app.core.timestamps import MICROS_PER_DAY, MICROS_PER_MINUTE, MICROS_PER_SECOND, now_us
+from app.db import store
+from app.services.timer_wheel import TimerWheel
+from app.services.trigger_book import TradeTrigger, TriggerIndex
+
+
+def parse_assets(value: str) -> frozenset[str]:
+    return frozenset(item.strip().upper() for item in value.split(",") if item.strip())
+
+
+@dataclass(frozen=True, slots=True)
+class TradingSettings:
+    allowed_assets: frozenset[str]
+    timeframe: str
+    max_trades_per_session: int
+    quantity: float
+    profit_threshold: float
+    loss_threshold: float
+
+    @classmethod
+    def from_row(cls, row: dict) -> TradingSettings:
+        return cls(
+            allowed_assets=parse_assets(str(row["assets"])),
+            timeframe=str(row["timeframe"]),
+            max_trades_per_session=int(row["max_trades_per_session"]),
+            quantity=float(row["quantity"]),
+            profit_threshold=float(row["profit_threshold"]),
+            loss_threshold=float(row["loss_threshold"]),
+        )
+
+    def trigger_for(self, user_id: str, trade: dict) -> TradeTrigger:
+        return TradeTrigger.for_trade(
+            user_id,
+            trade,
+            profit_threshold=self.profit_threshold,
+            loss_threshold=self.loss_threshold,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RiskLimits:
+    daily_profit_target: float
+    daily_loss_limit: float
+    allocated_capital: float
+
+    @classmethod
+    def from_row(cls, row: dict) -> RiskLimits:
+        return cls(
+            daily_profit_target=float(row["daily_profit_target"]),
+            daily_loss_limit=float(row["daily_loss_limit"]),
+            allocated_capital=float(row["allocated_capital"]),
+        )
+
+
+@dataclass(slots=True)
+class UserEngineState:
+    user_id: str
+    trading: TradingSettings | None
+    risk: RiskLimits | None
+    running: bool
+    started_at: int | None
+    trades_opened: int
+    # Epoch-us instant the session runs out, or None without a session config.
+    session_deadline: int | None
+    realized_pnl_today: float
+    # The bot stops once realized_pnl_today leaves (pnl_floor, pnl_ceiling);
+    # unbounded without a risk config.
+    pnl_floor: float
+    pnl_ceiling: float
+    open_trades: dict[str, dict]
+    expires_at: int
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @classmethod
+    def from_snapshot(
+        cls, snapshot: store.UserTradingState, *, expires_at: int
+    ) -> UserEngineState:
+        session = snapshot.bot_session or {}
+        started_at = int(session["started_at"]) if session.get("started_at") else None
+        deadline = None
+        if snapshot.session_config is not None and started_at is not None:
+            duration = int(snapshot.session_config["duration_minutes"]) * MICROS_PER_MINUTE
+            deadline = started_at + duration
+
+        open_trades: dict[str, dict] = {}
+        for trade in snapshot.open_trades:
+            open_trades.setdefault(str(trade["symbol"]), trade)
+
+        risk = (
+            RiskLimits.from_row(snapshot.risk_config)
+            if snapshot.risk_config is not None
+            else None
+        )
+        return cls(
+            user_id=snapshot.user_id,
+            trading=(
+                TradingSettings.from_row(snapshot.trading_config)
+                if snapshot.trading_config is not None
+                else None
+            ),
+            risk=risk,
+            running=bool(session.get("is_running")),
+            started_at=started_at,
+            trades_opened=int(session.get("trades_opened_this_session") or 0),
+            session_deadline=deadline,
+            realized_pnl_today=snapshot.realized_pnl_today,
+            pnl_floor=-risk.daily_loss_limit if risk is not None else float("-inf"),
+            pnl_ceiling=risk.daily_profit_target if risk is not None else float("inf"),
+            open_trades=open_trades,
+            expires_at=expires_at,
+        )
+
+    @property
+    def open_exposure(self) -> float:
+        return sum(
+            float(trade["entry_price"]) * float(trade["quantity"])
+            for trade in self.open_trades.values()
+        )
+
+
+class EngineStateCache:
+    """Per-user engine state plus a symbol -> running users subscription index.
+
+    The index is built from the trading configs of running bots and dropped
+    by every invalidation, so it follows config changes and bot start/stop.
+    ``triggers`` holds the TP/SL triggers of the open trades of every cached
+    user whose bot is running; they are re-registered on each load.
+    ``session_timers`` holds the session deadline of every cached running
+    user in the same way. Invalidated users are queued for a reload (see
+    :meth:`take_timer_reloads`) so a started or reconfigured session gets
+    its timer before its next tick.
+    """
+
+    def __init__(self) -> None:
+        self._states: dict[str, UserEngineState] = {}
+        # Bumped by invalidate()/clear() so a load that raced a write is not cached.
+        self._versions: dict[str, int] = {}
+        self._generation = 0
+        self._subscribers: dict[str, tuple[str, ...]] | None = None
+        self._subscribers_expire_at = 0
+        self._subscribers_generation = 0
+        self._lock = threading.Lock()
+        self.triggers = TriggerIndex()
+        self.session_timers: TimerWheel[str] = TimerWheel(resolution_us=MICROS_PER_SECOND)
+        self._timer_reloads: set[str] = set()
+
+    def get(self, user_id: str) -> UserEngineState:
+        now = now_us()
+        state = self._states.get(user_id)
+        if state is not None and now < state.expires_at:
+            return state
+        return self._load(user_id, now)
+
+    def peek(self, user_id: str) -> UserEngineState | None:
+        """The cached state of ``user_id`` if present and fresh, without loading it."""
+        state = self._states.get(user_id)
+        if state is None or now_us() >= state.expires_at:
+            return None
+        return state
+
+    def _load(self, user_id: str, now: int) -> UserEngineState:
+        with self._lock:
+            version = (self._generation, self._versions.get(user_id, 0))
+        # Computed before the read so a load straddling midnight expires early,
+        # never late.
+        day_end = now - now % MICROS_PER_DAY + MICROS_PER_DAY
+        ttl = int(get_settings().ENGINE_STATE_TTL_SECONDS * MICROS_PER_SECOND)
+        state = UserEngineState.from_snapshot(
+            store.get_user_trading_state(user_id), expires_at=min(day_end, now + ttl)
+        )
+        with self._lock:
+            cached = (self._generation, self._versions.get(user_id, 0)) == version
+            if cached:
+                self._states[user_id] = state
+        if cached:
+            self.triggers.discard_user(user_id)
+            if state.running and state.trading is not None:
+                for trade in state.open_trades.values():
+                    self.triggers.add(state.trading.trigger_for(user_id, trade))
+            if state.running and state.session_deadline is not None:
+                self.session_timers.schedule(user_id, state.session_deadline)
+            else:
+                self.session_timers.cancel(user_id)
+        return state
+
+    def take_timer_reloads(self) -> list[str]:
+        """Users invalidated since the last call, whose session timers are stale."""
+        with self._lock:
+            user_ids = list(self._timer_reloads)
+            self._timer_reloads.clear()
+        return user_ids
+
+    def subscribers(self, symbol: str) -> tuple[str, ...]:
+        """Users with a running bot whose trading config enables ``symbol``."""
+        index = self._subscribers
+        if index is None or now_us() >= self._subscribers_expire_at:
+            index = self._load_subscribers()
+        return index.get(symbol, ())
+
+    def _load_subscribers(self) -> dict[str, tuple[str, ...]]:
+        now = now_us()
+        with self._lock:
+            generation = self._subscribers_generation
+        users_by_symbol: dict[str, list[str]] = {}
+        for row in store.list_running_trading_assets():
+            for symbol in parse_assets(str(row["assets"])):
+                users_by_symbol.setdefault(symbol, []).append(str(row["user_id"]))
+        index = {symbol: tuple(sorted(users)) for symbol, users in users_by_symbol.items()}
+        ttl = int(get_settings().ENGINE_STATE_TTL_SECONDS * MICROS_PER_SECOND)
+        with self._lock:
+            if self._subscribers_generation == generation:
+                self._subscribers = index
+                self._subscribers_expire_at = now + ttl
+        return index
+
+    def invalidate_subscribers(self) -> None:
+        with self._lock:
+            self._subscribers_generation += 1
+            self._subscribers = None
+
+    def invalidate(self, *user_ids: str) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._states.pop(user_id, None)
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._timer_reloads.update(user_ids)
+            self._subscribers_generation += 1
+            self._subscribers = None
+        for user_id in user_ids:
+            self.triggers.discard_user(user_id)
+            self.session_timers.cancel(user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._states.clear()
+            self._timer_reloads.clear()
+            self._subscribers_generation += 1
+            self._subscribers = None
+        self.triggers.clear()
+        self.session_timers.clear()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+engine_state_cache = EngineStateCache()
@@ -4,12 +4,30 @@ from collections import deque
 
 
 class LatencyMetricsService:
-    def __init__(self) -> None:
+    def __init__(self, max_samples: int = 2000) -> None:
+        self._max_samples = max_samples
         self._samples: dict[str, deque[float]] = {}
+        self._totals: dict[str, int] = {}
 
     def record(self, metric: str, latency_ms: float) -> None:
-        bucket = self._samples.setdefault(metric, deque(maxlen=2000))
+        bucket = self._samples.setdefault(metric, deque(maxlen=self._max_samples))
         bucket.append(max(0.0, float(latency_ms)))
+        self._totals[metric] = self._totals.get(metric, 0) + 1
+
+    def recent_percentile(
+        self, metric: str, percentile: int, *, since: int
+    ) -> tuple[float | None, int]:
+        """Percentile of the samples recorded after the first ``since`` ones.
+
+        Returns it (None without new samples) with the running sample count
+        to pass as ``since`` next time.
+        """
+        total = self._totals.get(metric, 0)
+        fresh = min(total - since, self._max_samples)
+        if fresh <= 0:
+            return None, total
+        values = list(self._samples[metric])[-fresh:]
+        return self._percentile(sorted(values), percentile), total
 
     def snapshot(self) -> dict[str, dict[str, float | int]]:
         output: dict[str, dict[str, float | int]] = {}
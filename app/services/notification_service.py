@@ -1,6 +1,3 @@
-class NotificationService:
-    pass
-
 from __future__ import annotations
 
 from app.db import store
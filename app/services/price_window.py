@@ -0,0 +1,119 @@
+"""Fixed-size price window with running return statistics.
+
+``PriceWindow`` keeps the last ``maxlen`` prices in a ring buffer and the
+count, mean and sum of squared deviations of the simple returns between
+consecutive prices in it. Appending a price adds one return and, once the
+window is full, evicts the oldest, each a Welford update, so the AI filter's
+trend and volatility are O(1) per tick with no allocation. The running sums
+are recomputed from the ring every ``_RESYNC_EVERY`` evictions, which keeps
+rounding drift from building up over a long-lived window.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from math import sqrt
+
+# Evictions between exact recomputations, in multiples of the window size.
+_RESYNC_EVERY = 64
+
+
+class PriceWindow:
+    """Drop-in for ``deque(maxlen=...)`` of prices: append, len, iteration, indexing."""
+
+    __slots__ = ("maxlen", "_prices", "_start", "_size", "_count", "_mean", "_m2", "_evictions")
+
+    def __init__(self, prices: Iterable[float] = (), *, maxlen: int) -> None:
+        self.maxlen = maxlen
+        self._prices = [0.0] * maxlen
+        self._start = 0
+        self._size = 0
+        # Returns in the window: count, mean and sum of squared deviations.
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._evictions = 0
+        for price in prices:
+            self.append(price)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> float:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("price window index out of range")
+        return self._prices[(self._start + index) % self.maxlen]
+
+    def __iter__(self) -> Iterator[float]:
+        for index in range(self._size):
+            yield self._prices[(self._start + index) % self.maxlen]
+
+    def __repr__(self) -> str:
+        return f"PriceWindow({list(self)!r}, maxlen={self.maxlen})"
+
+    def append(self, price: float) -> None:
+        prices = self._prices
+        maxlen = self.maxlen
+        size = self._size
+        previous = prices[(self._start + size - 1) % maxlen] if size else None
+        if size < maxlen:
+            prices[(self._start + size) % maxlen] = price
+            self._size = size + 1
+        else:
+            if maxlen > 1:
+                oldest = prices[self._start]
+                if oldest != 0:
+                    self._evict((prices[(self._start + 1) % maxlen] - oldest) / oldest)
+            prices[self._start] = price
+            self._start = (self._start + 1) % maxlen
+        if previous is not None and previous != 0 and maxlen > 1:
+            self._add((price - previous) / previous)
+        if self._evictions >= _RESYNC_EVERY * maxlen:
+            self._resync()
+
+    def _add(self, value: float) -> None:
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+    def _evict(self, value: float) -> None:
+        self._count -= 1
+        if self._count == 0:
+            self._mean = self._m2 = 0.0
+            return
+        delta = value - self._mean
+        self._mean -= delta / self._count
+        self._m2 -= delta * (value - self._mean)
+        self._evictions += 1
+
+    def _resync(self) -> None:
+        """Recompute the return statistics exactly from the prices in the ring."""
+        returns = []
+        previous = None
+        for price in self:
+            if previous is not None and previous != 0:
+                returns.append((price - previous) / previous)
+            previous = price
+        self._count = len(returns)
+        self._mean = sum(returns) / self._count if returns else 0.0
+        self._m2 = sum((item - self._mean) ** 2 for item in returns)
+        self._evictions = 0
+
+    def trend_strength(self) -> float:
+        """|last - first| / first over the window; 0 with fewer than 3 prices."""
+        if self._size < 3:
+            return 0.0
+        first = self._prices[self._start]
+        if first == 0:
+            return 0.0
+        last = self._prices[(self._start + self._size - 1) % self.maxlen]
+        return abs((last - first) / first)
+
+    def volatility(self) -> float:
+        """Population standard deviation of the window's returns."""
+        if self._size < 4 or self._count < 2:
+            return 0.0
+        return sqrt(max(self._m2, 0.0) / self._count)
@@ -0,0 +1,197 @@
+"""Per-user tick actors: strict ordering per user, parallelism across users.
+
+Every user has a mailbox of pending jobs. Users are hashed onto a fixed set
+of worker tasks; a worker takes the next ready user, runs the job at the head
+of that user's mailbox on the store's tick pool and requeues the user if more
+jobs are waiting. A user's jobs therefore run one at a time in arrival order,
+while users on different workers run concurrently and users sharing a worker
+take turns instead of queueing behind each other's backlog.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import zlib
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any, ParamSpec, TypeVar
+
+from app.config import get_settings
+from app.db import async_store
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class _WorkerStats:
+    processed: int = 0
+    queued: int = 0
+    max_queued: int = 0
+
+
+@dataclass(slots=True, eq=False)
+class _Job:
+    call: Callable[[], Any]
+    future: asyncio.Future[Any]
+    user_ids: tuple[str, ...]
+    # Mailboxes this job has not yet reached the head of.
+    waiting: int
+
+
+class TickActorPool:
+    def __init__(self, workers: int | None = None) -> None:
+        self._worker_count = workers
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ready: list[asyncio.Queue[str]] = []
+        self._tasks: list[asyncio.Task[None]] = []
+        self._mailboxes: dict[str, deque[_Job]] = {}
+        self._stats: list[_WorkerStats] = []
+
+    @property
+    def workers(self) -> int:
+        if self._ready:
+            return len(self._ready)
+        return self._worker_count or get_settings().ENGINE_ACTOR_WORKERS
+
+    def worker_for(self, user_id: str) -> int:
+        """Stable worker index for ``user_id`` (independent of PYTHONHASHSEED)."""
+        return zlib.crc32(user_id.encode("utf-8")) % self.workers
+
+    async def submit(
+        self, user_id: str, func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        """Run ``func`` after every job already submitted for ``user_id``."""
+        return await self.submit_many((user_id,), func, *args, **kwargs)
+
+    async def submit_many(
+        self,
+        user_ids: Iterable[str],
+        func: Callable[P, T],
+        /,
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T:
+        """Run ``func`` once, ordered against the jobs of every user in ``user_ids``.
+
+        The job is queued in each mailbox at once and runs when it heads all
+        of them; those users' later jobs wait for it. Since every mailbox sees
+        jobs in the same submission order, two such jobs cannot deadlock.
+        With no users the job has nothing to order against and runs at once.
+        """
+        self._ensure_started()
+        owners = tuple(dict.fromkeys(user_ids))
+        if not owners:
+            return await async_store.run_tick(func, *args, **kwargs)
+        job = _Job(
+            call=functools.partial(func, *args, **kwargs),
+            future=asyncio.get_running_loop().create_future(),
+            user_ids=owners,
+            waiting=len(owners),
+        )
+        for user_id in owners:
+            worker = self.worker_for(user_id)
+            mailbox = self._mailboxes.get(user_id)
+            if mailbox is None:
+                mailbox = self._mailboxes[user_id] = deque()
+                self._ready[worker].put_nowait(user_id)
+            mailbox.append(job)
+            stats = self._stats[worker]
+            stats.queued += 1
+            stats.max_queued = max(stats.max_queued, stats.queued)
+        return await job.future
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # First use, or the previous loop is gone (e.g. between test event loops).
+        self._cancel()
+        workers = self.workers
+        self._loop = loop
+        self._ready = [asyncio.Queue() for _ in range(workers)]
+        self._stats = [_WorkerStats() for _ in range(workers)]
+        self._tasks = [
+            loop.create_task(self._work(index), name=f"tick-actor-{index}")
+            for index in range(workers)
+        ]
+
+    async def _work(self, index: int) -> None:
+        ready = self._ready[index]
+        while True:
+            user_id = await ready.get()
+            mailbox = self._mailboxes.get(user_id)
+            if not mailbox:
+                continue
+            job = mailbox[0]
+            job.waiting -= 1
+            if job.waiting:
+                # The worker of the last mailbox to reach this job runs it.
+                continue
+            try:
+                # Runs even if the submitter stopped waiting, as a plain
+                # executor call would.
+                result = await async_store.run_tick(job.call)
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as exc:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self._stats[index].processed += 1
+                self._release(job)
+
+    def _release(self, job: _Job) -> None:
+        for user_id in job.user_ids:
+            mailbox = self._mailboxes.get(user_id)
+            if not mailbox or mailbox[0] is not job:
+                # Dropped by _cancel().
+                continue
+            mailbox.popleft()
+            worker = self.worker_for(user_id)
+            self._stats[worker].queued -= 1
+            if mailbox:
+                self._ready[worker].put_nowait(user_id)
+            else:
+                del self._mailboxes[user_id]
+
+    def stats(self) -> list[dict[str, int]]:
+        """Queue depth per worker: waiting users, queued jobs and high-water mark."""
+        users = [0] * len(self._stats)
+        for user_id in self._mailboxes:
+            users[self.worker_for(user_id)] += 1
+        return [
+            {
+                "worker": index,
+                "users": users[index],
+                "queued": stats.queued,
+                "max_queued": stats.max_queued,
+                "processed": stats.processed,
+            }
+            for index, stats in enumerate(self._stats)
+        ]
+
+    def _cancel(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for mailbox in self._mailboxes.values():
+            for job in mailbox:
+                job.future.cancel()
+        self._tasks = []
+        self._ready = []
+        self._mailboxes.clear()
+        self._loop = None
+
+    async def shutdown(self) -> None:
+        tasks = self._tasks if self._loop is asyncio.get_running_loop() else []
+        self._cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+tick_actors = TickActorPool()
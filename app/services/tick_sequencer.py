@@ -0,0 +1,47 @@
+"""Per-(user, symbol) tick ordering by the feed's timestamp.
+
+A tick that carries a timestamp must be strictly newer than the last one
+accepted for the same user and symbol: an equal timestamp is a duplicate
+(a replayed tick) and an older one arrived late. Either would have the engine
+act on a price that is no longer current, so both are rejected. Ticks
+without a timestamp are always accepted and do not move the sequence.
+
+With an engine journal attached, each accepted timestamp is journaled and
+applied by the journal, so the sequence survives a warm restart and replayed
+ticks are still recognised as duplicates.
+"""
+
+from __future__ import annotations
+
+import threading
+
+from app.services.engine_journal import TICK_SEQUENCED, EngineJournal
+
+DUPLICATE_TICK = "Duplicate tick"
+OUT_OF_ORDER_TICK = "Out-of-order tick"
+
+
+class TickSequencer:
+    def __init__(self) -> None:
+        self._last: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self.journal: EngineJournal | None = None
+
+    def check(self, user_id: str, symbol: str, timestamp: int | None) -> str | None:
+        """Accept the tick and return None, or return why it is rejected."""
+        if timestamp is None:
+            return None
+        key = (user_id, symbol)
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and timestamp <= last:
+                return DUPLICATE_TICK if timestamp == last else OUT_OF_ORDER_TICK
+            if self.journal is None:
+                self._last[key] = timestamp
+            else:
+                self.journal.append(TICK_SEQUENCED, user_id, symbol, timestamp)
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._last.clear()
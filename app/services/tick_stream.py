@@ -0,0 +1,179 @@
+"""Binary tick frames for the streaming ingestion WebSocket.
+
+A binary message carries one or more msgpack arrays back to back, one per
+tick::
+
+    [seq, symbol, price]
+    [seq, symbol, price, confidence_threshold]
+    [seq, symbol, price, confidence_threshold, news_spike]
+    [seq, symbol, price, confidence_threshold, news_spike, timestamp_us]
+
+``seq`` is any client-chosen integer that is echoed on the decision. Ticks
+are for the user the connection authenticated as. ``timestamp_us`` is the
+feed's epoch-microsecond tick time, used to drop duplicate and late ticks. Decisions stream back the
+same way, one array per tick::
+
+    [seq, action, message, symbol, side, pnl, entry_price, close_price,
+     ai_approved, ai_confidence, ai_reasons]
+
+and a tick that cannot be decoded is answered with ``[seq, "error", message]``
+(``seq`` is -1 when the frame itself is unreadable).
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import threading
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+
+import msgpack
+
+from app.core.timestamps import from_epoch_us, now_us
+from app.schemas.trading import TickRequest
+
+DEFAULT_CONFIDENCE_THRESHOLD = TickRequest.model_fields["confidence_threshold"].default
+
+
+class TickFrameError(ValueError):
+    def __init__(self, message: str, seq: int = -1) -> None:
+        super().__init__(message)
+        self.seq = seq
+
+
+def _tick_from_item(item: object, user_id: str) -> tuple[int, TickRequest]:
+    if not isinstance(item, (list, tuple)) or not 3 <= len(item) <= 6:
+        raise TickFrameError(
+            "Tick must be [seq, symbol, price, confidence?, news_spike?, timestamp_us?]"
+        )
+    seq = item[0]
+    if not isinstance(seq, int) or isinstance(seq, bool):
+        raise TickFrameError("seq must be an integer")
+    symbol, price = item[1], item[2]
+    confidence = item[3] if len(item) > 3 else DEFAULT_CONFIDENCE_THRESHOLD
+    news_spike = item[4] if len(item) > 4 else False
+    timestamp = item[5] if len(item) > 5 else None
+    if not isinstance(symbol, str) or not symbol.strip():
+        raise TickFrameError("symbol must be a non-empty string", seq)
+    if (
+        not isinstance(price, (int, float))
+        or isinstance(price, bool)
+        or not math.isfinite(price)
+        or price <= 0
+    ):
+        raise TickFrameError("price must be a positive number", seq)
+    if not isinstance(confidence, (int, float)) or not 0.0 <= confidence <= 1.0:
+        raise TickFrameError("confidence_threshold must be between 0 and 1", seq)
+    if not isinstance(news_spike, bool):
+        raise TickFrameError("news_spike must be a boolean", seq)
+    tick_time = None
+    if timestamp is not None:
+        if not isinstance(timestamp, int) or isinstance(timestamp, bool):
+            raise TickFrameError("timestamp_us must be an integer", seq)
+        try:
+            tick_time = from_epoch_us(timestamp)
+        except OverflowError as error:
+            raise TickFrameError("timestamp_us is out of range", seq) from error
+    # Already checked field by field; skip pydantic validation on the hot path.
+    return seq, TickRequest.model_construct(
+        user_id=user_id,
+        symbol=symbol.strip().upper(),
+        price=float(price),
+        news_spike=news_spike,
+        confidence_threshold=float(confidence),
+        timestamp=tick_time,
+    )
+
+
+def decode_ticks(
+    data: bytes, *, user_id: str
+) -> tuple[list[tuple[int, TickRequest]], list[TickFrameError]]:
+    """Decode every tick in ``data``; returns the ticks and the per-tick errors.
+
+    Raises ``TickFrameError`` when ``data`` is not a sequence of msgpack values.
+    """
+    unpacker = msgpack.Unpacker(use_list=True, raw=False, strict_map_key=True)
+    unpacker.feed(data)
+    ticks: list[tuple[int, TickRequest]] = []
+    errors: list[TickFrameError] = []
+    try:
+        for item in unpacker:
+            try:
+                ticks.append(_tick_from_item(item, user_id))
+            except TickFrameError as error:
+                errors.append(error)
+    except (msgpack.UnpackException, ValueError) as error:
+        raise TickFrameError(f"Malformed frame: {error}") from error
+    if not ticks and not errors:
+        raise TickFrameError("Empty frame")
+    return ticks, errors
+
+
+def encode_decisions(decisions: Iterable[tuple[int, dict]]) -> bytes:
+    packer = msgpack.Packer()
+    return b"".join(
+        packer.pack(
+            [
+                seq,
+                payload["action"],
+                payload["message"],
+                payload["symbol"],
+                payload["side"],
+                payload["pnl"],
+                payload["entry_price"],
+                payload["close_price"],
+                payload["ai_approved"],
+                payload["ai_confidence"],
+                payload["ai_reasons"],
+            ]
+        )
+        for seq, payload in decisions
+    )
+
+
+def encode_errors(errors: Iterable[TickFrameError]) -> bytes:
+    packer = msgpack.Packer()
+    return b"".join(packer.pack([error.seq, "error", str(error)]) for error in errors)
+
+
+@dataclass(slots=True)
+class StreamStats:
+    connection_id: int
+    user_id: str
+    opened_at: int = field(default_factory=now_us)
+    frames_in: int = 0
+    ticks_in: int = 0
+    decisions_out: int = 0
+    errors: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    # Times the reader found the in-flight queue full and stopped reading.
+    backpressure_waits: int = 0
+
+
+class StreamRegistry:
+    """Live per-connection counters for ``GET /metrics/streams``."""
+
+    def __init__(self) -> None:
+        self._streams: dict[int, StreamStats] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def open(self, user_id: str) -> StreamStats:
+        stats = StreamStats(connection_id=next(self._ids), user_id=user_id)
+        with self._lock:
+            self._streams[stats.connection_id] = stats
+        return stats
+
+    def close(self, stats: StreamStats) -> None:
+        with self._lock:
+            self._streams.pop(stats.connection_id, None)
+
+    def snapshot(self) -> list[dict[str, int | str]]:
+        with self._lock:
+            streams = list(self._streams.values())
+        return [asdict(stats) for stats in streams]
+
+
+tick_streams = StreamRegistry()
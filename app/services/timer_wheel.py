@@ -0,0 +1,80 @@
+"""Hashed timing wheel for keyed deadlines.
+
+Deadlines are hashed into ``slots`` buckets of ``resolution_us`` each, so
+scheduling and cancelling are O(1) and advancing the clock only visits the
+buckets that elapsed. A deadline further out than one turn of the wheel stays
+in its bucket until the turn it falls in.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class TimerWheel(Generic[K]):
+    def __init__(self, *, resolution_us: int, slots: int = 512) -> None:
+        self.resolution_us = resolution_us
+        self._slots: list[dict[K, int]] = [{} for _ in range(slots)]
+        # Tick of the slot each key sits in.
+        self._ticks: dict[K, int] = {}
+        self._cursor: int | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ticks)
+
+    def _slot(self, tick: int) -> dict[K, int]:
+        return self._slots[tick % len(self._slots)]
+
+    def schedule(self, key: K, deadline_us: int) -> None:
+        """Fire ``key`` at ``deadline_us``, replacing any earlier schedule for it.
+
+        A deadline already behind the cursor goes into the cursor's slot, so
+        the next :meth:`advance` returns it instead of a later turn.
+        """
+        with self._lock:
+            previous = self._ticks.pop(key, None)
+            if previous is not None:
+                self._slot(previous).pop(key, None)
+            tick = deadline_us // self.resolution_us
+            if self._cursor is not None and tick < self._cursor:
+                tick = self._cursor
+            self._ticks[key] = tick
+            self._slot(tick)[key] = deadline_us
+
+    def cancel(self, key: K) -> None:
+        with self._lock:
+            tick = self._ticks.pop(key, None)
+            if tick is not None:
+                self._slot(tick).pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            for slot in self._slots:
+                slot.clear()
+            self._ticks.clear()
+
+    def advance(self, now_us: int) -> list[K]:
+        """Remove and return every key whose deadline is at or before ``now_us``."""
+        now_tick = now_us // self.resolution_us
+        with self._lock:
+            if self._cursor is None:
+                # First call: anything already due sits in some slot; scan them all.
+                ticks = range(now_tick - len(self._slots) + 1, now_tick + 1)
+            else:
+                start = max(self._cursor, now_tick - len(self._slots) + 1)
+                ticks = range(start, now_tick + 1)
+            self._cursor = now_tick
+            expired: list[K] = []
+            for tick in ticks:
+                slot = self._slot(tick)
+                due = [key for key, deadline in slot.items() if deadline <= now_us]
+                for key in due:
+                    del slot[key]
+                    del self._ticks[key]
+                expired.extend(due)
+            return expired
@@ -1,9 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
 
+from app.core.timestamps import now_us
 from app.db import store
+from app.services.engine_journal import (
+    BOT_STOPPED,
+    LAST_PRICE,
+    TRADE_CLOSED,
+    TRADE_OPENED,
+    EngineJournal,
+)
+from app.services.engine_state import EngineStateCache, UserEngineState, engine_state_cache
+from app.services.tick_sequencer import TickSequencer
 
 
 @dataclass
@@ -18,8 +27,17 @@ class TickDecision:
 
 
 class TradingEngine:
-    def __init__(self) -> None:
+    def __init__(self, state_cache: EngineStateCache | None = None) -> None:
         self._last_prices: dict[tuple[str, str], float] = {}
+        self.states = state_cache if state_cache is not None else engine_state_cache
+        self.journal: EngineJournal | None = None
+        self.sequencer = TickSequencer()
+
+    def _set_last_price(self, user_id: str, symbol: str, price: float) -> None:
+        if self.journal is None:
+            self._last_prices[(user_id, symbol)] = price
+        else:
+            self.journal.append(LAST_PRICE, user_id, symbol, price)
 
     def process_tick(
         self,
@@ -29,7 +47,20 @@ class TradingEngine:
         price: float,
         ai_approved: bool,
     ) -> TickDecision:
-        config = store.get_trading_config(user_id)
+        state = self.states.get(user_id)
+        with state.lock:
+            return self._process_tick(state, symbol=symbol, price=price, ai_approved=ai_approved)
+
+    def _process_tick(
+        self,
+        state: UserEngineState,
+        *,
+        symbol: str,
+        price: float,
+        ai_approved: bool,
+    ) -> TickDecision:
+        user_id = state.user_id
+        config = state.trading
         if config is None:
             return TickDecision(
                 action="rejected",
@@ -37,70 +68,43 @@ class TradingEngine:
                 symbol=symbol,
             )
 
-        session = store.get_bot_session(user_id)
-        if session is None or not bool(session["is_running"]):
+        if not state.running:
             return TickDecision(
                 action="held",
                 message="Bot is not running",
                 symbol=symbol,
             )
 
-        session_config = store.get_session_config(user_id)
-        if session_config is not None and session["started_at"]:
-            started_at = datetime.fromisoformat(session["started_at"])
-            now = datetime.now(timezone.utc)
-            max_duration = timedelta(minutes=int(session_config["duration_minutes"]))
-            if now - started_at >= max_duration:
-                store.set_bot_session(
-                    user_id=user_id,
-                    is_running=False,
-                    started_at=session["started_at"],
-                    trades_opened_this_session=int(session["trades_opened_this_session"]),
-                )
-                return TickDecision(
-                    action="held",
-                    message="Bot stopped: session duration expired",
-                    symbol=symbol,
-                )
+        if state.session_deadline is not None and now_us() >= state.session_deadline:
+            self._stop_bot(state)
+            return TickDecision(
+                action="held",
+                message="Bot stopped: session duration expired",
+                symbol=symbol,
+            )
 
-        risk_config = store.get_risk_config(user_id)
-        if risk_config is not None:
-            realized_pnl = store.get_realized_pnl_today(user_id)
-            if realized_pnl >= float(risk_config["daily_profit_target"]):
-                store.set_bot_session(
-                    user_id=user_id,
-                    is_running=False,
-                    started_at=session["started_at"],
-                    trades_opened_this_session=int(session["trades_opened_this_session"]),
-                )
+        if not state.pnl_floor < state.realized_pnl_today < state.pnl_ceiling:
+            self._stop_bot(state)
+            if state.realized_pnl_today >= state.pnl_ceiling:
                 return TickDecision(
                     action="held",
                     message="Bot stopped: daily profit target reached",
                     symbol=symbol,
                 )
+            return TickDecision(
+                action="held",
+                message="Bot stopped: daily loss limit reached",
+                symbol=symbol,
+            )
 
-            if realized_pnl <= -float(risk_config["daily_loss_limit"]):
-                store.set_bot_session(
-                    user_id=user_id,
-                    is_running=False,
-                    started_at=session["started_at"],
-                    trades_opened_this_session=int(session["trades_opened_this_session"]),
-                )
-                return TickDecision(
-                    action="held",
-                    message="Bot stopped: daily loss limit reached",
-                    symbol=symbol,
-                )
-
-        allowed_assets = {item.strip().upper() for item in config["assets"].split(",") if item.strip()}
-        if symbol not in allowed_assets:
+        if symbol not in config.allowed_assets:
             return TickDecision(
                 action="rejected",
                 message="Symbol not enabled in config",
                 symbol=symbol,
             )
 
-        open_trade = store.get_open_trade(user_id=user_id, symbol=symbol)
+        open_trade = state.open_trades.get(symbol)
         if open_trade is not None:
             pnl = self._calculate_pnl(
                 side=open_trade["side"],
@@ -109,14 +113,9 @@ class TradingEngine:
                 quantity=float(open_trade["quantity"]),
             )
 
-            if pnl >= float(config["profit_threshold"]):
-                store.close_trade(
-                    trade_id=int(open_trade["id"]),
-                    close_price=price,
-                    pnl=pnl,
-                    reason="tp_hit",
-                )
-                self._last_prices[(user_id, symbol)] = price
+            if pnl >= config.profit_threshold:
+                self._close_trade(state, open_trade, price=price, pnl=pnl, reason="tp_hit")
+                self._set_last_price(user_id, symbol, price)
                 return TickDecision(
                     action="closed",
                     message="Trade closed on profit threshold",
@@ -127,14 +126,9 @@ class TradingEngine:
                     close_price=price,
                 )
 
-            if pnl <= float(config["loss_threshold"]):
-                store.close_trade(
-                    trade_id=int(open_trade["id"]),
-                    close_price=price,
-                    pnl=pnl,
-                    reason="sl_hit",
-                )
-                self._last_prices[(user_id, symbol)] = price
+            if pnl <= config.loss_threshold:
+                self._close_trade(state, open_trade, price=price, pnl=pnl, reason="sl_hit")
+                self._set_last_price(user_id, symbol, price)
                 return TickDecision(
                     action="closed",
                     message="Trade closed on loss threshold",
@@ -145,7 +139,7 @@ class TradingEngine:
                     close_price=price,
                 )
 
-            self._last_prices[(user_id, symbol)] = price
+            self._set_last_price(user_id, symbol, price)
             return TickDecision(
                 action="held",
                 message="Open trade maintained",
@@ -156,10 +150,8 @@ class TradingEngine:
                 close_price=price,
             )
 
-        trades_opened = int(session["trades_opened_this_session"])
-        max_trades = int(config["max_trades_per_session"])
-        if trades_opened >= max_trades:
-            self._last_prices[(user_id, symbol)] = price
+        if state.trades_opened >= config.max_trades_per_session:
+            self._set_last_price(user_id, symbol, price)
             return TickDecision(
                 action="held",
                 message="Max trades per session reached",
@@ -167,7 +159,7 @@ class TradingEngine:
             )
 
         last_price = self._last_prices.get((user_id, symbol))
-        self._last_prices[(user_id, symbol)] = price
+        self._set_last_price(user_id, symbol, price)
 
         if last_price is None:
             return TickDecision(
@@ -190,10 +182,10 @@ class TradingEngine:
                 symbol=symbol,
             )
 
-        if risk_config is not None:
-            current_exposure = store.get_open_exposure(user_id)
-            new_exposure = price * float(config["quantity"])
-            if current_exposure + new_exposure > float(risk_config["allocated_capital"]):
+        risk = state.risk
+        if risk is not None:
+            new_exposure = price * config.quantity
+            if state.open_exposure + new_exposure > risk.allocated_capital:
                 return TickDecision(
                     action="rejected",
                     message="Allocated capital limit exceeded",
@@ -201,14 +193,35 @@ class TradingEngine:
                 )
 
         side = "BUY" if price > last_price else "SELL"
-        store.open_trade(
+        trade = store.open_trade(
             user_id=user_id,
             symbol=symbol,
             side=side,
-            quantity=float(config["quantity"]),
+            quantity=config.quantity,
             entry_price=price,
+            require_running=True,
         )
+        if trade is None:
+            # The store disagrees with the cached state: the symbol already had
+            # an open trade, or the bot was stopped elsewhere (e.g. by a worker).
+            self.states.invalidate(user_id)
+            if not self.states.get(user_id).running:
+                return TickDecision(
+                    action="held",
+                    message="Bot is not running",
+                    symbol=symbol,
+                )
+            return TickDecision(
+                action="rejected",
+                message="Trade already open for symbol",
+                symbol=symbol,
+            )
         store.increment_session_trades(user_id)
+        state.trades_opened += 1
+        state.open_trades[symbol] = trade
+        self.states.triggers.add(config.trigger_for(user_id, trade))
+        if self.journal is not None:
+            self.journal.append(TRADE_OPENED, user_id, symbol, int(trade["id"]), side, price)
         return TickDecision(
             action="opened",
             message="Trade opened from trend direction",
@@ -217,6 +230,245 @@ class TradingEngine:
             entry_price=price,
         )
 
+    def _stop_bot(self, state: UserEngineState) -> None:
+        store.set_bot_session(
+            user_id=state.user_id,
+            is_running=False,
+            started_at=state.started_at,
+            trades_opened_this_session=state.trades_opened,
+        )
+        state.running = False
+        self.states.triggers.discard_user(state.user_id)
+        self.states.session_timers.cancel(state.user_id)
+        self.states.invalidate_subscribers()
+        if self.journal is not None:
+            self.journal.append(BOT_STOPPED, state.user_id)
+
+    def expire_session(self, user_id: str) -> bool:
+        """Stop the bot of ``user_id`` if its session deadline has passed.
+
+        Called by the session timer so an expired session stops without
+        waiting for its next tick. Returns whether the bot was stopped.
+        """
+        state = self.states.get(user_id)
+        with state.lock:
+            if not state.running or state.session_deadline is None:
+                return False
+            if now_us() < state.session_deadline:
+                # Fired early (e.g. the deadline moved); wait for the new one.
+                self.states.session_timers.schedule(user_id, state.session_deadline)
+                return False
+            self._stop_bot(state)
+            return True
+
+    def _close_trade(
+        self, state: UserEngineState, trade: dict, *, price: float, pnl: float, reason: str
+    ) -> None:
+        self.states.triggers.discard(state.user_id, int(trade["id"]))
+        closed = store.close_trade(
+            user_id=state.user_id,
+            trade_id=int(trade["id"]),
+            close_price=price,
+            pnl=pnl,
+            reason=reason,
+        )
+        if not closed:
+            # Closed elsewhere (e.g. flatten from another process); reload next tick.
+            self.states.invalidate(state.user_id)
+            return
+        state.open_trades.pop(str(trade["symbol"]), None)
+        state.realized_pnl_today += pnl
+        if self.journal is not None:
+            self.journal.append(
+                TRADE_CLOSED, state.user_id, str(trade["symbol"]), int(trade["id"]), price, pnl
+            )
+
+    def sweep_triggers(self, *, symbol: str, price: float) -> dict[str, TickDecision]:
+        """Close every cached open trade on ``symbol`` whose TP or SL ``price`` reaches.
+
+        Crossed trades are found through the trigger index and closed in one
+        store call. Trades the index fires for but which cannot be closed here
+        (stale or stopped state, expired session, hit risk limit) are left to
+        ``process_tick``. Returns the close decision per user.
+        """
+        fired = self.states.triggers.sweep(symbol, price)
+        if not fired:
+            return {}
+
+        now = now_us()
+        pending: dict[str, tuple[UserEngineState, dict, TickDecision]] = {}
+        closes: dict[str, list[tuple[int, float, float, str]]] = {}
+        for trigger in fired:
+            state = self.states.peek(trigger.user_id)
+            if state is None:
+                continue
+            with state.lock:
+                trade = state.open_trades.get(symbol)
+                config = state.trading
+                if (
+                    trade is None
+                    or int(trade["id"]) != trigger.trade_id
+                    or config is None
+                    or not self._can_close_on_tick(state, symbol=symbol, now=now)
+                ):
+                    continue
+                pnl = self._calculate_pnl(
+                    side=trade["side"],
+                    entry_price=float(trade["entry_price"]),
+                    current_price=price,
+                    quantity=float(trade["quantity"]),
+                )
+                if pnl >= config.profit_threshold:
+                    reason, message = "tp_hit", "Trade closed on profit threshold"
+                elif pnl <= config.loss_threshold:
+                    reason, message = "sl_hit", "Trade closed on loss threshold"
+                else:
+                    # Float rounding put the level a hair before the threshold.
+                    self.states.triggers.add(config.trigger_for(state.user_id, trade))
+                    continue
+            closes[state.user_id] = [(trigger.trade_id, price, pnl, reason)]
+            pending[state.user_id] = (
+                state,
+                trade,
+                TickDecision(
+                    action="closed",
+                    message=message,
+                    symbol=symbol,
+                    side=trade["side"],
+                    pnl=round(pnl, 6),
+                    entry_price=float(trade["entry_price"]),
+                    close_price=price,
+                ),
+            )
+
+        if not closes:
+            return {}
+        closed = store.close_trades_for_users(closes)
+        decisions: dict[str, TickDecision] = {}
+        for user_id, (state, trade, decision) in pending.items():
+            if not closed.get(user_id):
+                # Closed elsewhere; reload next tick.
+                self.states.invalidate(user_id)
+                continue
+            with state.lock:
+                if state.open_trades.get(symbol) is trade:
+                    del state.open_trades[symbol]
+                    state.realized_pnl_today += closes[user_id][0][2]
+            self._set_last_price(user_id, symbol, price)
+            if self.journal is not None:
+                trade_id, _, pnl, _ = closes[user_id][0]
+                self.journal.append(TRADE_CLOSED, user_id, symbol, trade_id, price, pnl)
+            decisions[user_id] = decision
+        return decisions
+
+    def close_on_range(
+        self, *, user_id: str, symbol: str, low: float, high: float
+    ) -> TickDecision | None:
+        """Close the open trade on ``symbol`` if prices in [low, high] reached its TP or SL.
+
+        Stands in for conflated ticks, which are not processed one by one.
+        The trade closes at the extreme that crossed; when both thresholds
+        lie inside the range the stop-loss is taken to have been hit first.
+        """
+        state = self.states.get(user_id)
+        with state.lock:
+            trade = state.open_trades.get(symbol)
+            config = state.trading
+            if (
+                trade is None
+                or config is None
+                or not self._can_close_on_tick(state, symbol=symbol, now=now_us())
+            ):
+                return None
+            entry_price = float(trade["entry_price"])
+            quantity = float(trade["quantity"])
+            worst, best = (low, high) if trade["side"] == "BUY" else (high, low)
+            pnl = self._calculate_pnl(
+                side=trade["side"], entry_price=entry_price, current_price=worst, quantity=quantity
+            )
+            if pnl <= config.loss_threshold:
+                price, reason, message = worst, "sl_hit", "Trade closed on loss threshold"
+            else:
+                pnl = self._calculate_pnl(
+                    side=trade["side"],
+                    entry_price=entry_price,
+                    current_price=best,
+                    quantity=quantity,
+                )
+                if pnl < config.profit_threshold:
+                    return None
+                price, reason, message = best, "tp_hit", "Trade closed on profit threshold"
+            self._close_trade(state, trade, price=price, pnl=pnl, reason=reason)
+            return TickDecision(
+                action="closed",
+                message=message,
+                symbol=symbol,
+                side=trade["side"],
+                pnl=round(pnl, 6),
+                entry_price=entry_price,
+                close_price=price,
+            )
+        return None
+
+    @staticmethod
+    def _can_close_on_tick(state: UserEngineState, *, symbol: str, now: int) -> bool:
+        """Whether ``process_tick`` would reach its TP/SL check for ``symbol``."""
+        if state.trading is None or not state.running or symbol not in state.trading.allowed_assets:
+            return False
+        if state.session_deadline is not None and now >= state.session_deadline:
+            return False
+        return state.pnl_floor < state.realized_pnl_today < state.pnl_ceiling
+
+    def flatten_positions(
+        self,
+        *,
+        user_id: str,
+        symbol: str | None = None,
+        prices: dict[str, float] | None = None,
+        reason: str = "flatten",
+    ) -> list[TickDecision]:
+        prices = prices or {}
+        closes: list[tuple[int, float, float, str]] = []
+        decisions: dict[int, TickDecision] = {}
+        for trade in store.get_open_trades(user_id):
+            trade_symbol = str(trade["symbol"])
+            if symbol is not None and trade_symbol != symbol:
+                continue
+            entry_price = float(trade["entry_price"])
+            close_price = prices.get(trade_symbol, self._last_prices.get((user_id, trade_symbol), entry_price))
+            pnl = self._calculate_pnl(
+                side=trade["side"],
+                entry_price=entry_price,
+                current_price=close_price,
+                quantity=float(trade["quantity"]),
+            )
+            closes.append((int(trade["id"]), close_price, pnl, reason))
+            decisions[int(trade["id"])] = TickDecision(
+                action="closed",
+                message="Trade closed by flatten",
+                symbol=trade_symbol,
+                side=trade["side"],
+                pnl=round(pnl, 6),
+                entry_price=entry_price,
+                close_price=close_price,
+            )
+
+        closed_ids = store.close_trades_bulk(closes, user_id=user_id)
+        if closed_ids:
+            self.states.invalidate(user_id)
+        if self.journal is not None:
+            for trade_id in closed_ids:
+                decision = decisions[trade_id]
+                self.journal.append(
+                    TRADE_CLOSED,
+                    user_id,
+                    decision.symbol,
+                    trade_id,
+                    decision.close_price,
+                    decision.pnl,
+                )
+        return [decisions[trade_id] for trade_id in closed_ids]
+
     @staticmethod
     def _calculate_pnl(*, side: str, entry_price: float, current_price: float, quantity: float) -> float:
         if side == "BUY":
@@ -0,0 +1,216 @@
+"""Sorted take-profit / stop-loss trigger prices for open trades.
+
+Each open trade gets absolute trigger prices derived from its entry price,
+quantity and the user's PnL thresholds. Per symbol, triggers that fire when
+the price rises to a level and triggers that fire when it falls to a level
+are kept in two sorted books, so one price finds every crossed trigger with
+a bisect plus a slice: O(log n + k).
+
+Removing a trade marks its trigger inactive instead of deleting it from both
+books; inactive entries are dropped when a sweep reaches them, or when they
+outnumber the live ones.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+_COMPACT_MIN_DEAD = 64
+
+
+@dataclass(slots=True, eq=False)
+class TradeTrigger:
+    user_id: str
+    trade_id: int
+    symbol: str
+    side: str
+    entry_price: float
+    quantity: float
+    take_profit: float
+    stop_loss: float
+    active: bool = True
+
+    @classmethod
+    def for_trade(
+        cls,
+        user_id: str,
+        trade: dict,
+        *,
+        profit_threshold: float,
+        loss_threshold: float,
+    ) -> TradeTrigger:
+        """Trigger prices where the trade's PnL reaches the given thresholds."""
+        entry_price = float(trade["entry_price"])
+        quantity = float(trade["quantity"])
+        direction = 1.0 if trade["side"] == "BUY" else -1.0
+        return cls(
+            user_id=user_id,
+            trade_id=int(trade["id"]),
+            symbol=str(trade["symbol"]),
+            side=str(trade["side"]),
+            entry_price=entry_price,
+            quantity=quantity,
+            take_profit=entry_price + direction * profit_threshold / quantity,
+            stop_loss=entry_price + direction * loss_threshold / quantity,
+        )
+
+    @property
+    def rising_level(self) -> float:
+        """Fires when the price rises to or above this level."""
+        return self.take_profit if self.side == "BUY" else self.stop_loss
+
+    @property
+    def falling_level(self) -> float:
+        """Fires when the price falls to or below this level."""
+        return self.stop_loss if self.side == "BUY" else self.take_profit
+
+
+class TriggerBook:
+    """Rising and falling triggers of one symbol, sorted by level."""
+
+    def __init__(self) -> None:
+        self._rising_levels: list[float] = []
+        self._rising: list[TradeTrigger] = []
+        self._falling_levels: list[float] = []
+        self._falling: list[TradeTrigger] = []
+        self._live = 0
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    def add(self, trigger: TradeTrigger) -> None:
+        for levels, triggers, level in (
+            (self._rising_levels, self._rising, trigger.rising_level),
+            (self._falling_levels, self._falling, trigger.falling_level),
+        ):
+            index = bisect_right(levels, level)
+            levels.insert(index, level)
+            triggers.insert(index, trigger)
+        self._live += 1
+
+    def discard(self, trigger: TradeTrigger) -> None:
+        if not trigger.active:
+            return
+        trigger.active = False
+        self._live -= 1
+        self._dead += 2
+        self._maybe_compact()
+
+    def sweep(self, price: float) -> list[TradeTrigger]:
+        """Remove and return every live trigger ``price`` reaches."""
+        rising_end = bisect_right(self._rising_levels, price)
+        crossed = self._rising[:rising_end]
+        del self._rising_levels[:rising_end]
+        del self._rising[:rising_end]
+
+        falling_start = bisect_left(self._falling_levels, price)
+        crossed.extend(self._falling[falling_start:])
+        del self._falling_levels[falling_start:]
+        del self._falling[falling_start:]
+
+        fired: list[TradeTrigger] = []
+        for trigger in crossed:
+            if trigger.active:
+                # Its entry in the other book is now dead.
+                trigger.active = False
+                self._live -= 1
+                self._dead += 1
+                fired.append(trigger)
+            else:
+                self._dead -= 1
+        self._maybe_compact()
+        return fired
+
+    def _maybe_compact(self) -> None:
+        if self._dead < _COMPACT_MIN_DEAD or self._dead <= 2 * self._live:
+            return
+        for levels, triggers in (
+            (self._rising_levels, self._rising),
+            (self._falling_levels, self._falling),
+        ):
+            kept = [(level, trigger) for level, trigger in zip(levels, triggers) if trigger.active]
+            levels[:] = [level for level, _ in kept]
+            triggers[:] = [trigger for _, trigger in kept]
+        self._dead = 0
+
+
+class TriggerIndex:
+    """Trigger books for every symbol, addressable by ``(user_id, trade_id)``."""
+
+    def __init__(self) -> None:
+        self._books: dict[str, TriggerBook] = {}
+        self._by_user: dict[str, dict[int, TradeTrigger]] = {}
+        # Live triggers per symbol and owner.
+        self._owners: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(book) for book in self._books.values())
+
+    def add(self, trigger: TradeTrigger) -> None:
+        with self._lock:
+            user_triggers = self._by_user.setdefault(trigger.user_id, {})
+            previous = user_triggers.pop(trigger.trade_id, None)
+            if previous is not None:
+                self._remove(previous)
+            user_triggers[trigger.trade_id] = trigger
+            book = self._books.get(trigger.symbol)
+            if book is None:
+                book = self._books[trigger.symbol] = TriggerBook()
+            book.add(trigger)
+            owners = self._owners.setdefault(trigger.symbol, {})
+            owners[trigger.user_id] = owners.get(trigger.user_id, 0) + 1
+
+    def discard(self, user_id: str, trade_id: int) -> None:
+        with self._lock:
+            trigger = self._by_user.get(user_id, {}).pop(trade_id, None)
+            if trigger is not None:
+                self._remove(trigger)
+
+    def discard_user(self, user_id: str) -> None:
+        with self._lock:
+            for trigger in self._by_user.pop(user_id, {}).values():
+                self._remove(trigger)
+
+    def users(self, symbol: str) -> set[str]:
+        """Users with a live trigger on ``symbol``."""
+        with self._lock:
+            return set(self._owners.get(symbol, ()))
+
+    def sweep(self, symbol: str, price: float) -> list[TradeTrigger]:
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is None:
+                return []
+            fired = book.sweep(price)
+            for trigger in fired:
+                user_triggers = self._by_user.get(trigger.user_id)
+                if user_triggers is not None and user_triggers.get(trigger.trade_id) is trigger:
+                    del user_triggers[trigger.trade_id]
+                self._release_owner(trigger)
+            return fired
+
+    def _remove(self, trigger: TradeTrigger) -> None:
+        """Drop a live ``trigger`` from its book and the owner index; caller holds the lock."""
+        if trigger.active:
+            self._release_owner(trigger)
+        self._books[trigger.symbol].discard(trigger)
+
+    def _release_owner(self, trigger: TradeTrigger) -> None:
+        owners = self._owners[trigger.symbol]
+        remaining = owners[trigger.user_id] - 1
+        if remaining:
+            owners[trigger.user_id] = remaining
+        else:
+            del owners[trigger.user_id]
+            if not owners:
+                del self._owners[trigger.symbol]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._books.clear()
+            self._by_user.clear()
+            self._owners.clear()
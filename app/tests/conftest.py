@@ -2,6 +2,7 @@ import pytest
 from httpx import ASGITransport, AsyncClient
 
 from app.main import app
+from app.services.engine_state import engine_state_cache
 
 
 @pytest.fixture
@@ -9,3 +10,102 @@ async def client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as test_client:
         yield test_client
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def store_db(request, tmp_path, monkeypatch):
+    """The trading store on each backend; the Postgres run needs STORE_TEST_POSTGRES_URL."""
+    if request.param == "postgres":
+        if request.node.get_closest_marker("sqlite_only"):
+            pytest.skip("SQLite-specific")
+        yield from _postgres_store(tmp_path, monkeypatch)
+        return
+
+    from app.config import settings
+    from app.db import store
+
+    monkeypatch.setattr(settings, "STORE_DATABASE_PATH", str(tmp_path / "store.db"))
+    monkeypatch.setattr(settings, "STORE_ARCHIVE_DIR", str(tmp_path / "archive"))
+    store.init_db()
+    engine_state_cache.clear()
+    yield store
+    store.shutdown()
+
+
+@pytest.fixture
+def sharded_store_db(tmp_path, monkeypatch):
+    from app.config import settings
+    from app.db import store
+
+    monkeypatch.setattr(settings, "STORE_DATABASE_PATH", str(tmp_path / "store.db"))
+    monkeypatch.setattr(settings, "STORE_ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(settings, "STORE_SHARDS", 4)
+    store.shutdown()
+    store.init_db()
+    engine_state_cache.clear()
+    yield store
+    store.shutdown()
+
+
+@pytest.fixture
+async def trading_client(store_db):
+    from fastapi import FastAPI
+
+    from app.routes import dashboard, license, metrics, risk, trading
+
+    trading_app = FastAPI()
+    for module in (trading, risk, license, dashboard, metrics):
+        trading_app.include_router(module.router)
+    trading.engine = trading.TradingEngine()
+    trading.ai_filter = trading.AIFilterService()
+
+    transport = ASGITransport(app=trading_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
+        yield test_client
+
+
+PG_STORE_TABLES = (
+    "mt5_accounts",
+    "trading_configs",
+    "bot_sessions",
+    "open_trades",
+    "closed_trades",
+    "ai_decisions",
+    "risk_configs",
+    "session_configs",
+    "notifications",
+    "licenses",
+    "license_events",
+    "idempotency_records",
+    "daily_pnl",
+    "archive_watermarks",
+    "store_schema_version",
+)
+
+
+@pytest.fixture
+def pg_store_db(tmp_path, monkeypatch):
+    yield from _postgres_store(tmp_path, monkeypatch)
+
+
+def _postgres_store(tmp_path, monkeypatch):
+    import os
+
+    url = os.getenv("STORE_TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("STORE_TEST_POSTGRES_URL is not set")
+
+    from app.config import settings
+    from app.db import store
+
+    monkeypatch.setattr(settings, "STORE_BACKEND", "postgres")
+    monkeypatch.setattr(settings, "STORE_POSTGRES_URL", url)
+    monkeypatch.setattr(settings, "STORE_ARCHIVE_DIR", str(tmp_path / "archive"))
+    store.shutdown()
+    with store.get_backend().connection() as conn:
+        conn.execute(f"DROP TABLE IF EXISTS {', '.join(PG_STORE_TABLES)} CASCADE")
+        conn.commit()
+    store.init_db()
+    engine_state_cache.clear()
+    yield store
+    store.shutdown()
@@ -0,0 +1,163 @@
+from datetime import datetime, timezone
+
+import msgpack
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.security import create_access_token, create_refresh_token
+
+
+@pytest.fixture
+def stream_client(store_db):
+    from app.routes import metrics, trading
+
+    stream_app = FastAPI()
+    stream_app.include_router(trading.router)
+    stream_app.include_router(metrics.router)
+    trading.engine = trading.TradingEngine()
+    trading.ai_filter = trading.AIFilterService()
+    store_db.upsert_trading_config(
+        user_id="u1",
+        assets=["EURUSD"],
+        timeframe="M1",
+        max_trades_per_session=3,
+        quantity=1.0,
+        profit_threshold=0.5,
+        loss_threshold=-0.5,
+    )
+    store_db.set_bot_session(
+        user_id="u1", is_running=True, started_at=None, trades_opened_this_session=0
+    )
+    with TestClient(stream_app) as client:
+        yield client
+
+
+def _receive_frames(websocket, count):
+    unpacker = msgpack.Unpacker(raw=False)
+    frames = []
+    while len(frames) < count:
+        unpacker.feed(websocket.receive_bytes())
+        frames.extend(unpacker)
+    return frames
+
+
+def test_stream_returns_decisions_in_order_on_the_same_socket(stream_client):
+    token = create_access_token("u1")
+    with stream_client.websocket_connect(f"/engine/stream?token={token}") as websocket:
+        websocket.send_bytes(
+            msgpack.packb([1, "eurusd", 1.1, 0.0]) + msgpack.packb([2, "EURUSD", 1.1002, 0.0])
+        )
+        websocket.send_bytes(msgpack.packb([3, "EURUSD", 1.1004, 0.0, False]))
+        frames = _receive_frames(websocket, 3)
+
+        assert [(frame[0], frame[1]) for frame in frames] == [
+            (1, "held"),
+            (2, "opened"),
+            (3, "held"),
+        ]
+        assert frames[1][3:5] == ["EURUSD", "BUY"]
+
+        websocket.send_bytes(msgpack.packb([4, "EURUSD", -1.0]) + b"\xc1")
+        errors = _receive_frames(websocket, 1)
+        assert errors[0][:2] == [-1, "error"]
+
+        streams = stream_client.get("/metrics/streams").json()
+        assert [(item["user_id"], item["ticks_in"], item["decisions_out"]) for item in streams] == [
+            ("u1", 3, 3)
+        ]
+
+    assert stream_client.get("/metrics/streams").json() == []
+
+
+def test_stream_rejects_invalid_ticks_and_unauthenticated_clients(stream_client):
+    with pytest.raises(WebSocketDisconnect) as error:
+        with stream_client.websocket_connect("/engine/stream?token=bogus") as websocket:
+            websocket.receive_bytes()
+    assert error.value.code == 1008
+
+    refresh_token, _ = create_refresh_token("u1")
+    with pytest.raises(WebSocketDisconnect) as error:
+        with stream_client.websocket_connect(f"/engine/stream?token={refresh_token}") as websocket:
+            websocket.receive_bytes()
+    assert error.value.code == 1008
+
+    headers = {"Authorization": f"Bearer {create_access_token('u1')}"}
+    with stream_client.websocket_connect("/engine/stream", headers=headers) as websocket:
+        websocket.send_bytes(
+            msgpack.packb([7, "EURUSD", 0])
+            + msgpack.packb([8, "EURUSD", float("nan")])
+            + msgpack.packb([9, "EURUSD", float("inf")])
+            + msgpack.packb([10, "EURUSD", 1.1])
+        )
+        frames = _receive_frames(websocket, 4)
+
+    assert frames[:3] == [
+        [seq, "error", "price must be a positive number"] for seq in (7, 8, 9)
+    ]
+    assert frames[3][:2] == [10, "held"]
+
+    with stream_client.websocket_connect("/engine/stream", headers=headers) as websocket:
+        websocket.send_bytes(msgpack.packb([11, "EURUSD", 1.1, 0.0, False, 2**63]))
+        websocket.send_bytes(msgpack.packb([12, "EURUSD", 1.1]))
+        frames = _receive_frames(websocket, 2)
+
+    assert frames[0] == [11, "error", "timestamp_us is out of range"]
+    # The socket survives the bad tick and keeps deciding.
+    assert frames[1][0] == 12 and frames[1][1] != "error"
+
+
+def test_stream_closes_when_processing_fails_with_a_full_queue(stream_client, monkeypatch):
+    from app.config import settings
+    from app.routes import trading
+
+    monkeypatch.setattr(settings, "ENGINE_STREAM_MAX_INFLIGHT", 1)
+
+    def fail(ticks):
+        raise RuntimeError("engine down")
+
+    monkeypatch.setattr(trading, "process_stream_ticks", fail)
+    token = create_access_token("u1")
+    frame = b"".join(msgpack.packb([seq, "EURUSD", 1.1]) for seq in range(8))
+    with pytest.raises(ExceptionGroup):
+        with stream_client.websocket_connect(f"/engine/stream?token={token}") as websocket:
+            websocket.send_bytes(frame)
+            websocket.receive_bytes()
+
+    assert stream_client.get("/metrics/streams").json() == []
+
+
+def test_conflated_stream_ticks_still_close_on_intermediate_high(stream_client, monkeypatch):
+    from app.config import settings
+    from app.db import store
+    from app.routes import trading
+    from app.schemas.trading import TickRequest
+
+    monkeypatch.setattr(settings, "ENGINE_TICK_CONFLATION", True)
+    store.open_trade(user_id="u1", symbol="EURUSD", side="BUY", quantity=1.0, entry_price=1.0)
+    trading.engine.states.invalidate("u1")
+
+    def tick(price, timestamp):
+        return TickRequest.model_construct(
+            user_id="u1",
+            symbol="EURUSD",
+            price=price,
+            news_spike=False,
+            confidence_threshold=0.0,
+            timestamp=timestamp and datetime.fromtimestamp(timestamp, timezone.utc),
+        )
+
+    payloads = trading.process_stream_ticks(
+        [tick(1.2, 1), tick(1.6, 2), tick(1.6, 2), tick(1.3, 3), tick(1.1, 4)]
+    )
+
+    assert [(item["action"], item["message"]) for item in payloads[:4]] == [
+        ("held", "Tick conflated"),
+        ("closed", "Trade closed on profit threshold"),
+        ("rejected", "Duplicate tick"),
+        ("held", "Tick conflated"),
+    ]
+    assert payloads[1]["close_price"] == 1.6
+    assert payloads[4]["message"] == "Insufficient trend history"
+    assert store.get_open_trades("u1") == []
@@ -0,0 +1,418 @@
+import asyncio
+import time
+
+
+async def _onboard(client, user_id="u1"):
+    response = await client.put(
+        "/trading/config",
+        json={
+            "user_id": user_id,
+            "assets": ["eurusd"],
+            "timeframe": "M1",
+            "max_trades_per_session": 3,
+            "profit_threshold": 0.5,
+            "loss_threshold": -0.5,
+        },
+    )
+    assert response.status_code == 200
+    response = await client.put(
+        "/risk/config",
+        json={
+            "user_id": user_id,
+            "daily_profit_target": 100.0,
+            "daily_loss_limit": 100.0,
+            "allocated_capital": 1000.0,
+        },
+    )
+    assert response.status_code == 200
+    response = await client.put("/session/config", json={"user_id": user_id, "duration_minutes": 60})
+    assert response.status_code == 200
+    response = await client.post(
+        "/admin/licenses",
+        json={"license_key": f"KEY-{user_id}", "expires_at": "2999-01-01T00:00:00+00:00"},
+    )
+    assert response.status_code == 200
+    response = await client.post(
+        "/license/activate", json={"license_key": f"KEY-{user_id}", "user_id": user_id}
+    )
+    assert response.json()["valid"] is True
+
+
+async def test_start_bot_requires_license(trading_client):
+    response = await trading_client.post("/bot/start", params={"user_id": "nobody"})
+    assert response.status_code == 403
+
+
+async def test_tick_flow_opens_trade_and_updates_dashboard(trading_client):
+    await _onboard(trading_client)
+    response = await trading_client.post("/bot/start", params={"user_id": "u1"})
+    assert response.json()["running"] is True
+
+    actions = []
+    for price in (1.1, 1.1002, 1.1004):
+        response = await trading_client.post(
+            "/engine/tick",
+            json={"user_id": "u1", "symbol": "EURUSD", "price": price, "confidence_threshold": 0.0},
+        )
+        assert response.status_code == 200
+        actions.append(response.json()["action"])
+    assert actions == ["held", "opened", "held"]
+
+    response = await trading_client.get("/summary", params={"user_id": "u1"})
+    assert response.json()["margin"] == 1.1002
+    response = await trading_client.get("/trades/open", params={"user_id": "u1"})
+    assert [item["symbol"] for item in response.json()] == ["EURUSD"]
+    response = await trading_client.get("/notifications", params={"user_id": "u1"})
+    assert [item["event_type"] for item in response.json()] == ["trade_opened"]
+
+    response = await trading_client.post("/bot/flatten", params={"user_id": "u1"})
+    assert response.json()["closed_trades"] == 1
+    response = await trading_client.get("/pnl/daily", params={"user_id": "u1"})
+    assert response.json()["realized_pnl"] == 0.0002
+
+
+async def test_tick_idempotency_key_replays_response(trading_client):
+    await _onboard(trading_client)
+    await trading_client.post("/bot/start", params={"user_id": "u1"})
+    body = {"user_id": "u1", "symbol": "EURUSD", "price": 1.1}
+    headers = {"Idempotency-Key": "tick-1"}
+
+    first = await trading_client.post("/engine/tick", json=body, headers=headers)
+    second = await trading_client.post(
+        "/engine/tick", json={**body, "price": 1.2}, headers=headers
+    )
+
+    assert first.json() == second.json()
+
+
+async def test_bulk_config_endpoints_return_per_item_results(trading_client):
+    users = [f"desk-{index}" for index in range(3)]
+    response = await trading_client.put(
+        "/trading/config/bulk",
+        json={
+            "items": [
+                {
+                    "user_id": user_id,
+                    "assets": ["eurusd", " gbpusd "],
+                    "timeframe": "M1",
+                    "max_trades_per_session": 5,
+                }
+                for user_id in users
+            ]
+        },
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["user_id"] for item in items] == users
+    assert all(item["assets"] == ["EURUSD", "GBPUSD"] for item in items)
+
+    response = await trading_client.put(
+        "/risk/config/bulk",
+        json={
+            "items": [
+                {
+                    "user_id": user_id,
+                    "daily_profit_target": 50.0,
+                    "daily_loss_limit": 25.0,
+                    "allocated_capital": 500.0,
+                }
+                for user_id in users
+            ]
+        },
+    )
+    assert [item["daily_loss_limit"] for item in response.json()["items"]] == [25.0] * 3
+
+    response = await trading_client.put(
+        "/session/config/bulk",
+        json={"items": [{"user_id": user_id, "duration_minutes": 45} for user_id in users]},
+    )
+    assert [item["duration_minutes"] for item in response.json()["items"]] == [45] * 3
+    response = await trading_client.get("/session/config", params={"user_id": "desk-2"})
+    assert response.json()["duration_minutes"] == 45
+
+    response = await trading_client.put(
+        "/session/config/bulk",
+        json={"items": [{"user_id": "desk-0", "duration_minutes": 45}, {"user_id": "desk-1"}]},
+    )
+    assert response.status_code == 422
+    response = await trading_client.get("/session/config", params={"user_id": "desk-0"})
+    assert response.json()["duration_minutes"] == 45
+
+
+async def test_config_and_bot_routes_invalidate_cached_engine_state(trading_client):
+    await _onboard(trading_client)
+    await trading_client.post("/bot/start", params={"user_id": "u1"})
+    tick = {"user_id": "u1", "symbol": "GBPUSD", "price": 1.1, "confidence_threshold": 0.0}
+
+    response = await trading_client.post("/engine/tick", json=tick)
+    assert response.json()["message"] == "Symbol not enabled in config"
+
+    response = await trading_client.put(
+        "/trading/config/bulk",
+        json={
+            "items": [
+                {
+                    "user_id": "u1",
+                    "assets": ["EURUSD", "GBPUSD"],
+                    "timeframe": "M1",
+                    "max_trades_per_session": 3,
+                }
+            ]
+        },
+    )
+    assert response.status_code == 200
+    response = await trading_client.post("/engine/tick", json=tick)
+    assert response.json()["message"] == "Insufficient trend history"
+
+    await trading_client.post("/bot/stop", params={"user_id": "u1"})
+    response = await trading_client.post("/engine/tick", json=tick)
+    assert response.json()["message"] == "Bot is not running"
+
+
+async def test_tick_batch_matches_single_tick_route_and_honours_keys(trading_client):
+    await _onboard(trading_client)
+    await _onboard(trading_client, "u2")
+    for user_id in ("u1", "u2"):
+        await trading_client.post("/bot/start", params={"user_id": user_id})
+    await trading_client.post(
+        "/engine/tick",
+        json={"user_id": "u1", "symbol": "EURUSD", "price": 1.1, "confidence_threshold": 0.0},
+        headers={"Idempotency-Key": "single-1"},
+    )
+
+    ticks = [
+        {"user_id": "u1", "symbol": "EURUSD", "price": 9.9, "idempotency_key": "single-1"},
+        {"user_id": "u2", "symbol": "EURUSD", "price": 1.1, "idempotency_key": "batch-1"},
+        {"user_id": "u1", "symbol": "EURUSD", "price": 1.1002},
+        {"user_id": "u2", "symbol": "EURUSD", "price": 1.1002},
+        {"user_id": "u2", "symbol": "EURUSD", "price": 7.7, "idempotency_key": "batch-1"},
+        {"user_id": "u1", "symbol": "EURUSD", "price": 1.1004},
+    ]
+    for tick in ticks:
+        tick["confidence_threshold"] = 0.0
+    response = await trading_client.post("/engine/ticks", json={"ticks": ticks})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    actions = [item["action"] for item in results]
+    assert actions == ["held", "held", "opened", "opened", "held", "held"]
+    assert results[4] == results[1]
+    assert results[5]["message"] == "Open trade maintained"
+
+    replay = await trading_client.post(
+        "/engine/tick",
+        json={"user_id": "u2", "symbol": "EURUSD", "price": 5.0},
+        headers={"Idempotency-Key": "batch-1"},
+    )
+    assert replay.json() == results[1]
+    response = await trading_client.get("/notifications", params={"user_id": "u2"})
+    assert [item["event_type"] for item in response.json()] == ["trade_opened"]
+
+
+async def test_market_tick_fans_out_to_running_subscribers(trading_client):
+    for user_id in ("u1", "u2", "idle"):
+        await _onboard(trading_client, user_id)
+    for user_id in ("u1", "u2"):
+        await trading_client.post("/bot/start", params={"user_id": user_id})
+
+    results = []
+    for price in (1.1, 1.1002):
+        response = await trading_client.post(
+            "/engine/market-tick",
+            json={"symbol": "eurusd", "price": price, "confidence_threshold": 0.0},
+            headers={"Idempotency-Key": f"market-{price}"},
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+    assert [(item["user_id"], item["action"]) for item in results] == [
+        ("u1", "opened"),
+        ("u2", "opened"),
+    ]
+
+    replay = await trading_client.post(
+        "/engine/market-tick",
+        json={"symbol": "EURUSD", "price": 2.0},
+        headers={"Idempotency-Key": "market-1.1002"},
+    )
+    assert replay.json()["results"] == results
+    for user_id in ("u1", "u2"):
+        response = await trading_client.get("/trades/open", params={"user_id": user_id})
+        assert [item["symbol"] for item in response.json()] == ["EURUSD"]
+
+    await trading_client.post("/bot/stop", params={"user_id": "u2"})
+    response = await trading_client.post(
+        "/engine/market-tick", json={"symbol": "EURUSD", "price": 1.1004}
+    )
+    assert [item["user_id"] for item in response.json()["results"]] == ["u1"]
+
+    response = await trading_client.post(
+        "/engine/market-tick", json={"symbol": "EURUSD", "price": 1.7}
+    )
+    assert [(item["user_id"], item["message"]) for item in response.json()["results"]] == [
+        ("u1", "Trade closed on profit threshold")
+    ]
+    response = await trading_client.get("/trades/open", params={"user_id": "u1"})
+    assert response.json() == []
+    response = await trading_client.get("/notifications", params={"user_id": "u1"})
+    assert "trade_closed" in [item["event_type"] for item in response.json()]
+
+
+async def test_concurrent_ticks_for_one_user_apply_in_arrival_order(trading_client):
+    await _onboard(trading_client)
+    await trading_client.post("/bot/start", params={"user_id": "u1"})
+
+    responses = await asyncio.gather(
+        *(
+            trading_client.post(
+                "/engine/tick",
+                json={"user_id": "u1", "symbol": "EURUSD", "price": price, "confidence_threshold": 0.0},
+            )
+            for price in (1.1, 1.1002, 1.1004, 1.1006)
+        )
+    )
+
+    assert [item.json()["action"] for item in responses] == ["held", "opened", "held", "held"]
+    response = await trading_client.get("/metrics/actors")
+    assert sum(item["processed"] for item in response.json()) >= 4
+
+
+async def test_market_ticks_and_ai_evaluations_run_on_the_tick_actors(trading_client):
+    response = await trading_client.post(
+        "/engine/market-tick", json={"symbol": "EURUSD", "price": 1.1}
+    )
+    assert response.json()["results"] == []
+
+    await _onboard(trading_client)
+    await trading_client.post("/bot/start", params={"user_id": "u1"})
+    before = sum(item["processed"] for item in (await trading_client.get("/metrics/actors")).json())
+    responses = await asyncio.gather(
+        trading_client.post(
+            "/engine/tick",
+            json={"user_id": "u1", "symbol": "EURUSD", "price": 1.1, "confidence_threshold": 0.0},
+        ),
+        trading_client.post(
+            "/engine/market-tick",
+            json={"symbol": "EURUSD", "price": 1.1002, "confidence_threshold": 0.0},
+        ),
+        trading_client.post(
+            "/ai/evaluate", json={"user_id": "u1", "symbol": "EURUSD", "price": 1.1004}
+        ),
+    )
+
+    assert [item.status_code for item in responses] == [200, 200, 200]
+    assert responses[0].json()["action"] == "held"
+    assert [item["action"] for item in responses[1].json()["results"]] == ["opened"]
+    after = sum(item["processed"] for item in (await trading_client.get("/metrics/actors")).json())
+    assert after - before == 3
+
+
+async def test_bot_routes_run_after_the_users_queued_ticks(trading_client):
+    await _onboard(trading_client)
+    await trading_client.post("/bot/start", params={"user_id": "u1"})
+    tick = {"user_id": "u1", "symbol": "EURUSD", "confidence_threshold": 0.0}
+    await trading_client.post("/engine/tick", json={**tick, "price": 1.1})
+
+    opened, flattened, stopped = await asyncio.gather(
+        trading_client.post("/engine/tick", json={**tick, "price": 1.1002}),
+        trading_client.post("/bot/flatten", params={"user_id": "u1"}),
+        trading_client.post("/bot/stop", params={"user_id": "u1"}),
+    )
+
+    assert opened.json()["action"] == "opened"
+    assert flattened.json()["closed_trades"] == 1
+    assert stopped.json()["running"] is False
+
+
+async def test_session_timer_stops_expired_session_without_a_tick(trading_client):
+    from app.core.timestamps import MICROS_PER_MINUTE, SimulatedClock, now_us, use_clock
+    from app.routes import trading
+
+    await _onboard(trading_client)
+    with use_clock(SimulatedClock(now_us())) as clock:
+        await trading_client.post("/bot/start", params={"user_id": "u1"})
+        clock.advance(59 * MICROS_PER_MINUTE)
+        assert await trading.expire_due_sessions() == 0
+
+        # The bot started above runs out after its 60 minutes.
+        clock.advance(MICROS_PER_MINUTE)
+        assert await trading.expire_due_sessions() == 1
+
+    response = await trading_client.get("/bot/status", params={"user_id": "u1"})
+    assert response.json()["running"] is False
+    response = await trading_client.get("/notifications", params={"user_id": "u1"})
+    messages = [item["message"] for item in response.json()]
+    assert "Bot stopped because session duration expired" in messages
+
+
+async def test_ticks_are_sequenced_by_timestamp_per_user_and_symbol(trading_client):
+    from app.db import store
+
+    await _onboard(trading_client)
+    await trading_client.post("/bot/start", params={"user_id": "u1"})
+
+    messages = []
+    for timestamp in (
+        "2026-01-05T10:00:01+00:00",
+        "2026-01-05T10:00:01+00:00",
+        "2026-01-05T10:00:00+00:00",
+        None,
+        "2026-01-05T10:00:02+00:00",
+    ):
+        response = await trading_client.post(
+            "/engine/tick",
+            json={"user_id": "u1", "symbol": "EURUSD", "price": 1.1, "timestamp": timestamp},
+        )
+        messages.append((response.json()["action"], response.json()["message"]))
+
+    assert messages[1:3] == [("rejected", "Duplicate tick"), ("rejected", "Out-of-order tick")]
+    accepted = [message for _, message in (messages[0], *messages[3:])]
+    assert not {"Duplicate tick", "Out-of-order tick"} & set(accepted)
+    # Rejected ticks never reach the AI gate, so they leave no audit row.
+    store.flush_journal()
+    assert len(store.get_ai_decisions("u1")) == 3
+
+
+async def test_tick_route_latency_for_admission_includes_mailbox_wait(
+    trading_client, monkeypatch
+):
+    from app.routes import trading
+    from app.services.latency_metrics import LatencyMetricsService
+    from app.services.tick_actors import tick_actors
+
+    metrics = LatencyMetricsService()
+    monkeypatch.setattr(trading, "latency_metrics", metrics)
+    monkeypatch.setattr(trading.admission, "_metrics", metrics)
+    await _onboard(trading_client)
+    await trading_client.post("/bot/start", params={"user_id": "u1"})
+
+    await asyncio.gather(
+        tick_actors.submit("u1", time.sleep, 0.2),
+        trading_client.post(
+            "/engine/tick", json={"user_id": "u1", "symbol": "EURUSD", "price": 1.1}
+        ),
+    )
+
+    snapshot = metrics.snapshot()
+    assert snapshot["engine_tick_route_ms"]["p99"] >= 150
+    assert snapshot["trade_execution_ms"]["p99"] < 150
+
+
+async def test_overloaded_tick_route_sheds_with_retry_after(trading_client, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "ENGINE_MAX_INFLIGHT", 0)
+    monkeypatch.setattr(settings, "ENGINE_RETRY_AFTER_SECONDS", 2)
+
+    response = await trading_client.post(
+        "/engine/tick", json={"user_id": "u1", "symbol": "EURUSD", "price": 1.1}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    response = await trading_client.post(
+        "/ai/evaluate", json={"user_id": "u1", "symbol": "EURUSD", "price": 1.1}
+    )
+    assert response.status_code == 503
+
+    stats = (await trading_client.get("/metrics/admission")).json()
+    assert stats["/engine/tick"]["shed"]["saturated"] >= 1
+    assert stats["/ai/evaluate"]["inflight"] == 0
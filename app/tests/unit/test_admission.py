@@ -0,0 +1,65 @@
+from app.config import settings
+from app.services.admission import SHED_INFLIGHT, SHED_LATENCY, SHED_SATURATED, AdmissionController
+from app.services.latency_metrics import LatencyMetricsService
+
+
+def _controller(monkeypatch, **overrides):
+    for name, value in {
+        "ENGINE_ADMISSION_ENABLED": True,
+        "ENGINE_ADMISSION_WINDOW_SECONDS": 0.0,
+        "ENGINE_SHED_INFLIGHT": 2,
+        "ENGINE_MAX_INFLIGHT": 3,
+        **overrides,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    metrics = LatencyMetricsService(max_samples=10)
+    controller = AdmissionController(metrics)
+    controller.guard("tick", metric="tick_ms", slo_ms=100.0)
+    return controller, metrics
+
+
+def test_admission_sheds_low_priority_while_p95_breaches_slo(monkeypatch):
+    controller, metrics = _controller(monkeypatch)
+    for latency in (50.0, 150.0, 160.0):
+        metrics.record("tick_ms", latency)
+
+    assert controller.try_admit("tick", low_priority=True) == SHED_LATENCY
+    assert controller.try_admit("tick", low_priority=False) is None
+    controller.release("tick")
+
+    # A window without samples clears the breach; fast samples keep it clear.
+    assert controller.try_admit("tick", low_priority=True) is None
+    controller.release("tick")
+    metrics.record("tick_ms", 10.0)
+    assert controller.try_admit("tick", low_priority=True) is None
+    controller.release("tick")
+
+    stats = controller.stats()["tick"]
+    assert stats["shed"] == {SHED_LATENCY: 1}
+    assert (stats["admitted"], stats["inflight"], stats["p95_ms"]) == (3, 0, 10.0)
+
+
+def test_admission_sheds_by_inflight_count(monkeypatch):
+    controller, _ = _controller(monkeypatch)
+
+    assert controller.try_admit("tick", low_priority=True) is None
+    assert controller.try_admit("tick", low_priority=False) is None
+    assert controller.try_admit("tick", low_priority=True) == SHED_INFLIGHT
+    assert controller.try_admit("tick", low_priority=False) is None
+    assert controller.try_admit("tick", low_priority=False) == SHED_SATURATED
+
+    controller.release("tick")
+    assert controller.try_admit("tick", low_priority=False) is None
+
+    monkeypatch.setattr(settings, "ENGINE_ADMISSION_ENABLED", False)
+    assert controller.try_admit("tick", low_priority=True) is None
+
+
+def test_admission_release_records_time_since_admission(monkeypatch):
+    controller, metrics = _controller(monkeypatch)
+
+    assert controller.try_admit("tick", low_priority=False) is None
+    controller.release("tick", elapsed_ms=250.0)
+
+    assert controller.try_admit("tick", low_priority=True) == SHED_LATENCY
+    assert controller.stats()["tick"]["p95_ms"] == 250.0
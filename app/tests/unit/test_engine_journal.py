@@ -0,0 +1,120 @@
+from datetime import datetime, timezone
+
+from app.services.ai_filter import AIFilterService
+from app.services.engine_journal import SNAPSHOT_FILE, EngineJournal
+from app.services.engine_state import EngineStateCache
+from app.services.trading_engine import TradingEngine
+
+
+def _configure_user(store, user_id):
+    store.upsert_trading_config(
+        user_id=user_id,
+        assets=["EURUSD", "GBPUSD"],
+        timeframe="M1",
+        max_trades_per_session=5,
+        quantity=1.0,
+        profit_threshold=0.02,
+        loss_threshold=-0.02,
+    )
+    store.set_bot_session(
+        user_id=user_id,
+        is_running=True,
+        started_at=datetime.now(timezone.utc).isoformat(),
+        trades_opened_this_session=0,
+    )
+
+
+def _journaled(directory, **kwargs):
+    engine = TradingEngine(EngineStateCache())
+    ai_filter = AIFilterService()
+    journal = EngineJournal(directory, **kwargs)
+    journal.attach(engine, ai_filter)
+    return engine, ai_filter, journal
+
+
+def _run_ticks(engine, ai_filter, count):
+    for index in range(count):
+        user_id = f"u{index % 3}"
+        symbol = ("EURUSD", "GBPUSD")[index % 2]
+        price = 1.1 + (index % 7) * 0.001
+        decision = ai_filter.evaluate(
+            user_id=user_id, symbol=symbol, price=price, news_spike=False, confidence_threshold=0.0
+        )
+        engine.process_tick(
+            user_id=user_id, symbol=symbol, price=price, ai_approved=decision.approved
+        )
+        ai_filter.evaluate_market(
+            symbol=symbol, price=price, news_spike=False, confidence_threshold=0.0
+        )
+
+
+def _state(engine, ai_filter):
+    return (
+        dict(engine._last_prices),
+        {key: list(window) for key, window in ai_filter._price_windows.items()},
+        {key: list(window) for key, window in ai_filter._market_windows.items()},
+    )
+
+
+def test_engine_journal_restores_state_from_segments(store_db, tmp_path):
+    for user_id in ("u0", "u1", "u2"):
+        _configure_user(store_db, user_id)
+    engine, ai_filter, journal = _journaled(tmp_path / "journal")
+    assert journal.restore() == 0
+    _run_ticks(engine, ai_filter, 60)
+    journal.flush()
+    expected = _state(engine, ai_filter)
+
+    restored_engine, restored_filter, restored = _journaled(tmp_path / "journal")
+    assert restored.restore() > 0
+    assert _state(restored_engine, restored_filter) == expected
+    assert (tmp_path / "journal" / SNAPSHOT_FILE).exists()
+    assert sorted(path.name for path in (tmp_path / "journal").glob("engine.journal.*")) == []
+
+    decision = restored_engine.process_tick(
+        user_id="u0", symbol="EURUSD", price=1.2, ai_approved=True
+    )
+    assert decision.message != "Insufficient trend history"
+
+
+def test_engine_journal_snapshots_and_tolerates_a_torn_tail(store_db, tmp_path):
+    for user_id in ("u0", "u1", "u2"):
+        _configure_user(store_db, user_id)
+    engine, ai_filter, journal = _journaled(tmp_path, snapshot_every=25)
+    journal.restore()
+    _run_ticks(engine, ai_filter, 40)
+    journal.flush()
+    expected = _state(engine, ai_filter)
+
+    segments = sorted(tmp_path.glob("engine.journal.*"))
+    assert len(segments) == 1
+    with segments[0].open("ab") as handle:
+        handle.write(b"\x94\xa1p")
+
+    restored_engine, restored_filter, restored = _journaled(tmp_path)
+    assert 0 < restored.restore() < 25
+    assert _state(restored_engine, restored_filter) == expected
+
+    restored.close()
+    again_engine, again_filter, again = _journaled(tmp_path)
+    assert again.restore() == 0
+    assert _state(again_engine, again_filter) == expected
+
+
+def test_engine_journal_restores_tick_sequence(tmp_path):
+    from app.services.tick_sequencer import DUPLICATE_TICK, OUT_OF_ORDER_TICK
+
+    engine, _, journal = _journaled(tmp_path)
+    journal.restore()
+    assert engine.sequencer.check("u1", "EURUSD", 100) is None
+    assert engine.sequencer.check("u1", "EURUSD", 200) is None
+    assert engine.sequencer.check("u2", "EURUSD", 150) is None
+    journal.flush()
+
+    # From the segment, then from the snapshot that restore() folds it into.
+    for _ in range(2):
+        engine, _, journal = _journaled(tmp_path)
+        journal.restore()
+        assert engine.sequencer.check("u1", "EURUSD", 200) == DUPLICATE_TICK
+        assert engine.sequencer.check("u2", "EURUSD", 120) == OUT_OF_ORDER_TICK
+    assert engine.sequencer.check("u1", "EURUSD", 201) is None
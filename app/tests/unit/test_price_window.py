@@ -0,0 +1,62 @@
+import random
+from collections import deque
+from math import isclose, sqrt
+
+from app.services.ai_filter import AIFilterService
+from app.services.price_window import PriceWindow
+
+
+def _reference_volatility(prices):
+    """The full recomputation PriceWindow replaces."""
+    if len(prices) < 4:
+        return 0.0
+    returns = [(curr - prev) / prev for prev, curr in zip(prices, prices[1:]) if prev != 0]
+    if len(returns) < 2:
+        return 0.0
+    mean = sum(returns) / len(returns)
+    return sqrt(sum((item - mean) ** 2 for item in returns) / len(returns))
+
+
+def test_price_window_matches_full_recomputation_over_a_long_stream():
+    rng = random.Random(11)
+    window = PriceWindow(maxlen=20)
+    reference = deque(maxlen=20)
+    price = 1.1
+    # Long enough to cross several exact resyncs.
+    for step in range(5_000):
+        price *= 1 + rng.gauss(0.0, 0.002 if step % 500 < 50 else 0.0002)
+        window.append(price)
+        reference.append(price)
+        assert list(window) == list(reference)
+        assert (window[0], window[-1], len(window)) == (reference[0], reference[-1], len(reference))
+        assert isclose(
+            window.volatility(), _reference_volatility(list(reference)), rel_tol=1e-9, abs_tol=1e-15
+        )
+
+
+def test_price_window_skips_returns_from_zero_prices_and_short_windows():
+    window = PriceWindow([1.0, 0.0, 2.0], maxlen=4)
+    assert window.volatility() == 0.0
+    window.append(3.0)
+    assert window.volatility() == _reference_volatility([1.0, 0.0, 2.0, 3.0])
+    window.append(4.0)
+    assert isclose(window.volatility(), _reference_volatility([0.0, 2.0, 3.0, 4.0]))
+    assert window.trend_strength() == 0.0
+
+
+def test_ai_filter_decisions_unchanged_by_rolling_window():
+    rng = random.Random(3)
+    service = AIFilterService()
+    reference = deque(maxlen=service.window_size)
+    price = 1.3
+    for _ in range(2_000):
+        price *= 1 + rng.gauss(0.0, 0.0008)
+        reference.append(price)
+        decision = service.evaluate(
+            user_id="u1", symbol="EURUSD", price=price, news_spike=False, confidence_threshold=0.6
+        )
+        trend = abs((reference[-1] - reference[0]) / reference[0]) if len(reference) >= 3 else 0.0
+        assert decision.trend_strength == round(trend, 8)
+        assert isclose(
+            decision.volatility, round(_reference_volatility(list(reference)), 8), abs_tol=1e-8
+        )
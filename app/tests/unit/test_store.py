@@ -0,0 +1,453 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from app.config import settings
+from app.core.timestamps import to_epoch_us
+
+
+@pytest.mark.sqlite_only
+def test_store_reuses_connection_per_thread(store_db):
+    opened = store_db.get_backend().connections_opened
+    store_db.upsert_session_config(user_id="u1", duration_minutes=30)
+    store_db.get_session_config("u1")
+    store_db.get_bot_session("u1")
+    assert store_db.get_backend().connections_opened == opened
+
+    def worker():
+        store_db.get_session_config("u1")
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert store_db.get_backend().connections_opened == opened + 1
+
+
+@pytest.mark.sqlite_only
+def test_store_connection_uses_configured_pragmas(store_db):
+    with store_db.get_backend().connection() as conn:
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    assert journal_mode == "wal"
+    assert synchronous == 1
+
+
+@pytest.mark.sqlite_only
+def test_store_non_persistent_mode_opens_per_call(store_db, monkeypatch):
+    monkeypatch.setattr(settings, "STORE_PERSISTENT_CONNECTIONS", False)
+    opened = store_db.get_backend().connections_opened
+    store_db.get_session_config("u1")
+    store_db.get_risk_config("u1")
+    assert store_db.get_backend().connections_opened == opened + 2
+
+
+def test_store_rolls_back_failed_write(store_db):
+    try:
+        with store_db.get_backend().connection() as conn:
+            conn.execute(
+                "INSERT INTO session_configs (user_id, duration_minutes, updated_at) VALUES ('u2', 5, 1)"
+            )
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert store_db.get_session_config("u2") is None
+
+
+def test_write_behind_journal_batches_audit_rows(store_db):
+    for index in range(5):
+        store_db.create_notification(
+            user_id="u1",
+            event_type="trade_opened",
+            title="Trade opened",
+            message=f"trade {index}",
+            channel="in_app",
+        )
+    rows = store_db.list_notifications("u1")
+    stats = store_db.get_journal().stats()
+    assert len(rows) == 5
+    assert stats["rows_written"] == 5
+    assert stats["queue_depth"] == 0
+
+
+def test_write_behind_journal_applies_backpressure(store_db):
+    journal = store_db.WriteBehindJournal(
+        connection=store_db.get_backend().connection,
+        max_queue=1,
+        batch_size=1,
+        flush_interval_ms=0,
+    )
+    for index in range(20):
+        journal.append(
+            "INSERT INTO session_configs (user_id, duration_minutes, updated_at) VALUES (?, ?, ?)",
+            (f"user-{index}", 5, 1),
+        )
+    journal.close()
+    assert journal.stats()["rows_written"] == 20
+    assert store_db.get_session_config("user-19") is not None
+
+
+def test_write_behind_disabled_writes_synchronously(store_db, monkeypatch):
+    monkeypatch.setattr(settings, "STORE_WRITE_BEHIND", False)
+    store_db.create_ai_decision(
+        user_id="u1",
+        symbol="EURUSD",
+        price=1.1,
+        approved=True,
+        confidence=0.9,
+        reasons=["trend_strength_ok"],
+        trend_strength=0.001,
+        volatility=0.0001,
+    )
+    with store_db.get_backend().connection() as conn:
+        count = conn.execute("SELECT COUNT(*) AS n FROM ai_decisions").fetchone()["n"]
+    assert count == 1
+    assert store_db.get_journal().stats()["rows_written"] == 0
+
+
+def test_audit_batch_commits_buffered_rows_together(store_db, monkeypatch):
+    monkeypatch.setattr(settings, "STORE_WRITE_BEHIND", False)
+    statements: list[str] = []
+    with store_db.get_backend().connection() as conn:
+        conn.set_trace_callback(statements.append)
+        with store_db.audit_batch():
+            for index in range(3):
+                store_db.create_notification(
+                    user_id="u1", event_type="e", title="t", message=str(index), channel="in_app"
+                )
+            assert conn.execute("SELECT COUNT(*) AS n FROM notifications").fetchone()["n"] == 0
+        conn.set_trace_callback(None)
+
+    assert [item["message"] for item in store_db.list_notifications("u1")] == ["2", "1", "0"]
+    if store_db.get_backend().name == "sqlite":
+        # The Postgres adapter traces cursor statements only, not the commit.
+        assert statements.count("COMMIT") == 1
+
+
+def _open_trades(store_db, user_id, symbols, entry_price=1.1):
+    for symbol in symbols:
+        store_db.open_trade(
+            user_id=user_id,
+            symbol=symbol,
+            side="BUY",
+            quantity=1.0,
+            entry_price=entry_price,
+        )
+    return store_db.get_open_trades(user_id)
+
+
+def test_close_trade_moves_row_atomically(store_db):
+    trade = _open_trades(store_db, "u1", ["EURUSD"])[0]
+    assert store_db.close_trade(user_id="u1", trade_id=trade["id"], close_price=1.2, pnl=0.1, reason="tp_hit")
+    assert not store_db.close_trade(user_id="u1", trade_id=trade["id"], close_price=1.2, pnl=0.1, reason="tp_hit")
+
+    closed = store_db.get_closed_trades("u1")
+    assert store_db.get_open_trades("u1") == []
+    assert len(closed) == 1
+    assert closed[0]["close_reason"] == "tp_hit"
+    assert closed[0]["opened_at"] == trade["opened_at"]
+
+
+def test_close_trades_bulk_closes_in_one_transaction(store_db):
+    trades = _open_trades(store_db, "u1", [f"SYM{index}" for index in range(200)])
+    closes = [(trade["id"], 1.2, 0.1, "flatten") for trade in trades]
+    closes.append((trades[0]["id"], 1.3, 0.2, "flatten"))
+    closes.append((999_999, 1.3, 0.2, "flatten"))
+
+    closed_ids = store_db.close_trades_bulk(closes, user_id="u1")
+
+    assert sorted(closed_ids) == sorted(trade["id"] for trade in trades)
+    assert store_db.get_open_trades("u1") == []
+    assert len(store_db.get_closed_trades("u1", limit=500)) == 200
+
+
+def test_daily_pnl_ledger_tracks_closed_trades(store_db):
+    trades = _open_trades(store_db, "u1", ["EURUSD", "GBPUSD", "USDJPY"])
+    store_db.close_trade(user_id="u1", trade_id=trades[0]["id"], close_price=1.2, pnl=0.5, reason="tp_hit")
+    store_db.close_trades_bulk(
+        [(trades[1]["id"], 1.0, -0.25, "sl_hit"), (trades[2]["id"], 1.3, 1.0, "tp_hit")],
+        user_id="u1",
+    )
+    assert store_db.get_realized_pnl_today("u1") == 1.25
+    assert store_db.get_realized_pnl_today("u2") == 0.0
+
+    with store_db.get_backend().connection() as conn:
+        conn.execute("UPDATE daily_pnl SET realized_pnl = 0")
+        conn.commit()
+    assert store_db.rebuild_daily_pnl() == 1
+    assert store_db.get_realized_pnl_today("u1") == 1.25
+
+
+def test_migrations_upgrade_version_one_database(tmp_path, monkeypatch):
+    from app.db import store
+
+    monkeypatch.setattr(settings, "STORE_DATABASE_PATH", str(tmp_path / "legacy.db"))
+    now = datetime.now(timezone.utc).isoformat()
+    legacy = sqlite3.connect(settings.database_path)
+    for ddl in store._TABLES:
+        legacy.execute(ddl)
+    store._add_secondary_indexes(legacy)
+    legacy.execute(
+        """
+        INSERT INTO closed_trades (
+            id, user_id, symbol, side, quantity, entry_price, close_price, pnl,
+            close_reason, opened_at, closed_at
+        )
+        VALUES (41, 'u1', 'EURUSD', 'BUY', 1.0, 1.1, 1.2, 0.75, 'tp_hit', ?, ?)
+        """,
+        (now, now),
+    )
+    legacy.execute(
+        """
+        INSERT INTO licenses (license_key, status, assigned_user_id, expires_at, created_at, updated_at)
+        VALUES ('KEY-1', 'active', 'u1', '2999-01-01T00:00:00+00:00', ?, ?)
+        """,
+        (now, now),
+    )
+    legacy.execute("PRAGMA user_version = 1")
+    legacy.commit()
+    legacy.close()
+
+    store.init_db()
+    try:
+        assert store.get_schema_version() == store.SCHEMA_VERSION
+        assert store.get_realized_pnl_today("u1") == 0.75
+        closed = store.get_closed_trades("u1")
+        assert closed[0]["closed_at"] == to_epoch_us(now)
+        assert store.is_license_valid_for_user("u1") == (True, "License is valid")
+        with store.get_backend().connection() as conn:
+            kinds = conn.execute(
+                "SELECT typeof(closed_at) AS closed_kind FROM closed_trades"
+            ).fetchone()
+            indexes = {
+                row["name"]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'closed_trades'"
+                )
+            }
+        assert kinds["closed_kind"] == "integer"
+        assert "ix_closed_trades_user_closed_at" in indexes
+
+        trade = _open_trades(store, "u1", ["GBPUSD"])[0]
+        store.close_trade(user_id="u1", trade_id=trade["id"], close_price=1.2, pnl=0.25, reason="tp_hit")
+        assert max(row["id"] for row in store.get_closed_trades("u1")) > 41
+    finally:
+        store.shutdown()
+
+
+def _close_trade_on(store_db, user_id, symbol, pnl, closed_at):
+    trade = _open_trades(store_db, user_id, [symbol])[0]
+    store_db.close_trade(user_id=user_id, trade_id=trade["id"], close_price=1.2, pnl=pnl, reason="tp_hit")
+    with store_db.get_backend().connection() as conn:
+        conn.execute(
+            "UPDATE closed_trades SET closed_at = ? WHERE id = ?",
+            (to_epoch_us(closed_at), trade["id"]),
+        )
+        conn.commit()
+
+
+def test_archive_moves_expired_rows_to_parquet(store_db):
+    now = datetime(2026, 6, 30, 12, 0, tzinfo=timezone.utc)
+    for day in range(1, 6):
+        _close_trade_on(store_db, "u1", f"SYM{day}", float(day), f"2026-03-0{day}T10:00:00+00:00")
+    _close_trade_on(store_db, "u1", "RECENT", 9.0, "2026-06-29T10:00:00+00:00")
+    _close_trade_on(store_db, "u2", "OTHER", 7.0, "2026-03-02T10:00:00+00:00")
+
+    archived = store_db.archive_expired_rows(retention_days=30, batch_size=2, now=now)
+
+    assert archived == {"closed_trades": 6, "ai_decisions": 0}
+    assert store_db.get_archive_watermark("closed_trades") == "2026-05-31"
+    assert [row["symbol"] for row in store_db.get_closed_trades("u1")] == ["RECENT"]
+    assert store_db.get_archive().days("closed_trades") == [f"2026-03-0{day}" for day in range(1, 6)]
+
+    history = store_db.get_closed_trades("u1", since="2026-03-02")
+    assert [row["symbol"] for row in history] == ["RECENT", "SYM5", "SYM4", "SYM3", "SYM2"]
+    assert [row["symbol"] for row in store_db.get_closed_trades("u1", limit=2, since="2026-03-01")] == [
+        "RECENT",
+        "SYM5",
+    ]
+    assert store_db.archive_expired_rows(retention_days=30, now=now)["closed_trades"] == 0
+
+
+def test_archive_reads_ai_decisions_beyond_hot_window(store_db):
+    store_db.create_ai_decision(
+        user_id="u1",
+        symbol="EURUSD",
+        price=1.1,
+        approved=True,
+        confidence=0.9,
+        reasons=["trend"],
+        trend_strength=0.5,
+        volatility=0.1,
+    )
+    store_db.flush_journal()
+    with store_db.get_backend().connection() as conn:
+        conn.execute(
+            "UPDATE ai_decisions SET created_at = ?",
+            (to_epoch_us("2026-01-15T08:00:00+00:00"),),
+        )
+        conn.commit()
+
+    store_db.archive_expired_rows(
+        retention_days=90, now=datetime(2026, 6, 1, tzinfo=timezone.utc)
+    )
+
+    assert store_db.get_ai_decisions("u1") == []
+    decisions = store_db.get_ai_decisions("u1", since="2026-01-01")
+    assert len(decisions) == 1
+    assert decisions[0]["reasons"] == "trend"
+    assert decisions[0]["approved"] == 1
+
+
+def test_rebuild_daily_pnl_keeps_archived_days(store_db):
+    _close_trade_on(store_db, "u1", "OLD", 2.0, "2026-01-10T10:00:00+00:00")
+    store_db.rebuild_daily_pnl()
+    store_db.archive_expired_rows(retention_days=30, now=datetime(2026, 6, 1, tzinfo=timezone.utc))
+
+    store_db.rebuild_daily_pnl()
+
+    with store_db.get_backend().connection() as conn:
+        row = conn.execute(
+            "SELECT realized_pnl FROM daily_pnl WHERE user_id = 'u1' AND trading_day = '2026-01-10'"
+        ).fetchone()
+    assert row["realized_pnl"] == 2.0
+
+
+def _users_on_distinct_shards(store, count):
+    backend = store.get_backend()
+    users: dict[int, str] = {}
+    index = 0
+    while len(users) < count:
+        user_id = f"user-{index}"
+        users.setdefault(backend.shard_for(user_id), user_id)
+        index += 1
+    return list(users.values())
+
+
+def test_sharded_store_routes_users_to_their_shard(sharded_store_db, tmp_path):
+    store = sharded_store_db
+    users = _users_on_distinct_shards(store, 4)
+    for user_id in users:
+        store.upsert_session_config(user_id=user_id, duration_minutes=15)
+        store.open_trade(user_id=user_id, symbol="EURUSD", side="BUY", quantity=1.0, entry_price=1.1)
+
+    assert sorted(path.name for path in tmp_path.glob("store.shard*.db")) == [
+        f"store.shard{shard:02d}.db" for shard in range(4)
+    ]
+    for shard, user_id in enumerate(users):
+        with store.get_backend().connection(store.get_backend().shard_for(user_id)) as conn:
+            owners = [row["user_id"] for row in conn.execute("SELECT user_id FROM session_configs")]
+        assert owners == [user_id]
+        state = store.get_user_trading_state(user_id, "EURUSD")
+        assert state.session_config["duration_minutes"] == 15
+        assert state.open_trade is not None
+
+
+def test_sharded_store_scopes_trade_ids_to_their_owner(sharded_store_db):
+    store = sharded_store_db
+    first, second = _users_on_distinct_shards(store, 2)
+    for user_id in (first, second):
+        store.open_trade(user_id=user_id, symbol="EURUSD", side="BUY", quantity=1.0, entry_price=1.1)
+    first_trade = store.get_open_trades(first)[0]
+    second_trade = store.get_open_trades(second)[0]
+    assert first_trade["id"] == second_trade["id"]
+
+    assert store.close_trade(
+        user_id=first, trade_id=first_trade["id"], close_price=1.2, pnl=0.1, reason="tp_hit"
+    )
+    assert store.get_open_trades(first) == []
+    assert len(store.get_open_trades(second)) == 1
+    assert store.get_realized_pnl_today(first) == 0.1
+    assert store.get_realized_pnl_today(second) == 0.0
+
+
+def test_sharded_store_fans_out_admin_queries(sharded_store_db):
+    store = sharded_store_db
+    users = _users_on_distinct_shards(store, 4)
+    for user_id in users:
+        store.set_bot_session(
+            user_id=user_id, is_running=True, started_at=None, trades_opened_this_session=0
+        )
+        store.open_trade(user_id=user_id, symbol="EURUSD", side="BUY", quantity=1.0, entry_price=1.1)
+        trade = store.get_open_trades(user_id)[0]
+        store.close_trade(user_id=user_id, trade_id=trade["id"], close_price=1.2, pnl=0.5, reason="tp_hit")
+        store.create_notification(
+            user_id=user_id,
+            event_type="bot_started",
+            title="Bot started",
+            message=user_id,
+            channel="in_app",
+        )
+
+    assert store.stop_all_running_bots() == 4
+    assert all(not store.get_bot_session(user_id)["is_running"] for user_id in users)
+    assert store.rebuild_daily_pnl() == 4
+    assert store.get_schema_version() == store.SCHEMA_VERSION
+    for user_id in users:
+        assert [row["message"] for row in store.list_notifications(user_id)] == [user_id]
+
+
+def test_sharded_store_keeps_licenses_on_home_shard(sharded_store_db):
+    store = sharded_store_db
+    user_id = next(user for user in _users_on_distinct_shards(store, 4) if store.get_backend().shard_for(user))
+    store.create_license(license_key="KEY-1", expires_at="2999-01-01T00:00:00+00:00")
+    store.activate_license_for_user(license_key="KEY-1", user_id=user_id)
+
+    assert [row["license_key"] for row in store.list_licenses()] == ["KEY-1"]
+    state = store.get_user_trading_state(user_id, include_license=True)
+    assert state.license["license_key"] == "KEY-1"
+    assert store.check_license(state.license) == (True, "License is valid")
+
+
+def test_bulk_config_upserts_write_every_shard_in_input_order(sharded_store_db):
+    store = sharded_store_db
+    users = _users_on_distinct_shards(store, 4)
+    store.upsert_session_config(user_id=users[0], duration_minutes=5)
+
+    rows = store.upsert_session_configs(
+        [{"user_id": user_id, "duration_minutes": 30 + index} for index, user_id in enumerate(users)]
+        + [{"user_id": users[1], "duration_minutes": 90}]
+    )
+
+    assert [row["user_id"] for row in rows] == [*users, users[1]]
+    assert [row["duration_minutes"] for row in rows] == [30, 90, 32, 33, 90]
+    assert store.get_session_config(users[0])["duration_minutes"] == 30
+
+    rows = store.upsert_trading_configs(
+        [
+            {
+                "user_id": user_id,
+                "assets": ["EURUSD", "GBPUSD"],
+                "timeframe": "M5",
+                "max_trades_per_session": 4,
+                "quantity": 1.0,
+                "profit_threshold": 0.02,
+                "loss_threshold": -0.02,
+            }
+            for user_id in users
+        ]
+    )
+    assert [row["assets"] for row in rows] == ["EURUSD,GBPUSD"] * 4
+    assert all(store.get_trading_config(user_id)["timeframe"] == "M5" for user_id in users)
+
+
+def test_close_trades_for_users_batches_across_shards(sharded_store_db):
+    store = sharded_store_db
+    users = _users_on_distinct_shards(store, 3)
+    for user_id in users:
+        store.open_trade(user_id=user_id, symbol="EURUSD", side="BUY", quantity=1.0, entry_price=1.1)
+    trade_ids = {user_id: store.get_open_trades(user_id)[0]["id"] for user_id in users}
+
+    closed = store.close_trades_for_users(
+        {
+            users[0]: [(trade_ids[users[0]], 1.2, 0.1, "tp_hit")],
+            users[1]: [(trade_ids[users[1]], 1.0, -0.1, "sl_hit")],
+            users[2]: [(trade_ids[users[2]] + 1, 1.2, 0.1, "tp_hit")],
+        }
+    )
+
+    assert closed == {users[0]: [trade_ids[users[0]]], users[1]: [trade_ids[users[1]]]}
+    assert store.get_realized_pnl_today(users[0]) == 0.1
+    assert store.get_realized_pnl_today(users[1]) == -0.1
+    assert len(store.get_open_trades(users[2])) == 1
@@ -0,0 +1,165 @@
+import threading
+import time
+
+from app.core.timestamps import to_epoch_us
+from app.db.backends import PostgresBackend
+
+
+def _open_trade(store, user_id: str, symbol: str, entry_price: float) -> int:
+    with store.get_backend().connection() as conn:
+        row = conn.execute(
+            """
+            INSERT INTO open_trades (user_id, symbol, side, quantity, entry_price, opened_at)
+            VALUES (?, ?, 'BUY', 1.0, ?, ?)
+            RETURNING id
+            """,
+            (user_id, symbol, entry_price, to_epoch_us("2026-01-01T00:00:00+00:00")),
+        ).fetchone()
+        conn.commit()
+    return int(row["id"])
+
+
+def test_postgres_backend_runs_migrations(pg_store_db):
+    assert isinstance(pg_store_db.get_backend(), PostgresBackend)
+    assert pg_store_db.get_schema_version() == pg_store_db.SCHEMA_VERSION
+    pg_store_db.init_db()
+    assert pg_store_db.get_schema_version() == pg_store_db.SCHEMA_VERSION
+
+
+def test_postgres_backend_converts_text_timestamps(pg_store_db):
+    with pg_store_db.get_backend().connection() as conn:
+        conn.execute("DROP TABLE licenses CASCADE")
+        baseline = next(ddl for ddl in pg_store_db._TABLES if "EXISTS licenses (" in ddl)
+        conn.execute(pg_store_db.get_backend().translate_ddl(baseline))
+        conn.execute(
+            """
+            INSERT INTO licenses (license_key, status, assigned_user_id, expires_at, created_at, updated_at)
+            VALUES ('KEY-1', 'active', 'u1', '2999-01-01', '2026-01-01T12:00:00+00:00', '2026-01-01T12:00:00.5+00:00')
+            """
+        )
+        pg_store_db.get_backend().set_schema_version(conn, 3)
+        conn.commit()
+
+    pg_store_db.init_db()
+
+    row = pg_store_db.get_license_by_key("KEY-1")
+    assert row["expires_at"] == to_epoch_us("2999-01-01")
+    assert row["updated_at"] == to_epoch_us("2026-01-01T12:00:00.5+00:00")
+    assert pg_store_db.is_license_valid_for_user("u1") == (True, "License is valid")
+
+
+def test_postgres_backend_round_trips_configs(pg_store_db):
+    pg_store_db.upsert_trading_config(
+        user_id="u1",
+        assets=["EURUSD"],
+        timeframe="M1",
+        max_trades_per_session=3,
+        quantity=1.0,
+        profit_threshold=0.002,
+        loss_threshold=-0.002,
+    )
+    pg_store_db.upsert_session_config(user_id="u1", duration_minutes=45)
+    pg_store_db.set_bot_session(
+        user_id="u1", is_running=True, started_at=None, trades_opened_this_session=0
+    )
+
+    state = pg_store_db.get_user_trading_state("u1", "EURUSD")
+    assert state.trading_config["assets"] == "EURUSD"
+    assert state.session_config["duration_minutes"] == 45
+    assert state.bot_session["is_running"] == 1
+    assert pg_store_db.list_running_trading_assets() == [{"user_id": "u1", "assets": "EURUSD"}]
+
+    rows = pg_store_db.upsert_session_configs(
+        [{"user_id": "u1", "duration_minutes": 20}, {"user_id": "u2", "duration_minutes": 25}]
+    )
+    assert [(row["user_id"], row["duration_minutes"]) for row in rows] == [("u1", 20), ("u2", 25)]
+
+
+def test_postgres_backend_closes_trades_into_daily_ledger(pg_store_db):
+    first = _open_trade(pg_store_db, "u1", "EURUSD", 1.1)
+    second = _open_trade(pg_store_db, "u1", "GBPUSD", 1.2)
+
+    closed = pg_store_db.close_trades_bulk(
+        [
+            (first, 1.2, 0.1, "take_profit"),
+            (second, 1.1, -0.1, "stop_loss"),
+            (first, 1.3, 0.2, "take_profit"),
+        ],
+        user_id="u1",
+    )
+
+    assert sorted(closed) == sorted([first, second])
+    assert pg_store_db.get_open_trades("u1") == []
+    assert len(pg_store_db.get_closed_trades("u1")) == 2
+    assert pg_store_db.rebuild_daily_pnl() == 1
+
+
+def test_postgres_backend_counts_a_concurrently_closed_trade_once(pg_store_db):
+    trade_id = _open_trade(pg_store_db, "u1", "EURUSD", 1.1)
+    results: list[bool] = []
+
+    def close_again() -> None:
+        results.append(
+            pg_store_db.close_trade(
+                user_id="u1", trade_id=trade_id, close_price=1.3, pnl=0.2, reason="take_profit"
+            )
+        )
+
+    with pg_store_db.get_backend().connection() as conn:
+        closed = pg_store_db._close_trades(conn, {("u1", trade_id): (1.2, 0.1, "take_profit")})
+        # The second close starts while the first is still uncommitted.
+        racer = threading.Thread(target=close_again)
+        racer.start()
+        time.sleep(0.2)
+        conn.commit()
+    racer.join()
+
+    assert closed == [("u1", trade_id)]
+    assert results == [False]
+    assert [trade["pnl"] for trade in pg_store_db.get_closed_trades("u1")] == [0.1]
+    assert pg_store_db.get_realized_pnl_today("u1") == 0.1
+
+
+def test_postgres_backend_licenses_and_idempotency(pg_store_db):
+    license_row = pg_store_db.create_license(
+        license_key="KEY-1", expires_at="2999-01-01T00:00:00+00:00"
+    )
+    assert license_row["id"]
+    pg_store_db.activate_license_for_user(license_key="KEY-1", user_id="u1")
+    assert pg_store_db.is_license_valid_for_user("u1") == (True, "License is valid")
+
+    pg_store_db.save_idempotent_response(idempotency_key="k", endpoint="/engine/tick", response={"a": 1})
+    pg_store_db.save_idempotent_response(idempotency_key="k", endpoint="/engine/tick", response={"a": 2})
+    assert pg_store_db.get_idempotent_response(idempotency_key="k", endpoint="/engine/tick") == {"a": 2}
+
+
+def test_postgres_backend_flushes_write_behind_journal(pg_store_db):
+    for index in range(3):
+        pg_store_db.create_notification(
+            user_id="u1",
+            event_type="trade_opened",
+            title="Trade opened",
+            message=f"trade {index}",
+            channel="in_app",
+        )
+    assert len(pg_store_db.list_notifications("u1")) == 3
+    assert pg_store_db.get_journal().stats()["rows_failed"] == 0
+
+
+def test_postgres_backend_shares_pool_across_threads(pg_store_db):
+    errors: list[BaseException] = []
+
+    def worker(index: int) -> None:
+        try:
+            pg_store_db.upsert_session_config(user_id=f"u{index}", duration_minutes=index + 1)
+            assert pg_store_db.get_session_config(f"u{index}")["duration_minutes"] == index + 1
+        except BaseException as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
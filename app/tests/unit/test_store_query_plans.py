@@ -0,0 +1,127 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import settings
+
+_PLANNED_PREFIXES = ("SELECT", "UPDATE", "DELETE", "INSERT INTO CLOSED_TRADES")
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def _exercise_store(store):
+    store.upsert_mt5_account(
+        user_id="u1",
+        login_enc="l",
+        password_enc="p",
+        server_enc="s",
+        broker_enc=None,
+        last_validation_status="ok",
+    )
+    store.get_mt5_account("u1")
+    store.upsert_trading_config(
+        user_id="u1",
+        assets=["EURUSD"],
+        timeframe="M1",
+        max_trades_per_session=5,
+        quantity=1.0,
+        profit_threshold=0.02,
+        loss_threshold=-0.02,
+    )
+    store.get_trading_config("u1")
+    store.set_bot_session(user_id="u1", is_running=True, started_at=None, trades_opened_this_session=0)
+    store.get_bot_session("u1")
+    store.list_running_trading_assets()
+    store.increment_session_trades("u1")
+    store.upsert_risk_config(
+        user_id="u1", daily_profit_target=10.0, daily_loss_limit=10.0, allocated_capital=100.0
+    )
+    store.get_risk_config("u1")
+    store.upsert_session_config(user_id="u1", duration_minutes=30)
+    store.upsert_session_configs([{"user_id": "u1", "duration_minutes": 30}])
+    store.get_session_config("u1")
+    store.open_trade(user_id="u1", symbol="EURUSD", side="BUY", quantity=1.0, entry_price=1.1)
+    trade = store.get_open_trade(user_id="u1", symbol="EURUSD")
+    store.get_open_exposure("u1")
+    store.get_open_trades("u1")
+    store.get_unrealized_pnl("u1", {"EURUSD": 1.2})
+    store.close_trade(user_id="u1", trade_id=trade["id"], close_price=1.2, pnl=0.1, reason="tp_hit")
+    store.get_realized_pnl_today("u1")
+    store.get_closed_trades("u1")
+    store.create_ai_decision(
+        user_id="u1",
+        symbol="EURUSD",
+        price=1.1,
+        approved=True,
+        confidence=0.9,
+        reasons=["trend_strength_ok"],
+        trend_strength=0.001,
+        volatility=0.0001,
+    )
+    store.create_notification(
+        user_id="u1", event_type="e", title="t", message="m", channel="in_app"
+    )
+    store.list_notifications("u1")
+    license_row = store.create_license(license_key="KEY-1", expires_at="2999-01-01T00:00:00+00:00")
+    store.get_license_by_key("KEY-1")
+    store.activate_license_for_user(license_key="KEY-1", user_id="u1")
+    store.get_license_by_user("u1")
+    store.is_license_valid_for_user("u1")
+    store.revoke_license(int(license_row["id"]))
+    store.list_licenses()
+    store.save_idempotent_response(idempotency_key="k", endpoint="/engine/tick", response={})
+    store.get_idempotent_response(idempotency_key="k", endpoint="/engine/tick")
+    store.get_user_trading_state("u1", "EURUSD", include_license=True)
+    store.stop_all_running_bots()
+    store.archive_expired_rows(retention_days=0, now=datetime.now(timezone.utc) + timedelta(days=1))
+    store.get_closed_trades("u1", since="2000-01-01")
+    store.get_ai_decisions("u1", since="2000-01-01")
+
+
+@pytest.fixture
+def traced_statements(store_db, monkeypatch):
+    monkeypatch.setattr(settings, "STORE_WRITE_BEHIND", False)
+    statements: list[str] = []
+    with store_db.get_backend().connection() as conn:
+        conn.set_trace_callback(statements.append)
+    yield statements
+    with store_db.get_backend().connection() as conn:
+        conn.set_trace_callback(None)
+
+
+def test_store_queries_are_at_current_schema_version(store_db):
+    assert store_db.get_schema_version() == store_db.SCHEMA_VERSION
+
+
+@pytest.mark.sqlite_only
+def test_store_queries_do_not_scan_tables(store_db, traced_statements):
+    _exercise_store(store_db)
+
+    planned = {
+        statement.strip()
+        for statement in traced_statements
+        if statement.strip().upper().startswith(_PLANNED_PREFIXES)
+    }
+    assert planned
+
+    regressions: dict[str, list[str]] = {}
+    with store_db.get_backend().connection() as conn:
+        tables = {
+            str(row["name"])
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        for statement in planned:
+            details = [
+                str(row["detail"])
+                for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+            ]
+            bad = [
+                detail
+                for detail in details
+                if "TEMP B-TREE" in detail
+                or ((match := _FULL_SCAN.match(detail)) and match.group(1) in tables)
+            ]
+            if bad:
+                regressions[" ".join(statement.split())] = bad
+
+    assert regressions == {}
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.tick_actors import TickActorPool
+
+
+def _users_on_distinct_workers(pool, count):
+    users: dict[int, str] = {}
+    index = 0
+    while len(users) < count:
+        user_id = f"user-{index}"
+        users.setdefault(pool.worker_for(user_id), user_id)
+        index += 1
+    return list(users.values())
+
+
+async def test_tick_actors_run_each_users_jobs_in_submission_order():
+    pool = TickActorPool(workers=2)
+    seen: list[tuple[str, int]] = []
+
+    def job(user_id, index):
+        # Later jobs finish faster, so only the mailbox keeps them in order.
+        time.sleep((5 - index) * 0.002)
+        seen.append((user_id, index))
+        return index
+
+    results = await asyncio.gather(
+        *(pool.submit(user_id, job, user_id, index) for index in range(5) for user_id in ("a", "b"))
+    )
+    await pool.shutdown()
+
+    assert results == [index for index in range(5) for _ in range(2)]
+    for user_id in ("a", "b"):
+        assert [index for owner, index in seen if owner == user_id] == list(range(5))
+
+
+async def test_tick_actors_run_users_on_different_workers_concurrently():
+    pool = TickActorPool(workers=4)
+    first, second = _users_on_distinct_workers(pool, 2)
+    barrier = threading.Barrier(2, timeout=5)
+
+    await asyncio.gather(pool.submit(first, barrier.wait), pool.submit(second, barrier.wait))
+
+    stats = pool.stats()
+    assert sum(item["processed"] for item in stats) == 2
+    assert all(item["queued"] == 0 and item["users"] == 0 for item in stats)
+    assert {item["worker"] for item in stats if item["max_queued"]} == {
+        pool.worker_for(first),
+        pool.worker_for(second),
+    }
+    await pool.shutdown()
+
+
+async def test_tick_actors_propagate_job_errors():
+    pool = TickActorPool(workers=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        await pool.submit("a", fail)
+    assert await pool.submit("a", lambda: "next") == "next"
+    await pool.shutdown()
+
+
+async def test_tick_actors_order_multi_user_jobs_against_each_user():
+    pool = TickActorPool(workers=4)
+    first, second = _users_on_distinct_workers(pool, 2)
+    seen: list[str] = []
+
+    def job(label, delay=0.0):
+        time.sleep(delay)
+        seen.append(label)
+
+    await asyncio.gather(
+        pool.submit(first, job, "first-before", 0.02),
+        pool.submit_many((first, second, first), job, "both"),
+        pool.submit(second, job, "second-after"),
+        pool.submit(first, job, "first-after"),
+    )
+    await pool.shutdown()
+
+    assert seen[:2] == ["first-before", "both"]
+    assert sorted(seen[2:]) == ["first-after", "second-after"]
+    assert sum(item["processed"] for item in pool.stats()) == 4
+
+
+async def test_tick_actors_run_on_their_own_store_pool():
+    from app.db import async_store
+
+    pool = TickActorPool(workers=1)
+    tick_thread = await pool.submit("a", lambda: threading.current_thread().name)
+    route_thread = await async_store.run(lambda: threading.current_thread().name)
+    await pool.shutdown()
+    await async_store.shutdown()
+
+    assert tick_thread.startswith("store-ticks")
+    assert not route_thread.startswith("store-ticks")
@@ -0,0 +1,44 @@
+from app.services.timer_wheel import TimerWheel
+
+
+def test_timer_wheel_fires_due_keys_once():
+    wheel = TimerWheel(resolution_us=10, slots=8)
+    wheel.schedule("a", 25)
+    wheel.schedule("b", 40)
+    # Past one turn of the wheel: shares a slot with "a" until its own turn.
+    wheel.schedule("c", 105)
+
+    assert wheel.advance(20) == []
+    assert wheel.advance(30) == ["a"]
+    assert wheel.advance(30) == []
+    assert wheel.advance(60) == ["b"]
+    assert len(wheel) == 1
+    assert wheel.advance(104) == []
+    assert wheel.advance(1_000) == ["c"]
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_reschedule_and_cancel():
+    wheel = TimerWheel(resolution_us=10, slots=8)
+    wheel.schedule("a", 15)
+    wheel.schedule("a", 55)
+    wheel.schedule("b", 15)
+    wheel.cancel("b")
+
+    assert wheel.advance(20) == []
+    assert wheel.advance(60) == ["a"]
+    wheel.cancel("missing")
+
+
+def test_timer_wheel_fires_a_past_deadline_scheduled_behind_the_cursor():
+    wheel = TimerWheel(resolution_us=10, slots=8)
+    wheel.advance(300)
+    # E.g. a session shortened so its deadline is already behind the cursor.
+    wheel.schedule("a", 120)
+
+    assert wheel.advance(305) == ["a"]
+    assert len(wheel) == 0
+
+    wheel.schedule("b", 200)
+    wheel.cancel("b")
+    assert wheel.advance(310) == []
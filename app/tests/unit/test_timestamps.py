@@ -0,0 +1,58 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.core.timestamps import (
+    MICROS_PER_SECOND,
+    SimulatedClock,
+    SystemClock,
+    day_start_us,
+    format_timestamp,
+    get_clock,
+    now_us,
+    to_epoch_us,
+    use_clock,
+    utc_day,
+)
+
+
+def test_to_epoch_us_round_trips_iso_strings():
+    value = "2026-03-01T10:15:30.123456+00:00"
+    assert format_timestamp(to_epoch_us(value)) == value
+    assert to_epoch_us("2026-03-01T12:15:30.123456+02:00") == to_epoch_us(value)
+    assert to_epoch_us(datetime(2026, 3, 1, 10, 15, 30, 123456)) == to_epoch_us(value)
+
+
+def test_to_epoch_us_treats_dates_as_utc_midnight():
+    assert to_epoch_us("2026-03-01") == day_start_us("2026-03-01")
+    assert to_epoch_us(date(2026, 3, 1)) == day_start_us("2026-03-01")
+    assert utc_day(day_start_us("2026-03-01") - 1) == "2026-02-28"
+
+
+def test_now_us_matches_wall_clock():
+    before = datetime.now(timezone.utc) - timedelta(seconds=1)
+    assert to_epoch_us(before) < now_us() < to_epoch_us(before + timedelta(seconds=5))
+
+
+def test_format_timestamp_passes_through_text_and_none():
+    assert format_timestamp(None) is None
+    assert format_timestamp("2026-03-01") == "2026-03-01"
+    with pytest.raises(TypeError):
+        to_epoch_us(True)
+
+
+def test_simulated_clock_replaces_wall_clock_until_restored():
+    start = day_start_us("2026-03-01")
+    with use_clock(SimulatedClock(start)) as clock:
+        assert now_us() == start
+        clock.advance(90 * MICROS_PER_SECOND)
+        assert now_us() == start + 90 * MICROS_PER_SECOND
+        clock.set(day_start_us("2026-03-02"))
+        assert utc_day(now_us()) == "2026-03-02"
+
+        clock.speed = 1_000_000.0
+        clock.set(start)
+        while now_us() == start:
+            pass
+        assert now_us() > start
+    assert isinstance(get_clock(), SystemClock)
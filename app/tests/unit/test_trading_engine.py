@@ -0,0 +1,306 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.timestamps import (
+    MICROS_PER_DAY,
+    MICROS_PER_MINUTE,
+    SimulatedClock,
+    day_start_us,
+    now_us,
+    use_clock,
+)
+from app.services.dashboard_service import DashboardService
+from app.services.engine_state import EngineStateCache
+from app.services.trading_engine import TradingEngine
+
+
+def _configure_user(store, user_id="u1", *, running=True):
+    store.upsert_trading_config(
+        user_id=user_id,
+        assets=["EURUSD"],
+        timeframe="M1",
+        max_trades_per_session=5,
+        quantity=1.0,
+        profit_threshold=0.02,
+        loss_threshold=-0.02,
+    )
+    store.upsert_risk_config(
+        user_id=user_id, daily_profit_target=100.0, daily_loss_limit=100.0, allocated_capital=1000.0
+    )
+    store.upsert_session_config(user_id=user_id, duration_minutes=60)
+    store.set_bot_session(
+        user_id=user_id,
+        is_running=running,
+        started_at=datetime.now(timezone.utc).isoformat(),
+        trades_opened_this_session=0,
+    )
+
+
+@pytest.fixture
+def traced_selects(store_db):
+    statements: list[str] = []
+    with store_db.get_backend().connection() as conn:
+        conn.set_trace_callback(statements.append)
+    yield statements
+    with store_db.get_backend().connection() as conn:
+        conn.set_trace_callback(None)
+
+
+def _selects(statements):
+    return [item for item in statements if item.lstrip().upper().startswith("SELECT")]
+
+
+def test_user_trading_state_snapshot(store_db):
+    _configure_user(store_db)
+    store_db.open_trade(user_id="u1", symbol="EURUSD", side="BUY", quantity=2.0, entry_price=1.5)
+
+    state = store_db.get_user_trading_state("u1", "EURUSD")
+
+    assert state.trading_config["assets"] == "EURUSD"
+    assert state.bot_session["is_running"] == 1
+    assert state.session_config["duration_minutes"] == 60
+    assert state.risk_config["allocated_capital"] == 1000.0
+    assert state.open_trade["symbol"] == "EURUSD"
+    assert state.open_exposure == 3.0
+    assert state.license is None
+
+    empty = store_db.get_user_trading_state("nobody", "EURUSD")
+    assert empty.trading_config is None
+    assert empty.bot_session is None
+    assert empty.open_trade is None
+    assert empty.realized_pnl_today == 0.0
+
+
+def test_process_tick_reads_state_once_then_serves_from_cache(store_db, traced_selects):
+    _configure_user(store_db)
+    engine = TradingEngine(EngineStateCache())
+
+    engine.process_tick(user_id="u1", symbol="EURUSD", price=1.1, ai_approved=True)
+    assert len(_selects(traced_selects)) == 2
+    traced_selects.clear()
+
+    decision = engine.process_tick(user_id="u1", symbol="EURUSD", price=1.2, ai_approved=True)
+    assert decision.action == "opened"
+    decision = engine.process_tick(user_id="u1", symbol="EURUSD", price=1.25, ai_approved=True)
+    assert decision.action == "closed"
+    assert _selects(traced_selects) == []
+
+
+def test_engine_state_cache_writes_through_engine_mutations(store_db):
+    _configure_user(store_db)
+    store_db.upsert_risk_config(
+        user_id="u1", daily_profit_target=0.04, daily_loss_limit=100.0, allocated_capital=1000.0
+    )
+    cache = EngineStateCache()
+    engine = TradingEngine(cache)
+
+    for price in (1.1, 1.2, 1.25):
+        engine.process_tick(user_id="u1", symbol="EURUSD", price=price, ai_approved=True)
+    state = cache.get("u1")
+    assert state.open_trades == {}
+    assert state.trades_opened == 1
+    assert state.realized_pnl_today == pytest.approx(store_db.get_realized_pnl_today("u1"))
+
+    decision = engine.process_tick(user_id="u1", symbol="EURUSD", price=1.3, ai_approved=True)
+    assert decision.message == "Bot stopped: daily profit target reached"
+    assert cache.get("u1").running is False
+    assert store_db.get_bot_session("u1")["is_running"] == 0
+
+
+def test_process_tick_does_not_count_a_trade_the_store_refused(store_db):
+    _configure_user(store_db)
+    cache = EngineStateCache()
+    engine = TradingEngine(cache)
+    engine.process_tick(user_id="u1", symbol="EURUSD", price=1.1, ai_approved=True)
+    # Opened behind the cache's back, so the engine still thinks the symbol is flat.
+    store_db.open_trade(user_id="u1", symbol="EURUSD", side="BUY", quantity=1.0, entry_price=1.1)
+
+    decision = engine.process_tick(user_id="u1", symbol="EURUSD", price=1.2, ai_approved=True)
+
+    assert (decision.action, decision.message) == ("rejected", "Trade already open for symbol")
+    assert store_db.get_bot_session("u1")["trades_opened_this_session"] == 0
+    state = cache.get("u1")
+    assert state.trades_opened == 0
+    assert list(state.open_trades) == ["EURUSD"]
+
+
+def test_process_tick_does_not_open_for_a_bot_stopped_elsewhere(store_db):
+    _configure_user(store_db)
+    cache = EngineStateCache()
+    engine = TradingEngine(cache)
+    engine.process_tick(user_id="u1", symbol="EURUSD", price=1.1, ai_approved=True)
+    # A worker process stops every bot; this process's cache still says running.
+    assert store_db.stop_all_running_bots() == 1
+
+    decision = engine.process_tick(user_id="u1", symbol="EURUSD", price=1.2, ai_approved=True)
+
+    assert (decision.action, decision.message) == ("held", "Bot is not running")
+    assert store_db.get_open_trades("u1") == []
+    assert cache.get("u1").running is False
+
+
+def test_engine_state_cache_reloads_after_invalidation(store_db):
+    _configure_user(store_db)
+    cache = EngineStateCache()
+    engine = TradingEngine(cache)
+    decision = engine.process_tick(user_id="u1", symbol="GBPUSD", price=1.1, ai_approved=True)
+    assert decision.action == "rejected"
+
+    store_db.upsert_trading_config(
+        user_id="u1",
+        assets=["EURUSD", "GBPUSD"],
+        timeframe="M1",
+        max_trades_per_session=5,
+        quantity=1.0,
+        profit_threshold=0.02,
+        loss_threshold=-0.02,
+    )
+    assert cache.get("u1").trading.allowed_assets == frozenset({"EURUSD"})
+    cache.invalidate("u1")
+
+    decision = engine.process_tick(user_id="u1", symbol="GBPUSD", price=1.1, ai_approved=True)
+    assert decision.message == "Insufficient trend history"
+    assert cache.get("u1").trading.allowed_assets == frozenset({"EURUSD", "GBPUSD"})
+
+
+def test_engine_state_cache_indexes_running_subscribers_by_symbol(store_db):
+    _configure_user(store_db, "u1")
+    _configure_user(store_db, "u2")
+    _configure_user(store_db, "u3", running=False)
+    store_db.upsert_trading_config(
+        user_id="u2",
+        assets=["GBPUSD", "EURUSD"],
+        timeframe="M1",
+        max_trades_per_session=5,
+        quantity=1.0,
+        profit_threshold=0.02,
+        loss_threshold=-0.02,
+    )
+    cache = EngineStateCache()
+
+    assert cache.subscribers("EURUSD") == ("u1", "u2")
+    assert cache.subscribers("GBPUSD") == ("u2",)
+    assert cache.subscribers("USDJPY") == ()
+
+    store_db.set_bot_session(
+        user_id="u3", is_running=True, started_at=None, trades_opened_this_session=0
+    )
+    assert cache.subscribers("EURUSD") == ("u1", "u2")
+    cache.invalidate("u3")
+    assert cache.subscribers("EURUSD") == ("u1", "u2", "u3")
+
+
+def test_dashboard_summary_reads_state_with_bounded_queries(store_db, traced_selects):
+    _configure_user(store_db)
+    store_db.open_trade(user_id="u1", symbol="EURUSD", side="BUY", quantity=1.0, entry_price=1.5)
+    traced_selects.clear()
+
+    summary = DashboardService().summary("u1")
+
+    assert summary["margin"] == 1.5
+    assert summary["bot_running"] is True
+    assert len(_selects(traced_selects)) == 2
+
+
+def test_flatten_positions_closes_matching_trades(store_db):
+    for symbol, side in (("EURUSD", "BUY"), ("GBPUSD", "SELL"), ("USDJPY", "BUY")):
+        store_db.open_trade(user_id="u1", symbol=symbol, side=side, quantity=2.0, entry_price=1.0)
+    store_db.open_trade(user_id="u2", symbol="EURUSD", side="BUY", quantity=1.0, entry_price=1.0)
+
+    engine = TradingEngine()
+    decisions = engine.flatten_positions(user_id="u1", symbol="EURUSD", prices={"EURUSD": 1.5})
+    assert [(item.symbol, item.pnl) for item in decisions] == [("EURUSD", 1.0)]
+
+    decisions = engine.flatten_positions(user_id="u1", prices={"GBPUSD": 1.25})
+    pnl_by_symbol = {item.symbol: item.pnl for item in decisions}
+    assert pnl_by_symbol == {"GBPUSD": -0.5, "USDJPY": 0.0}
+    assert store_db.get_open_trades("u1") == []
+    assert len(store_db.get_open_trades("u2")) == 1
+
+
+def test_sweep_triggers_batch_closes_crossed_trades(store_db, traced_selects):
+    cache = EngineStateCache()
+    engine = TradingEngine(cache)
+    for user_id, prices in (("u1", (1.1, 1.2)), ("u2", (1.3, 1.2)), ("u3", (1.1, 1.2))):
+        _configure_user(store_db, user_id)
+        for price in prices:
+            engine.process_tick(user_id=user_id, symbol="EURUSD", price=price, ai_approved=True)
+    assert len(cache.triggers) == 3
+    cache.invalidate("u3")
+    traced_selects.clear()
+
+    assert engine.sweep_triggers(symbol="EURUSD", price=1.21) == {}
+    decisions = engine.sweep_triggers(symbol="EURUSD", price=1.225)
+
+    assert {user_id: item.message for user_id, item in decisions.items()} == {
+        "u1": "Trade closed on profit threshold",
+        "u2": "Trade closed on loss threshold",
+    }
+    assert _selects(traced_selects) == []
+    assert store_db.get_open_trades("u1") == store_db.get_open_trades("u2") == []
+    assert cache.get("u1").realized_pnl_today == pytest.approx(0.025)
+    assert cache.get("u2").open_trades == {}
+
+    decision = engine.process_tick(user_id="u3", symbol="EURUSD", price=1.225, ai_approved=True)
+    assert decision.message == "Trade closed on profit threshold"
+    assert len(cache.triggers) == 0
+
+
+def test_expire_session_stops_bot_past_deadline(store_db):
+    _configure_user(store_db)
+    store_db.set_bot_session(
+        user_id="u1",
+        is_running=True,
+        started_at=now_us() - 61 * MICROS_PER_MINUTE,
+        trades_opened_this_session=0,
+    )
+    states = EngineStateCache()
+    engine = TradingEngine(states)
+
+    state = states.get("u1")
+    assert (state.pnl_floor, state.pnl_ceiling) == (-100.0, 100.0)
+    assert states.session_timers.advance(now_us()) == ["u1"]
+    assert engine.expire_session("u1") is True
+    assert engine.expire_session("u1") is False
+    assert store_db.get_bot_session("u1")["is_running"] == 0
+    assert len(states.session_timers) == 0
+
+
+def test_session_timer_follows_invalidation(store_db):
+    _configure_user(store_db)
+    states = EngineStateCache()
+    states.get("u1")
+    assert len(states.session_timers) == 1
+
+    store_db.set_bot_session(
+        user_id="u1", is_running=False, started_at=None, trades_opened_this_session=0
+    )
+    states.invalidate("u1")
+    assert len(states.session_timers) == 0
+    assert states.take_timer_reloads() == ["u1"]
+    assert states.take_timer_reloads() == []
+
+
+def test_engine_follows_simulated_clock_for_pnl_day_and_session(store_db):
+    late_evening = day_start_us("2026-03-02") + 23 * 60 * MICROS_PER_MINUTE
+    with use_clock(SimulatedClock(late_evening)) as clock:
+        _configure_user(store_db)
+        store_db.set_bot_session(
+            user_id="u1", is_running=True, started_at=now_us(), trades_opened_this_session=0
+        )
+        trade = store_db.open_trade(
+            user_id="u1", symbol="EURUSD", side="BUY", quantity=1.0, entry_price=1.0
+        )
+        store_db.close_trade(
+            user_id="u1", trade_id=int(trade["id"]), close_price=1.5, pnl=0.5, reason="tp_hit"
+        )
+        states = EngineStateCache()
+        engine = TradingEngine(states)
+        assert states.get("u1").realized_pnl_today == 0.5
+
+        # Past midnight the cached state expires and the new day starts flat.
+        clock.advance(MICROS_PER_DAY // 24 + 1)
+        assert states.get("u1").realized_pnl_today == 0.0
+        decision = engine.process_tick(user_id="u1", symbol="EURUSD", price=1.1, ai_approved=True)
+        assert decision.message == "Bot stopped: session duration expired"
@@ -0,0 +1,74 @@
+from app.services.trigger_book import TradeTrigger, TriggerBook, TriggerIndex
+
+
+def _trigger(trade_id, side, entry_price, *, user_id="u1", symbol="EURUSD"):
+    return TradeTrigger.for_trade(
+        user_id,
+        {"id": trade_id, "symbol": symbol, "side": side, "entry_price": entry_price, "quantity": 2.0},
+        profit_threshold=0.2,
+        loss_threshold=-0.1,
+    )
+
+
+def test_trade_trigger_levels_follow_side():
+    buy = _trigger(1, "BUY", 1.0)
+    sell = _trigger(2, "SELL", 1.0)
+
+    assert (buy.take_profit, buy.stop_loss) == (1.1, 0.95)
+    assert (sell.take_profit, sell.stop_loss) == (0.9, 1.05)
+    assert (buy.rising_level, buy.falling_level) == (1.1, 0.95)
+    assert (sell.rising_level, sell.falling_level) == (1.05, 0.9)
+
+
+def test_trigger_book_sweep_returns_each_crossed_trigger_once():
+    book = TriggerBook()
+    triggers = [_trigger(1, "BUY", 1.0), _trigger(2, "SELL", 1.0), _trigger(3, "BUY", 0.98)]
+    for trigger in triggers:
+        book.add(trigger)
+
+    assert book.sweep(1.0) == []
+    assert [item.trade_id for item in book.sweep(1.06)] == [2]
+    assert book.sweep(1.06) == []
+    assert [item.trade_id for item in book.sweep(0.94)] == [1]
+    assert len(book) == 1
+
+    book.discard(triggers[2])
+    assert book.sweep(2.0) == []
+    assert book.sweep(0.0) == []
+    assert len(book) == 0
+
+
+def test_trigger_book_compacts_discarded_triggers():
+    book = TriggerBook()
+    triggers = [_trigger(index, "BUY", 1.0 + index * 0.001) for index in range(100)]
+    for trigger in triggers:
+        book.add(trigger)
+    for trigger in triggers[:80]:
+        book.discard(trigger)
+
+    assert len(book) == 20
+    assert len(book._rising) < 100
+    assert [item.trade_id for item in book.sweep(5.0)] == list(range(80, 100))
+
+
+def test_trigger_index_replaces_and_discards_by_trade():
+    index = TriggerIndex()
+    index.add(_trigger(1, "BUY", 1.0))
+    index.add(_trigger(1, "BUY", 1.1))
+    index.add(_trigger(2, "SELL", 1.0, symbol="GBPUSD"))
+    index.add(_trigger(1, "BUY", 1.0, user_id="u2"))
+    assert len(index) == 3
+    assert index.users("EURUSD") == {"u1", "u2"}
+    assert index.users("USDJPY") == set()
+
+    assert [(item.user_id, item.entry_price) for item in index.sweep("EURUSD", 1.12)] == [
+        ("u2", 1.0)
+    ]
+    assert index.users("EURUSD") == {"u1"}
+    index.discard("u1", 1)
+    assert index.users("EURUSD") == set()
+    assert index.users("GBPUSD") == {"u1"}
+    index.discard_user("u1")
+    assert len(index) == 0
+    assert index.users("GBPUSD") == set()
+    assert index.sweep("EURUSD", 5.0) == []
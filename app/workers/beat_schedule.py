@@ -18,4 +18,9 @@ celery_app.conf.beat_schedule = {
         "schedule": crontab(hour=0, minute=0),
         "options": {"queue": "admin"},
     },
+    "archive-store": {
+        "task": "app.workers.tasks.maintenance_tasks.archive_store",
+        "schedule": crontab(hour=0, minute=30),
+        "options": {"queue": "admin"},
+    },
 }
@@ -10,6 +10,7 @@ celery_app = Celery(
         "app.workers.tasks.bot_tasks",
         "app.workers.tasks.trade_tasks",
         "app.workers.tasks.report_tasks",
+        "app.workers.tasks.maintenance_tasks",
     ],
 )
 
@@ -26,6 +27,7 @@ celery_app.conf.update(
         "app.workers.tasks.bot_tasks.*": {"queue": "trading"},
         "app.workers.tasks.trade_tasks.*": {"queue": "trading"},
         "app.workers.tasks.report_tasks.*": {"queue": "admin"},
+        "app.workers.tasks.maintenance_tasks.*": {"queue": "admin"},
     },
     task_queue_max_priority=10,
     task_default_priority=5,
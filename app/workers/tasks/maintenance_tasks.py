@@ -0,0 +1,13 @@
+import logging
+
+from app.db import store
+from app.workers.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.workers.tasks.maintenance_tasks.archive_store", queue="admin")
+def archive_store():
+    archived = store.archive_expired_rows()
+    logger.info("archive_store moved rows to archive: %s", archived)
+    return archived
@@ -0,0 +1,23 @@
+"""Move closed_trades and ai_decisions rows past the retention window to Parquet.
+
+Usage: PYTHONPATH=. python scripts/archive_store.py [retention_days]
+"""
+
+import sys
+
+from app.config import settings
+from app.db import store
+
+
+def archive(retention_days: int | None) -> None:
+    store.init_db()
+    try:
+        archived = store.archive_expired_rows(retention_days=retention_days)
+    finally:
+        store.shutdown()
+    for table, rows in archived.items():
+        print(f"Archived {rows} {table} rows to {settings.archive_dir}")
+
+
+if __name__ == "__main__":
+    archive(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,176 @@
+"""Load test the tick route with a deliberately small Starlette threadpool.
+
+Fires concurrent POST /engine/tick requests at an in-process app twice: once
+through a sync handler (the previous route shape, which holds a threadpool
+token for the whole request) and once through the async route backed by
+app.db.async_store. Reports throughput, p95 latency, the peak number of
+handlers in flight, the peak number of threadpool tokens borrowed and the
+peak number of store calls actually running.
+
+The async route frees its Starlette token while it waits, but its store
+calls run on the tick actors' pool of ENGINE_ACTOR_WORKERS threads: that,
+not the request concurrency, is the cap on store work in flight. Handlers
+beyond it are coroutines waiting for a thread.
+
+Usage: PYTHONPATH=. python scripts/bench_async_routes.py [requests] [concurrency]
+"""
+
+import asyncio
+import functools
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import anyio
+import anyio.to_thread
+from fastapi import FastAPI, Header
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.db import async_store, store
+from app.routes import trading
+from app.schemas.trading import TickRequest, TickResponse
+from app.services.latency_metrics import LatencyMetricsService
+
+THREADPOOL_TOKENS = 4
+USERS = 20
+SYMBOL = "EURUSD"
+
+
+class InFlight:
+    def __init__(self, limiter: anyio.CapacityLimiter) -> None:
+        self.limiter = limiter
+        self.current = 0
+        self.peak = 0
+        self.peak_tokens = 0
+        self.store_calls = 0
+        self.peak_store_calls = 0
+        self._lock = threading.Lock()
+
+    def enter(self) -> None:
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        self.peak_tokens = max(self.peak_tokens, int(self.limiter.borrowed_tokens))
+
+    def exit(self) -> None:
+        self.current -= 1
+
+    def store_call(self, func, /, *args, **kwargs):
+        with self._lock:
+            self.store_calls += 1
+            self.peak_store_calls = max(self.peak_store_calls, self.store_calls)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.store_calls -= 1
+
+
+def build_app(in_flight: InFlight) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.post("/sync/engine/tick", response_model=TickResponse)
+    def sync_tick(
+        payload: TickRequest,
+        idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+    ) -> TickResponse:
+        in_flight.enter()
+        try:
+            return in_flight.store_call(trading.process_tick_request, payload, idempotency_key)
+        finally:
+            in_flight.exit()
+
+    @bench_app.post("/async/engine/tick", response_model=TickResponse)
+    async def async_tick(
+        payload: TickRequest,
+        idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+    ) -> TickResponse:
+        in_flight.enter()
+        try:
+            return await trading.ingest_tick(payload, idempotency_key)
+        finally:
+            in_flight.exit()
+
+    return bench_app
+
+
+def prepare_users() -> None:
+    for index in range(USERS):
+        user_id = f"bench-{index}"
+        store.upsert_trading_config(
+            user_id=user_id,
+            assets=[SYMBOL],
+            timeframe="M1",
+            max_trades_per_session=500,
+            quantity=1.0,
+            profit_threshold=0.002,
+            loss_threshold=-0.002,
+        )
+        store.upsert_session_config(user_id=user_id, duration_minutes=1440)
+
+
+async def run(label: str, path: str, requests: int, concurrency: int) -> None:
+    in_flight = InFlight(anyio.to_thread.current_default_thread_limiter())
+    run_tick = async_store.run_tick
+
+    async def counted_run_tick(func, /, *args, **kwargs):
+        return await run_tick(functools.partial(in_flight.store_call, func), *args, **kwargs)
+
+    async_store.run_tick = counted_run_tick
+    metrics = LatencyMetricsService()
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = ASGITransport(app=build_app(in_flight))
+
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def send(index: int) -> None:
+            body = {
+                "user_id": f"bench-{index % USERS}",
+                "symbol": SYMBOL,
+                "price": 1.1 + (index % 50) * 0.0001,
+            }
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(path, json=body)
+                metrics.record("request_ms", (time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(send(index) for index in range(requests)))
+        finally:
+            async_store.run_tick = run_tick
+        elapsed = time.perf_counter() - started
+
+    snapshot = metrics.snapshot()["request_ms"]
+    print(
+        f"{label:<6} requests={requests} concurrency={concurrency} "
+        f"req/s={requests / elapsed:,.0f} p95={snapshot['p95']:.2f}ms "
+        f"peak_in_flight={in_flight.peak} peak_threadpool_tokens={in_flight.peak_tokens} "
+        f"peak_store_calls={in_flight.peak_store_calls}"
+    )
+
+
+async def main(requests: int, concurrency: int) -> None:
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+    print(
+        f"threadpool_tokens={THREADPOOL_TOKENS} "
+        f"tick_store_threads={settings.ENGINE_ACTOR_WORKERS} (async store-call cap)"
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings.STORE_DATABASE_PATH = str(Path(tmp_dir) / "bench.db")
+        store.init_db()
+        prepare_users()
+        try:
+            await run("sync", "/sync/engine/tick", requests, concurrency)
+            await run("async", "/async/engine/tick", requests, concurrency)
+        finally:
+            await async_store.shutdown()
+
+
+if __name__ == "__main__":
+    request_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency_level = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    asyncio.run(main(request_count, concurrency_level))
@@ -0,0 +1,108 @@
+"""Measure the engine journal: tick overhead and warm-restart time.
+
+Runs the same tick stream through the tick route against a temporary store,
+once without and once with the engine journal attached, then restores a
+fresh engine from that journal twice: from the raw segments (no snapshot)
+and from the snapshot written on close. Reports ticks per second, events
+replayed and restore time.
+
+Usage: PYTHONPATH=. python scripts/bench_engine_journal.py [ticks] [users]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.config import settings
+from app.db import store
+from app.routes import trading
+from app.schemas.trading import TickRequest
+from app.services.engine_journal import EngineJournal
+from app.services.engine_state import EngineStateCache
+
+SYMBOLS = ("EURUSD", "GBPUSD", "USDJPY", "AUDUSD")
+
+
+def prepare_users(users: int) -> None:
+    store.upsert_trading_configs(
+        [
+            {
+                "user_id": f"bench-{index}",
+                "assets": list(SYMBOLS),
+                "timeframe": "M1",
+                "max_trades_per_session": 1_000_000,
+                "quantity": 1.0,
+                "profit_threshold": 0.002,
+                "loss_threshold": -0.002,
+            }
+            for index in range(users)
+        ]
+    )
+    for index in range(users):
+        store.set_bot_session(
+            user_id=f"bench-{index}", is_running=True, started_at=None, trades_opened_this_session=0
+        )
+
+
+def run_ticks(ticks: int, users: int, journal_dir: Path | None) -> None:
+    trading.engine = trading.TradingEngine(EngineStateCache())
+    trading.ai_filter = trading.AIFilterService()
+    journal = None
+    if journal_dir is not None:
+        journal = EngineJournal(journal_dir, snapshot_every=ticks * 10)
+        journal.attach(trading.engine, trading.ai_filter)
+        journal.restore()
+    started = time.perf_counter()
+    for index in range(ticks):
+        payload = TickRequest(
+            user_id=f"bench-{index % users}",
+            symbol=SYMBOLS[(index // users) % len(SYMBOLS)],
+            price=1.1 + ((index // (users * len(SYMBOLS))) % 40) * 0.0001,
+            confidence_threshold=0.0,
+        )
+        trading.process_tick_request(payload, None)
+    if journal is not None:
+        journal.flush()
+    elapsed = time.perf_counter() - started
+    label = "journal" if journal is not None else "no journal"
+    print(f"ticks {label:<11} ticks={ticks} ticks/s={ticks / elapsed:,.0f}")
+
+
+def restore(label: str, journal_dir: Path) -> EngineJournal:
+    engine = trading.TradingEngine(EngineStateCache())
+    ai_filter = trading.AIFilterService()
+    journal = EngineJournal(journal_dir)
+    journal.attach(engine, ai_filter)
+    started = time.perf_counter()
+    replayed = journal.restore()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(
+        f"restore {label:<9} events={replayed} pairs={len(engine._last_prices)} "
+        f"ms={elapsed_ms:.1f}"
+    )
+    return journal
+
+
+def main(ticks: int, users: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings.STORE_DATABASE_PATH = str(Path(tmp_dir) / "bench.db")
+        store.init_db()
+        try:
+            prepare_users(users)
+            run_ticks(ticks, users, None)
+            journal_dir = Path(tmp_dir) / "journal"
+            run_ticks(ticks, users, journal_dir)
+            trading.engine.journal = trading.ai_filter.journal = None
+        finally:
+            store.shutdown()
+        # Restoring folds the tail into a snapshot, so the second run reads only that.
+        restore("segments", journal_dir).close()
+        restore("snapshot", journal_dir).close()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+    )
@@ -0,0 +1,84 @@
+"""Measure store write throughput with 1, 4 and 16 SQLite shards.
+
+Worker threads each drive their own set of users through the per-tick write
+path (open a trade, record the AI decision, close the trade) against a fresh
+temporary store. Audit rows are written synchronously so every operation
+competes for its shard's writer lock. Reports trade cycles per second and the
+p95 latency of a cycle. Pass ``FULL`` as the synchronous mode to make every
+commit wait for fsync, which is where a per-shard writer lock pays off.
+
+Usage: PYTHONPATH=. python scripts/bench_shards.py [cycles_per_thread] [threads] [synchronous]
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.config import settings
+from app.db import store
+from app.services.latency_metrics import LatencyMetricsService
+
+SHARD_COUNTS = (1, 4, 16)
+USERS_PER_THREAD = 4
+
+
+def _cycle(user_id: str, symbol: str) -> None:
+    store.open_trade(user_id=user_id, symbol=symbol, side="BUY", quantity=1.0, entry_price=1.1)
+    store.create_ai_decision(
+        user_id=user_id,
+        symbol=symbol,
+        price=1.1,
+        approved=True,
+        confidence=0.8,
+        reasons=["bench"],
+        trend_strength=0.5,
+        volatility=0.1,
+    )
+    trade = store.get_open_trade(user_id=user_id, symbol=symbol)
+    store.close_trade(
+        user_id=user_id, trade_id=int(trade["id"]), close_price=1.2, pnl=0.1, reason="tp_hit"
+    )
+
+
+def run(shards: int, cycles: int, threads: int) -> None:
+    metrics = LatencyMetricsService()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings.STORE_DATABASE_PATH = str(Path(tmp_dir) / "bench.db")
+        settings.STORE_SHARDS = shards
+        settings.STORE_WRITE_BEHIND = False
+        store.init_db()
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(index: int) -> None:
+            users = [f"bench-{index}-{offset}" for offset in range(USERS_PER_THREAD)]
+            barrier.wait()
+            for cycle in range(cycles):
+                started = time.perf_counter()
+                _cycle(users[cycle % USERS_PER_THREAD], f"SYM{cycle % 8}")
+                metrics.record("cycle_ms", (time.perf_counter() - started) * 1000)
+
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+        for thread in workers:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        store.shutdown()
+
+    snapshot = metrics.snapshot()["cycle_ms"]
+    print(
+        f"shards={shards:<3} threads={threads} cycles={cycles * threads} "
+        f"cycles/s={cycles * threads / elapsed:,.0f} p95={snapshot['p95']:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    cycles_per_thread = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    thread_count = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    settings.STORE_SYNCHRONOUS = sys.argv[3] if len(sys.argv) > 3 else settings.STORE_SYNCHRONOUS
+    for shard_count in SHARD_COUNTS:
+        run(shard_count, cycles_per_thread, thread_count)
@@ -0,0 +1,100 @@
+"""Measure store connections and latency per /engine/tick.
+
+Runs the same tick stream through the trading route twice against a
+temporary SQLite file: once with the legacy connect-per-call settings
+(rollback journal, synchronous=FULL, synchronous audit rows) and once with
+the pooled WAL settings and the write-behind audit journal.
+
+Usage: PYTHONPATH=. python scripts/bench_store.py [ticks]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.config import settings
+from app.db import store
+from app.routes import trading
+from app.schemas.trading import TickRequest
+from app.services.engine_state import EngineStateCache
+from app.services.latency_metrics import LatencyMetricsService
+
+USERS = 5
+SYMBOL = "EURUSD"
+
+
+def _prepare_users() -> None:
+    for index in range(USERS):
+        user_id = f"bench-{index}"
+        store.upsert_trading_config(
+            user_id=user_id,
+            assets=[SYMBOL],
+            timeframe="M1",
+            max_trades_per_session=500,
+            quantity=1.0,
+            profit_threshold=0.002,
+            loss_threshold=-0.002,
+        )
+        store.upsert_risk_config(
+            user_id=user_id,
+            daily_profit_target=1_000_000.0,
+            daily_loss_limit=1_000_000.0,
+            allocated_capital=1_000_000.0,
+        )
+        store.upsert_session_config(user_id=user_id, duration_minutes=1440)
+        store.set_bot_session(
+            user_id=user_id,
+            is_running=True,
+            started_at=time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()),
+            trades_opened_this_session=0,
+        )
+
+
+def run(label: str, ticks: int, **overrides: object) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        previous = {key: getattr(settings, key) for key in overrides}
+        previous["STORE_DATABASE_PATH"] = settings.STORE_DATABASE_PATH
+        for key, value in overrides.items():
+            setattr(settings, key, value)
+        settings.STORE_DATABASE_PATH = str(Path(tmp_dir) / "bench.db")
+        trading.engine = trading.TradingEngine(EngineStateCache())
+        trading.ai_filter = trading.AIFilterService()
+        try:
+            store.init_db()
+            _prepare_users()
+            metrics = LatencyMetricsService()
+            opened_before = store.get_backend().connections_opened
+            started = time.perf_counter()
+            for index in range(ticks):
+                price = 1.1 + ((index // USERS) % 40) * 0.0001
+                payload = TickRequest(user_id=f"bench-{index % USERS}", symbol=SYMBOL, price=price)
+                tick_started = time.perf_counter()
+                trading.process_tick_request(payload, None)
+                metrics.record("tick_ms", (time.perf_counter() - tick_started) * 1000)
+            elapsed = time.perf_counter() - started
+            opened = store.get_backend().connections_opened - opened_before
+        finally:
+            store.shutdown()
+            for key, value in previous.items():
+                setattr(settings, key, value)
+
+    snapshot = metrics.snapshot()["tick_ms"]
+    print(
+        f"{label:<10} ticks={ticks} ticks/s={ticks / elapsed:,.0f} "
+        f"connections/tick={opened / ticks:.2f} "
+        f"p50={snapshot['p50']:.3f}ms p95={snapshot['p95']:.3f}ms"
+    )
+
+
+if __name__ == "__main__":
+    tick_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    run(
+        "before",
+        tick_count,
+        STORE_PERSISTENT_CONNECTIONS=False,
+        STORE_JOURNAL_MODE="DELETE",
+        STORE_SYNCHRONOUS="FULL",
+        STORE_WRITE_BEHIND=False,
+    )
+    run("after", tick_count)
@@ -0,0 +1,106 @@
+"""Compare POST /engine/tick with the batched POST /engine/ticks.
+
+Sends the same tick stream (running bots, several users and symbols, an
+idempotency key per tick) through an in-process app: once one tick per
+request, then in batches of each size in BATCH_SIZES. Every run starts from
+a fresh temporary store and engine. Reports ticks per second.
+
+Usage: PYTHONPATH=. python scripts/bench_tick_batch.py [ticks] [write_behind]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.db import async_store, store
+from app.routes import trading
+from app.services.engine_state import EngineStateCache
+
+USERS = 20
+SYMBOLS = ("EURUSD", "GBPUSD", "USDJPY", "AUDUSD")
+BATCH_SIZES = (10, 100, 500)
+
+
+def prepare_users() -> None:
+    for index in range(USERS):
+        user_id = f"bench-{index}"
+        store.upsert_trading_config(
+            user_id=user_id,
+            assets=list(SYMBOLS),
+            timeframe="M1",
+            max_trades_per_session=500,
+            quantity=1.0,
+            profit_threshold=0.002,
+            loss_threshold=-0.002,
+        )
+        store.upsert_session_config(user_id=user_id, duration_minutes=1440)
+        store.set_bot_session(
+            user_id=user_id, is_running=True, started_at=None, trades_opened_this_session=0
+        )
+
+
+def tick_stream(count: int) -> list[dict]:
+    return [
+        {
+            "user_id": f"bench-{index % USERS}",
+            "symbol": SYMBOLS[(index // USERS) % len(SYMBOLS)],
+            "price": 1.1 + ((index // (USERS * len(SYMBOLS))) % 40) * 0.0001,
+            "confidence_threshold": 0.0,
+            "idempotency_key": f"bench-tick-{index}",
+        }
+        for index in range(count)
+    ]
+
+
+async def run(label: str, ticks: list[dict], batch_size: int | None) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings.STORE_DATABASE_PATH = str(Path(tmp_dir) / "bench.db")
+        store.init_db()
+        prepare_users()
+        trading.engine = trading.TradingEngine(EngineStateCache())
+        trading.ai_filter = trading.AIFilterService()
+        bench_app = FastAPI()
+        bench_app.include_router(trading.router)
+        transport = ASGITransport(app=bench_app)
+        try:
+            async with AsyncClient(transport=transport, base_url="http://bench") as client:
+                started = time.perf_counter()
+                if batch_size is None:
+                    for tick in ticks:
+                        body = dict(tick)
+                        key = body.pop("idempotency_key")
+                        response = await client.post(
+                            "/engine/tick", json=body, headers={"Idempotency-Key": key}
+                        )
+                        response.raise_for_status()
+                else:
+                    for offset in range(0, len(ticks), batch_size):
+                        response = await client.post(
+                            "/engine/ticks", json={"ticks": ticks[offset : offset + batch_size]}
+                        )
+                        response.raise_for_status()
+                store.flush_journal()
+                elapsed = time.perf_counter() - started
+        finally:
+            await async_store.shutdown()
+
+    print(f"{label:<12} ticks={len(ticks)} ticks/s={len(ticks) / elapsed:,.0f}")
+
+
+async def main(count: int) -> None:
+    ticks = tick_stream(count)
+    await run("single", ticks, None)
+    for batch_size in BATCH_SIZES:
+        await run(f"batch={batch_size}", ticks, batch_size)
+
+
+if __name__ == "__main__":
+    tick_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    settings.STORE_WRITE_BEHIND = (sys.argv[2].lower() != "false") if len(sys.argv) > 2 else True
+    asyncio.run(main(tick_count))
@@ -0,0 +1,134 @@
+"""Compare per-tick HTTP POSTs with the binary WebSocket tick stream.
+
+Starts the trading router under uvicorn on a local port and sends the same
+tick stream (one user, running bot) twice: once as one POST /engine/tick
+per tick over a keep-alive connection, and once over /engine/stream as
+msgpack frames of FRAME_TICKS ticks, with a window of WINDOW_FRAMES frames
+in flight. Every run starts from a fresh temporary store. Reports ticks
+per second.
+
+Usage: PYTHONPATH=. python scripts/bench_tick_stream.py [ticks]
+"""
+
+import asyncio
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import msgpack
+import uvicorn
+import websockets
+from fastapi import FastAPI
+
+from app.config import settings
+from app.core.security import create_access_token
+from app.db import async_store, store
+from app.routes import trading
+from app.services.engine_state import EngineStateCache
+
+USER_ID = "bench-stream"
+SYMBOL = "EURUSD"
+FRAME_TICKS = 50
+WINDOW_FRAMES = 8
+
+
+def prices(count: int) -> list[float]:
+    return [1.1 + (index % 40) * 0.0001 for index in range(count)]
+
+
+def prepare_user() -> None:
+    store.upsert_trading_config(
+        user_id=USER_ID,
+        assets=[SYMBOL],
+        timeframe="M1",
+        max_trades_per_session=1_000_000,
+        quantity=1.0,
+        profit_threshold=0.002,
+        loss_threshold=-0.002,
+    )
+    store.set_bot_session(
+        user_id=USER_ID, is_running=True, started_at=None, trades_opened_this_session=0
+    )
+
+
+async def send_http(port: int, ticks: list[float]) -> None:
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        for price in ticks:
+            response = await client.post(
+                "/engine/tick",
+                json={
+                    "user_id": USER_ID,
+                    "symbol": SYMBOL,
+                    "price": price,
+                    "confidence_threshold": 0.0,
+                },
+            )
+            response.raise_for_status()
+
+
+async def send_stream(port: int, ticks: list[float]) -> None:
+    token = create_access_token(USER_ID)
+    uri = f"ws://127.0.0.1:{port}/engine/stream?token={token}"
+    async with websockets.connect(uri, max_size=None) as websocket:
+        unpacker = msgpack.Unpacker(raw=False)
+        received = 0
+
+        async def receive(until: int) -> None:
+            nonlocal received
+            while received < until:
+                unpacker.feed(await websocket.recv())
+                received += sum(1 for _ in unpacker)
+
+        for offset in range(0, len(ticks), FRAME_TICKS):
+            frame = b"".join(
+                msgpack.packb([offset + index, SYMBOL, price, 0.0])
+                for index, price in enumerate(ticks[offset : offset + FRAME_TICKS])
+            )
+            await websocket.send(frame)
+            await receive(offset - FRAME_TICKS * WINDOW_FRAMES)
+        await receive(len(ticks))
+
+
+async def run(label: str, ticks: list[float], sender) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings.STORE_DATABASE_PATH = str(Path(tmp_dir) / "bench.db")
+        store.init_db()
+        prepare_user()
+        trading.engine = trading.TradingEngine(EngineStateCache())
+        trading.ai_filter = trading.AIFilterService()
+        bench_app = FastAPI()
+        bench_app.include_router(trading.router)
+
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        server = uvicorn.Server(
+            uvicorn.Config(bench_app, host="127.0.0.1", port=port, log_level="warning")
+        )
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        try:
+            started = time.perf_counter()
+            await sender(port, ticks)
+            store.flush_journal()
+            elapsed = time.perf_counter() - started
+        finally:
+            server.should_exit = True
+            await serving
+            await async_store.shutdown()
+
+    print(f"{label:<8} ticks={len(ticks)} ticks/s={len(ticks) / elapsed:,.0f}")
+
+
+async def main(count: int) -> None:
+    ticks = prices(count)
+    await run("http", ticks, send_http)
+    await run("stream", ticks, send_stream)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
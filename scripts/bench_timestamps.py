@@ -0,0 +1,120 @@
+"""Compare ISO-8601 text timestamps with epoch-microsecond integers.
+
+Measures the three places the store schema change touches:
+
+* the per-tick session expiry check (parse ``started_at`` and compare, versus
+  one integer subtraction),
+* stamping a write (``datetime.now().isoformat()`` versus ``now_us()``),
+* an indexed closed-trade range query against a TEXT and an INTEGER column.
+
+Usage: PYTHONPATH=. python scripts/bench_timestamps.py [iterations] [rows]
+"""
+
+import sqlite3
+import sys
+import time
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from app.core.timestamps import MICROS_PER_MINUTE, now_us, to_epoch_us
+
+USERS = 50
+
+
+def _per_call_ns(stmt, number: int) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e9
+
+
+def bench_expiry_check(iterations: int) -> None:
+    started_text = (datetime.now(timezone.utc) - timedelta(minutes=5)).isoformat()
+    started_us = to_epoch_us(started_text)
+    max_duration = timedelta(minutes=30)
+    max_duration_us = 30 * MICROS_PER_MINUTE
+
+    def text_check() -> bool:
+        return datetime.now(timezone.utc) - datetime.fromisoformat(started_text) >= max_duration
+
+    def integer_check() -> bool:
+        return now_us() - started_us >= max_duration_us
+
+    text_ns = _per_call_ns(text_check, iterations)
+    integer_ns = _per_call_ns(integer_check, iterations)
+    print(
+        f"session expiry check: iso={text_ns:,.0f}ns epoch_us={integer_ns:,.0f}ns "
+        f"speedup={text_ns / integer_ns:.1f}x"
+    )
+
+
+def bench_write_stamp(iterations: int) -> None:
+    text_ns = _per_call_ns(lambda: datetime.now(timezone.utc).isoformat(), iterations)
+    integer_ns = _per_call_ns(now_us, iterations)
+    print(
+        f"write timestamp:      iso={text_ns:,.0f}ns epoch_us={integer_ns:,.0f}ns "
+        f"speedup={text_ns / integer_ns:.1f}x"
+    )
+
+
+def _build_table(conn: sqlite3.Connection, column_type: str, rows: int, as_text: bool) -> None:
+    conn.execute(
+        f"""
+        CREATE TABLE closed_trades (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            pnl REAL NOT NULL,
+            closed_at {column_type} NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX ix_user_closed_at ON closed_trades (user_id, closed_at)")
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    conn.executemany(
+        "INSERT INTO closed_trades (user_id, pnl, closed_at) VALUES (?, ?, ?)",
+        (
+            (
+                f"user-{index % USERS}",
+                0.1,
+                (start + timedelta(seconds=index * 30)).isoformat()
+                if as_text
+                else to_epoch_us(start + timedelta(seconds=index * 30)),
+            )
+            for index in range(rows)
+        ),
+    )
+    conn.commit()
+
+
+def bench_range_query(rows: int, queries: int) -> None:
+    since = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rows * 15)
+    results = {}
+    for label, column_type, as_text, bound in (
+        ("iso", "TEXT", True, since.isoformat()),
+        ("epoch_us", "INTEGER", False, to_epoch_us(since)),
+    ):
+        conn = sqlite3.connect(":memory:")
+        _build_table(conn, column_type, rows, as_text)
+        sql = """
+            SELECT COUNT(*), SUM(pnl)
+            FROM closed_trades
+            WHERE user_id = ? AND closed_at >= ?
+        """
+        started = time.perf_counter()
+        for index in range(queries):
+            conn.execute(sql, (f"user-{index % USERS}", bound)).fetchone()
+        results[label] = (time.perf_counter() - started) / queries * 1e6
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        results[f"{label}_mb"] = pages * conn.execute("PRAGMA page_size").fetchone()[0] / 2**20
+        conn.close()
+    print(
+        f"range query ({rows:,} rows): iso={results['iso']:,.1f}us "
+        f"epoch_us={results['epoch_us']:,.1f}us "
+        f"speedup={results['iso'] / results['epoch_us']:.2f}x "
+        f"db_size iso={results['iso_mb']:.1f}MB epoch_us={results['epoch_us_mb']:.1f}MB"
+    )
+
+
+if __name__ == "__main__":
+    iteration_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    row_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    bench_expiry_check(iteration_count)
+    bench_write_stamp(iteration_count)
+    bench_range_query(row_count, 500)
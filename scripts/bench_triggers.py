@@ -0,0 +1,134 @@
+"""Benchmark take-profit / stop-loss detection and closing for one busy symbol.
+
+Detection: OPEN_TRADES open trades on one symbol, a random-walk price stream,
+and for each tick either a linear PnL scan over every open trade or a sweep
+of the sorted trigger book. Closing: the trades one price crosses, closed
+one store call per trade or in one batched call. Reports ticks per second
+and closes per second.
+
+Usage: PYTHONPATH=. python scripts/bench_triggers.py [open_trades] [ticks]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.config import settings
+from app.db import store
+from app.services.trigger_book import TradeTrigger, TriggerBook
+
+SYMBOL = "EURUSD"
+PROFIT_THRESHOLD = 0.02
+LOSS_THRESHOLD = -0.02
+CLOSE_BATCH = 2000
+
+
+def open_trades(count: int) -> list[dict]:
+    rng = random.Random(7)
+    return [
+        {
+            "id": index,
+            "symbol": SYMBOL,
+            "side": "BUY" if index % 2 else "SELL",
+            "entry_price": 1.1 + rng.uniform(-0.02, 0.02),
+            "quantity": 1.0,
+        }
+        for index in range(count)
+    ]
+
+
+def price_walk(count: int) -> list[float]:
+    rng = random.Random(11)
+    price = 1.1
+    prices = []
+    for _ in range(count):
+        price += rng.gauss(0.0, 0.0001)
+        prices.append(price)
+    return prices
+
+
+def linear_scan(trades: list[dict], prices: list[float]) -> tuple[float, int]:
+    live = {trade["id"]: trade for trade in trades}
+    fired = 0
+    started = time.perf_counter()
+    for price in prices:
+        crossed = []
+        for trade in live.values():
+            direction = 1.0 if trade["side"] == "BUY" else -1.0
+            pnl = direction * (price - trade["entry_price"]) * trade["quantity"]
+            if pnl >= PROFIT_THRESHOLD or pnl <= LOSS_THRESHOLD:
+                crossed.append(trade["id"])
+        for trade_id in crossed:
+            del live[trade_id]
+        fired += len(crossed)
+    return time.perf_counter() - started, fired
+
+
+def book_sweep(trades: list[dict], prices: list[float]) -> tuple[float, int]:
+    book = TriggerBook()
+    for trade in trades:
+        book.add(
+            TradeTrigger.for_trade(
+                "bench",
+                trade,
+                profit_threshold=PROFIT_THRESHOLD,
+                loss_threshold=LOSS_THRESHOLD,
+            )
+        )
+    fired = 0
+    started = time.perf_counter()
+    for price in prices:
+        fired += len(book.sweep(price))
+    return time.perf_counter() - started, fired
+
+
+def bench_closes() -> None:
+    users = [f"bench-{index}" for index in range(CLOSE_BATCH)]
+    for label, batched in (("per-trade", False), ("batched", True)):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            settings.STORE_DATABASE_PATH = str(Path(tmp_dir) / "bench.db")
+            store.init_db()
+            closes: dict[str, list[tuple[int, float, float, str]]] = {}
+            for user_id in users:
+                trade = store.open_trade(
+                    user_id=user_id, symbol=SYMBOL, side="BUY", quantity=1.0, entry_price=1.1
+                )
+                closes[user_id] = [(int(trade["id"]), 1.103, 0.003, "tp_hit")]
+            started = time.perf_counter()
+            if batched:
+                closed = sum(map(len, store.close_trades_for_users(closes).values()))
+            else:
+                closed = sum(
+                    store.close_trade(
+                        user_id=user_id,
+                        trade_id=trade_id,
+                        close_price=close_price,
+                        pnl=pnl,
+                        reason=reason,
+                    )
+                    for user_id, [(trade_id, close_price, pnl, reason)] in closes.items()
+                )
+            elapsed = time.perf_counter() - started
+            store.shutdown()
+        print(f"close {label:<10} trades={closed} closes/s={closed / elapsed:,.0f}")
+
+
+def main(trade_count: int, tick_count: int) -> None:
+    trades = open_trades(trade_count)
+    prices = price_walk(tick_count)
+    for label, detect in (("linear", linear_scan), ("trigger book", book_sweep)):
+        elapsed, fired = detect(trades, prices)
+        print(
+            f"detect {label:<13} open={trade_count} ticks={tick_count} "
+            f"fired={fired} ticks/s={tick_count / elapsed:,.0f}"
+        )
+    bench_closes()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+    )
@@ -0,0 +1,16 @@
+"""Rebuild the daily_pnl ledger from closed_trades.
+
+Usage: PYTHONPATH=. python scripts/rebuild_daily_pnl.py
+"""
+
+from app.db import store
+
+
+def rebuild() -> None:
+    store.init_db()
+    rows = store.rebuild_daily_pnl()
+    print(f"Rebuilt daily_pnl: {rows} (user, day) rows")
+
+
+if __name__ == "__main__":
+    rebuild()
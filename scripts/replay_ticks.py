@@ -0,0 +1,278 @@
+"""Replay a recorded tick file through the full tick path and report throughput.
+
+The file is CSV or Parquet with ``user_id``, ``symbol``, ``price`` and
+``timestamp`` columns (ISO-8601 or epoch microseconds). Ticks are replayed in
+timestamp order, as fast as possible, through the same AI gate, engine, audit
+and notification path as POST /engine/tick, against a fresh store in a
+temporary directory (``--store memory`` puts it on /dev/shm when available).
+Every user in the file is provisioned with a running bot trading the symbols
+it ticks. Recorded timestamps order the replay; the engine runs on the wall
+clock unless ``--simulated-clock`` is given, in which case the clock is set
+to each tick's timestamp and session deadlines are swept between ticks, so a
+recorded trading day replays in seconds with sessions, daily PnL windows and
+stored timestamps following the recording. ``--session-minutes M`` gives
+every bot an M-minute session starting at the first tick.
+
+Reports ticks/s, p50/p95/p99 per stage, engine actions, trades and realized
+PnL, so performance changes can be compared on the same dataset.
+``--generate N`` first writes a synthetic N-tick file to PATH, one tick
+every ``--interval-ms`` (100).
+
+Usage: PYTHONPATH=. python scripts/replay_ticks.py PATH [--generate N] [--interval-ms MS]
+       [--store file|memory] [--profit-threshold X] [--loss-threshold X]
+       [--quantity X] [--simulated-clock] [--session-minutes M] [--json]
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import random
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.config import settings
+from app.core.timestamps import MICROS_PER_SECOND, SimulatedClock, now_us, to_epoch_us, use_clock
+from app.db import store
+from app.routes import trading
+from app.schemas.trading import TickRequest
+from app.services.engine_state import EngineStateCache
+from app.services.latency_metrics import LatencyMetricsService
+
+COLUMNS = ("user_id", "symbol", "price", "timestamp")
+SHARED_MEMORY_DIR = Path("/dev/shm")
+
+
+@dataclass(slots=True)
+class ReplayTick:
+    user_id: str
+    symbol: str
+    price: float
+    timestamp: int
+
+
+def load_ticks(path: Path) -> list[ReplayTick]:
+    if path.suffix.lower() == ".parquet":
+        rows = pq.read_table(path, columns=list(COLUMNS)).to_pylist()
+    else:
+        with path.open(newline="") as handle:
+            rows = list(csv.DictReader(handle))
+    ticks = [
+        ReplayTick(
+            user_id=str(row["user_id"]),
+            symbol=str(row["symbol"]).strip().upper(),
+            price=float(row["price"]),
+            timestamp=to_epoch_us(
+                int(row["timestamp"]) if str(row["timestamp"]).isdigit() else row["timestamp"]
+            ),
+        )
+        for row in rows
+    ]
+    ticks.sort(key=lambda tick: tick.timestamp)
+    return ticks
+
+
+def generate_ticks(
+    path: Path, count: int, *, interval_ms: int = 100, users: int = 20, seed: int = 7
+) -> None:
+    rng = random.Random(seed)
+    symbols = ("EURUSD", "GBPUSD", "USDJPY", "AUDUSD")
+    prices = {"EURUSD": 1.1, "GBPUSD": 1.27, "USDJPY": 151.0, "AUDUSD": 0.66}
+    started = now_us()
+    rows = []
+    for index in range(count):
+        symbol = symbols[index % len(symbols)]
+        prices[symbol] *= 1 + rng.gauss(0.0, 0.0002)
+        rows.append(
+            {
+                "user_id": f"replay-{rng.randrange(users)}",
+                "symbol": symbol,
+                "price": round(prices[symbol], 6),
+                "timestamp": started + index * interval_ms * 1_000,
+            }
+        )
+    if path.suffix.lower() == ".parquet":
+        pq.write_table(pa.Table.from_pylist(rows), path)
+        return
+    with path.open("w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def provision_users(
+    ticks: list[ReplayTick],
+    *,
+    quantity: float,
+    profit_threshold: float,
+    loss_threshold: float,
+    session_minutes: int | None,
+) -> list[str]:
+    symbols_by_user: dict[str, set[str]] = {}
+    for tick in ticks:
+        symbols_by_user.setdefault(tick.user_id, set()).add(tick.symbol)
+    store.upsert_trading_configs(
+        [
+            {
+                "user_id": user_id,
+                "assets": sorted(symbols),
+                "timeframe": "M1",
+                "max_trades_per_session": 1_000_000,
+                "quantity": quantity,
+                "profit_threshold": profit_threshold,
+                "loss_threshold": loss_threshold,
+            }
+            for user_id, symbols in symbols_by_user.items()
+        ]
+    )
+    started_at = now_us() if session_minutes else None
+    for user_id in symbols_by_user:
+        if session_minutes:
+            store.upsert_session_config(user_id=user_id, duration_minutes=session_minutes)
+        store.set_bot_session(
+            user_id=user_id, is_running=True, started_at=started_at, trades_opened_this_session=0
+        )
+    return sorted(symbols_by_user)
+
+
+def replay(ticks: list[ReplayTick], args: argparse.Namespace) -> dict:
+    base_dir = SHARED_MEMORY_DIR if args.store == "memory" and SHARED_MEMORY_DIR.is_dir() else None
+    with tempfile.TemporaryDirectory(dir=base_dir) as tmp_dir:
+        settings.STORE_DATABASE_PATH = str(Path(tmp_dir) / "replay.db")
+        settings.STORE_ARCHIVE_DIR = str(Path(tmp_dir) / "archive")
+        store.init_db()
+        clock = SimulatedClock(ticks[0].timestamp) if args.simulated_clock and ticks else None
+        try:
+            with use_clock(clock) if clock is not None else contextlib.nullcontext():
+                report = run_replay(ticks, args, clock)
+        finally:
+            store.shutdown()
+    return report
+
+
+def run_replay(
+    ticks: list[ReplayTick], args: argparse.Namespace, clock: SimulatedClock | None
+) -> dict:
+    users = provision_users(
+        ticks,
+        quantity=args.quantity,
+        profit_threshold=args.profit_threshold,
+        loss_threshold=args.loss_threshold,
+        session_minutes=args.session_minutes,
+    )
+    trading.engine = trading.TradingEngine(EngineStateCache())
+    trading.ai_filter = trading.AIFilterService()
+    metrics = trading.latency_metrics = LatencyMetricsService(max_samples=len(ticks) or 1)
+    actions: Counter[str] = Counter()
+    sessions_expired = 0
+
+    started = time.perf_counter()
+    for tick in ticks:
+        if clock is not None:
+            # What the session timer does in the service, once per tick.
+            clock.set(tick.timestamp)
+            for user_id in trading.engine.states.session_timers.advance(tick.timestamp):
+                sessions_expired += trading.engine.expire_session(user_id)
+        tick_started = time.perf_counter()
+        response = trading.process_tick_request(
+            TickRequest(
+                user_id=tick.user_id,
+                symbol=tick.symbol,
+                price=tick.price,
+                confidence_threshold=args.confidence_threshold,
+            ),
+            None,
+        )
+        metrics.record("tick_ms", (time.perf_counter() - tick_started) * 1000)
+        actions[response.action] += 1
+    flush_started = time.perf_counter()
+    store.flush_journal()
+    metrics.record("journal_flush_ms", (time.perf_counter() - flush_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    # The store is fresh, so its closed trades are exactly the replayed ones;
+    # get_realized_pnl_today would cover only the last simulated day. Every
+    # close follows an open from some tick, so len(ticks) bounds the rows.
+    realized = {
+        user_id: sum(
+            float(trade["pnl"])
+            for trade in store.get_closed_trades(user_id, limit=max(len(ticks), 1))
+        )
+        for user_id in users
+    }
+    still_open = sum(len(store.get_open_trades(user_id)) for user_id in users)
+    return {
+        "ticks": len(ticks),
+        "users": len(users),
+        "elapsed_s": round(elapsed, 3),
+        "ticks_per_s": round(len(ticks) / elapsed, 1) if elapsed else 0.0,
+        "simulated_s": (
+            round((ticks[-1].timestamp - ticks[0].timestamp) / MICROS_PER_SECOND, 3)
+            if clock is not None
+            else None
+        ),
+        "stages_ms": metrics.snapshot(),
+        "actions": dict(sorted(actions.items())),
+        "trades_opened": actions["opened"],
+        "trades_closed": actions["closed"],
+        "trades_open_at_end": still_open,
+        "sessions_expired": sessions_expired,
+        "realized_pnl": round(sum(realized.values()), 6),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"ticks={report['ticks']} users={report['users']} "
+        f"elapsed={report['elapsed_s']}s ticks/s={report['ticks_per_s']:,.0f}"
+    )
+    if report["simulated_s"] is not None:
+        print(f"  simulated={report['simulated_s']}s sessions_expired={report['sessions_expired']}")
+    for stage, snapshot in sorted(report["stages_ms"].items()):
+        print(
+            f"  {stage:<20} n={snapshot['count']:<6} p50={snapshot['p50']:.3f}ms "
+            f"p95={snapshot['p95']:.3f}ms p99={snapshot['p99']:.3f}ms"
+        )
+    print("  actions: " + " ".join(f"{key}={value}" for key, value in report["actions"].items()))
+    print(
+        f"  trades opened={report['trades_opened']} closed={report['trades_closed']} "
+        f"open_at_end={report['trades_open_at_end']} realized_pnl={report['realized_pnl']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path, help="CSV or Parquet tick file")
+    parser.add_argument("--generate", type=int, metavar="N", help="write N synthetic ticks first")
+    parser.add_argument(
+        "--interval-ms", type=int, default=100, help="spacing of generated ticks"
+    )
+    parser.add_argument("--store", choices=("file", "memory"), default="file")
+    parser.add_argument("--quantity", type=float, default=1.0)
+    parser.add_argument("--profit-threshold", type=float, default=0.002)
+    parser.add_argument("--loss-threshold", type=float, default=-0.002)
+    parser.add_argument("--confidence-threshold", type=float, default=0.0)
+    parser.add_argument(
+        "--simulated-clock", action="store_true", help="run the engine on the ticks' timestamps"
+    )
+    parser.add_argument("--session-minutes", type=int, metavar="M", help="bot session length")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.generate:
+        generate_ticks(args.path, args.generate, interval_ms=args.interval_ms)
+    report = replay(load_ticks(args.path), args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()